@@ -0,0 +1,294 @@
+"""
+부하 테스트 (네트워크 없이 실행)
+
+Telegram / OpenAI / Google Calendar / Notion 을 fake_backends 의 가짜 백엔드로 바꾼 뒤,
+텍스트·음성·여러 일정·수정·삭제가 섞인 update 를 /trigger 로 보내고
+처리량과 지연 시간 분포(p50/p95/p99)를 보고합니다.
+
+- ack: /trigger 응답까지 걸린 시간
+- e2e: 큐에 들어간 뒤 작업이 끝날 때까지 걸린 시간 (재시도 포함)
+
+사용법:
+    python benchmarks/bench_load.py --requests 200 --concurrency 20
+    python benchmarks/bench_load.py --voice-ratio 0.5 --latency openai=1.2 --error-rate notion=0.05:429
+    python benchmarks/bench_load.py --rate 10 --json > result.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+from bench_startup import ROOT, STUB_ENV
+from fake_backends import DEFAULT_LATENCY, FakeBackends
+
+CUSTOMERS = ["김철수", "이영희", "박민수", "최지우", "정다은", "한상우", "윤서연", "오준호"]
+SITES = ["성수동 카페", "분당 아파트", "일산 빌라", "판교 사무실", "송도 상가", "마포 주택"]
+CATEGORIES = ["상담", "시공", "미팅", "현장방문"]
+TIMES = ["오전 10시", "오전 11시", "오후 2시", "오후 3시", "오후 4시 30분"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_pairs(items: List[str], option: str) -> Dict[str, str]:
+    result = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        if name not in DEFAULT_LATENCY or not value:
+            raise SystemExit(f"{option} 형식 오류: {item} (백엔드: {', '.join(DEFAULT_LATENCY)})")
+        result[name] = value
+    return result
+
+
+class Workload:
+    """
+    요청 종류별 비율에 맞춰 Telegram update 를 만들고, 수정·삭제 대상 일정은 가짜 저장소에 미리 넣어 둡니다.
+    """
+
+    def __init__(self, args: argparse.Namespace, fakes: FakeBackends):
+        self.args = args
+        self.fakes = fakes
+        self.random = random.Random(args.seed)
+        self.tomorrow = date.today() + timedelta(days=1)
+
+    def _seed(self, title: str) -> None:
+        start = self.tomorrow.isoformat()
+        self.fakes.calendar.add_event(title, start)
+        self.fakes.notion.add_page(title, start)
+
+    def _register(self, i: int) -> str:
+        r = self.random
+        day = r.choice(["내일", "모레", f"{self.tomorrow.month}월 {self.tomorrow.day}일"])
+        subject = f"{r.choice(CUSTOMERS)}{i}" if r.random() < 0.5 else f"{r.choice(SITES)}{i}"
+        return f"{day} {r.choice(TIMES)} {subject} {r.choice(CATEGORIES)} 등록해줘"
+
+    def text(self, i: int) -> Tuple[str, str]:
+        """
+        :return: (요청 종류, 명령 문장)
+        """
+        r, a = self.random, self.args
+        roll = r.random()
+        if roll < a.update_ratio:
+            title = f"{r.choice(SITES)}{i} 실측"
+            self._seed(title)
+            return "update", f"내일 {title} 등록된 일정 모레 {r.choice(TIMES)}로 바꿔줘"
+        roll -= a.update_ratio
+        if roll < a.delete_ratio:
+            title = f"{r.choice(SITES)}{i} 점검"
+            self._seed(title)
+            return "delete", f"내일 {title} 일정 삭제해줘"
+        roll -= a.delete_ratio
+        if roll < a.multi_ratio:
+            return "multi", f"{self._register(i)[:-2]}하고 {self._register(i + 100000)}"
+        roll -= a.multi_ratio
+        if roll < a.freeform_ratio:
+            # 규칙으로 풀리지 않아 GPT 로 넘어가는 문장
+            return "freeform", f"다음주쯤 {r.choice(CUSTOMERS)}{i}님이랑 {r.choice(CATEGORIES)} 잡아줘"
+        return "register", self._register(i)
+
+    def update(self, i: int) -> Tuple[str, Dict[str, Any]]:
+        kind, text = self.text(i)
+        message: Dict[str, Any] = {"message_id": i, "chat": {"id": 1, "type": "private"}, "date": int(time.time())}
+        if self.random.random() < self.args.voice_ratio:
+            file_id = f"voice-{i}"
+            size = self.fakes.telegram.add_voice(file_id, text, size=self.random.randint(8_000, 60_000))
+            message["voice"] = {"file_id": file_id, "file_unique_id": f"u-{i}", "duration": 4, "file_size": size}
+            kind = f"voice_{kind}"
+        else:
+            message["text"] = text
+        return kind, {"update_id": 100000 + i, "message": message}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    import main
+
+    fakes = FakeBackends(
+        latency={name: float(value) / 1000 for name, value in parse_pairs(args.latency, "--latency").items()},
+        errors={
+            name: (float(value.split(":")[0]), int(value.split(":")[1]) if ":" in value else 503)
+            for name, value in parse_pairs(args.error_rate, "--error-rate").items()
+        },
+        seed=args.seed
+    )
+    fakes.install(main)
+    workload = Workload(args, fakes)
+    updates = [workload.update(i) for i in range(args.requests)]
+
+    sent: List[Tuple[str, int, float]] = []  # (종류, 작업 ID, ack 지연)
+    duplicates = 0
+    interval = 1 / args.rate if args.rate else 0.0
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in updates:
+        queue.put_nowait(item)
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+
+            async def sender(index: int) -> None:
+                nonlocal duplicates
+                while not queue.empty():
+                    kind, body = queue.get_nowait()
+                    if interval:
+                        # 고정 도착률: 요청 순번에 맞춰 보낼 시각까지 대기 (open loop)
+                        delay = started + (args.requests - queue.qsize() - 1) * interval - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    request_started = time.perf_counter()
+                    response = await client.post("/trigger", json=body)
+                    ack = time.perf_counter() - request_started
+                    sent.append((kind, response.json()["job_id"], ack))
+                    if workload.random.random() < args.duplicate_ratio:
+                        # Telegram 재전송 (같은 update_id) — 작업은 한 번만 생겨야 함
+                        retry = await client.post("/trigger", json=body)
+                        duplicates += retry.json().get("status") == "duplicate"
+
+            await asyncio.gather(*(sender(i) for i in range(args.concurrency)))
+            send_seconds = time.perf_counter() - started
+
+            deadline = time.monotonic() + args.timeout
+            while time.monotonic() < deadline:
+                stats = await main.job_queue.stats()
+                if stats["depth"] == 0:
+                    break
+                await asyncio.sleep(0.05)
+            drain_seconds = time.perf_counter() - started
+
+            jobs = await asyncio.gather(*(main.job_queue.get(job_id) for _, job_id, _ in sent))
+            # 종료 시 테넌트 풀이 비워지므로 (테넌트별 리미터 포함) 그 전에 수집
+            rate_limits = main.get_rate_limit_stats()
+
+    statuses: Dict[str, int] = {}
+    e2e_by_kind: Dict[str, List[float]] = {}
+    attempts = []
+    for (kind, _, _), job in zip(sent, jobs):
+        statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+        attempts.append(job["attempts"])
+        if job["status"] == "done":
+            e2e_by_kind.setdefault(kind, []).append(job["updated_at"] - job["created_at"])
+
+    def summary(values: List[float]) -> Dict[str, float]:
+        return {
+            "count": len(values),
+            **{f"p{q}_ms": round(percentile(values, q) * 1000, 1) for q in (50, 95, 99)},
+            "max_ms": round(max(values, default=0.0) * 1000, 1),
+        }
+
+    e2e = [value for values in e2e_by_kind.values() for value in values]
+    done = statuses.get("done", 0)
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "workers": main.WORKER_CONCURRENCY,
+        "send_seconds": round(send_seconds, 3),
+        "drain_seconds": round(drain_seconds, 3),
+        "ack_throughput_rps": round(len(sent) / send_seconds, 1) if send_seconds else 0.0,
+        "job_throughput_rps": round(done / drain_seconds, 2) if drain_seconds else 0.0,
+        "statuses": statuses,
+        "duplicates_dropped": duplicates,
+        "avg_attempts": round(sum(attempts) / len(attempts), 2) if attempts else 0.0,
+        "ack": summary([ack for _, _, ack in sent]),
+        "e2e": summary(e2e),
+        "e2e_by_kind": {kind: summary(values) for kind, values in sorted(e2e_by_kind.items())},
+        "backends": fakes.stats(),
+        "rate_limits": rate_limits,
+        "clarify": {
+            source: stat["count"] for source, stat in main.get_clarify_stats().items()
+            if isinstance(stat, dict) and "count" in stat
+        },
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(
+        f"requests={result['requests']}  concurrency={result['concurrency']}  workers={result['workers']}  "
+        f"statuses={result['statuses']}  avg_attempts={result['avg_attempts']}"
+    )
+    print(
+        f"throughput: ack {result['ack_throughput_rps']} req/s ({result['send_seconds']} s), "
+        f"jobs {result['job_throughput_rps']} job/s ({result['drain_seconds']} s)"
+    )
+
+    def row(name: str, stat: Dict[str, float]) -> None:
+        print(f"{name:>18}: n={stat['count']:<5} p50 {stat['p50_ms']:8.1f} ms   p95 {stat['p95_ms']:8.1f} ms   "
+              f"p99 {stat['p99_ms']:8.1f} ms   max {stat['max_ms']:8.1f} ms")
+
+    row("ack", result["ack"])
+    row("e2e", result["e2e"])
+    for kind, stat in result["e2e_by_kind"].items():
+        row(f"e2e {kind}", stat)
+
+    print("backends:")
+    for name, stat in result["backends"].items():
+        print(f"  {name:>9}: {json.dumps(stat, ensure_ascii=False)}")
+    print("rate limits:")
+    rate_limits = result["rate_limits"]
+    rows = [("openai", rate_limits["openai"])] + [
+        (f"{name}:{tenant_id}", stat)
+        for tenant_id, limiters in rate_limits["tenants"].items() for name, stat in limiters.items()
+    ]
+    for name, stat in rows:
+        print(f"  {name:>16}: delayed {stat['delayed']}/{stat['acquired']}  avg wait {stat['avg_wait_seconds']} s  "
+              f"max wait {stat['max_wait_seconds']} s  throttled {stat['throttled']}  retries {stat['retries']}")
+    print(f"clarify: {result['clarify']}  duplicates dropped: {result['duplicates_dropped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 백엔드로 /trigger 부하 테스트")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20, help="동시에 /trigger 를 보내는 클라이언트 수")
+    parser.add_argument("--rate", type=float, default=0.0, help="초당 요청 수 (0 이면 최대한 빠르게)")
+    parser.add_argument("--workers", type=int, default=None, help="WORKER_CONCURRENCY (기본: 앱 설정)")
+    parser.add_argument("--voice-ratio", type=float, default=0.2)
+    parser.add_argument("--update-ratio", type=float, default=0.1)
+    parser.add_argument("--delete-ratio", type=float, default=0.1)
+    parser.add_argument("--multi-ratio", type=float, default=0.1)
+    parser.add_argument("--freeform-ratio", type=float, default=0.1, help="GPT 해석이 필요한 문장 비율")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.02, help="같은 update 재전송 비율")
+    parser.add_argument("--latency", action="append", default=[], metavar="BACKEND=MS",
+                        help=f"평균 지연 (ms), 백엔드: {', '.join(DEFAULT_LATENCY)}")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="BACKEND=RATE[:STATUS]",
+                        help="오류 주입 비율과 상태 코드 (기본 503), 예) notion=0.05:429")
+    parser.add_argument("--timeout", type=float, default=300.0, help="큐가 빌 때까지 기다릴 최대 시간 (초)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # main 은 import 시점에 환경변수를 읽으므로 먼저 설정
+        os.environ.update({
+            **STUB_ENV,
+            "JOB_QUEUE_PATH": os.path.join(tmp, "jobs.db"),
+            "SCHEDULE_LEDGER_PATH": os.path.join(tmp, "ledger.db"),
+            "IMPORT_STATE_PATH": os.path.join(tmp, "imports.db"),
+            "CLARIFY_CACHE_PATH": "",
+            "TRACE_LOG": "false",
+            "JOB_RETRY_BASE": os.environ.get("JOB_RETRY_BASE", "0.5"),
+        })
+        if args.workers:
+            os.environ["WORKER_CONCURRENCY"] = str(args.workers)
+        sys.path.insert(0, ROOT)
+
+        result = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
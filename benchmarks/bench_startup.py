@@ -0,0 +1,123 @@
+"""
+콜드 스타트 벤치마크
+
+새 파이썬 프로세스에서 main 을 import 하는 시간과, 앱 시작 후 첫 요청이
+처리될 때까지의 시간을 측정합니다. 외부 백엔드(Google/Notion/OpenAI)는
+가짜 함수로 대체하므로 네트워크 없이 실행됩니다.
+
+사용법:
+    python benchmarks/bench_startup.py --runs 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ✅ 첫 작업 처리를 기다릴 최대 시간 (초)
+DEADLINE = 30
+
+CHILD = r"""
+import json, time
+DEADLINE = %d
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+
+# ✅ 외부 백엔드 스텁 (쓰기 호출은 즉시 성공)
+async def fake_register_schedule(title, start_date, category, event_id=None):
+    return {"id": "stub"}
+
+async def fake_save_to_notion(parsed):
+    return {"status": "success", "page_id": "stub"}
+
+main.register_schedule = fake_register_schedule
+main.save_to_notion = fake_save_to_notion
+
+with TestClient(main.app) as client:
+    app_started = time.perf_counter()
+    response = client.post("/trigger", json={"update_id": 1, "message": {"text": "내일 오후 3시 현장방문 등록해줘"}})
+    acked = time.perf_counter()
+    job_id = response.json()["job_id"]
+    # 실패하거나 제한 시간 안에 끝나지 않으면 멈추지 않고 바로 오류로 종료
+    deadline = time.monotonic() + DEADLINE
+    while True:
+        job = client.get(f"/queue/jobs/{job_id}").json()
+        if job["status"] == "done":
+            break
+        if job["status"] == "failed":
+            raise SystemExit(f"첫 작업 실패: {job.get('last_error')}")
+        if time.monotonic() > deadline:
+            raise SystemExit(f"첫 작업이 {DEADLINE}초 안에 끝나지 않음: {job}")
+        time.sleep(0.001)
+    processed = time.perf_counter()
+
+print(json.dumps({
+    "import": imported - started,
+    "startup": app_started - imported,
+    "first_ack": acked - started,
+    "first_processed": processed - started,
+}))
+"""
+
+STUB_ENV = {
+    "OPENAI_API_KEY": "bench",
+    "NOTION_TOKEN": "bench",
+    "NOTION_DATABASE_ID": "bench",
+    "TELEGRAM_TOKEN": "bench",
+    "GOOGLE_CALENDAR_CREDENTIALS": json.dumps({
+        "client_id": "bench", "client_secret": "bench", "refresh_token": "bench",
+        "token": "bench", "expiry": "2099-01-01T00:00:00Z"
+    }),
+    "LOG_LEVEL": "WARNING",
+}
+
+
+def run_once() -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ, **STUB_ENV,
+            "JOB_QUEUE_PATH": os.path.join(tmp, "jobs.db"),
+            "SCHEDULE_LEDGER_PATH": os.path.join(tmp, "ledger.db"),
+            "IMPORT_STATE_PATH": os.path.join(tmp, "imports.db"),
+            "CLARIFY_CACHE_PATH": "",
+        }
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD % DEADLINE], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["process_total"] = time.perf_counter() - started
+        return result
+
+
+def interpreter_baseline() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="main.py 콜드 스타트 측정")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    baseline = statistics.median(interpreter_baseline() for _ in range(args.runs))
+
+    print(f"runs={args.runs}  (interpreter baseline {baseline * 1000:.1f} ms)")
+    for key in ("import", "startup", "first_ack", "first_processed", "process_total"):
+        values = [sample[key] * 1000 for sample in samples]
+        print(f"{key:>16}: median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms   max {max(values):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,588 @@
+"""
+부하 테스트용 가짜 백엔드 (네트워크 없이 동작)
+
+- Telegram 파일 API / OpenAI / Notion: httpx.MockTransport 로 각 SDK 의 실제 HTTP 경로
+  (요청 직렬화, 응답 파싱, 오류 → 예외 변환)를 그대로 거칩니다.
+- Google Calendar: AuthorizedHttp 자리에 들어가는 가짜 httplib2 객체 (batch multipart 포함)
+
+백엔드마다 지연 시간(평균 ±50% 균등 분포)과 오류 비율/상태 코드를 따로 설정할 수 있습니다.
+429 오류에는 Retry-After 를 붙여 앱의 한도 처리 경로도 함께 측정됩니다.
+"""
+import re
+import json
+import time
+import uuid
+import random
+import asyncio
+import threading
+import itertools
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import httpx
+
+KST = timezone(timedelta(hours=9))
+
+# ✅ 기본 지연 시간 (초) — 실제 서비스에서 관측되는 대략적인 값
+DEFAULT_LATENCY = {
+    "telegram": 0.08,
+    "openai": 0.6,
+    "whisper": 0.9,
+    "calendar": 0.15,
+    "notion": 0.25,
+}
+
+# 429 응답에 붙이는 Retry-After (초)
+RETRY_AFTER_SECONDS = "0.2"
+
+
+class Backend:
+    """
+    가짜 백엔드 하나의 지연·오류 설정과 호출 통계
+    """
+
+    def __init__(self, name: str, latency: float, error_rate: float = 0.0, error_status: int = 503):
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random()
+        self._lock = threading.Lock()
+
+    def seed(self, value: int) -> None:
+        self._random.seed(f"{self.name}-{value}")
+
+    def next_call(self) -> Tuple[float, Optional[int]]:
+        """
+        :return: (이번 호출의 지연 시간, 주입할 오류 상태 코드 또는 None)
+        """
+        with self._lock:
+            self.calls += 1
+            delay = self.latency * self._random.uniform(0.5, 1.5)
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                return delay, self.error_status
+            return delay, None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": round(self.latency * 1000, 1),
+            "error_rate": self.error_rate,
+            "calls": self.calls,
+            "injected_errors": self.errors,
+        }
+
+
+def _json_response(status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    headers = dict(headers or {})
+    if status == 429:
+        headers.setdefault("retry-after", RETRY_AFTER_SECONDS)
+    return httpx.Response(status, json=body, headers=headers)
+
+
+def _instant(value: str) -> datetime:
+    """
+    "YYYY-MM-DD" 또는 ISO 일시 → 비교용 aware datetime (시간대가 없으면 KST)
+    """
+    if len(value) == 10:
+        return datetime.combine(date.fromisoformat(value), datetime.min.time(), KST)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=KST)
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+# ✅ Telegram Bot API (getFile + 파일 다운로드, sendMessage)
+class FakeTelegram:
+    def __init__(self, backend: Backend):
+        self.backend = backend
+        self.files: Dict[str, bytes] = {}
+        self.sent: List[Dict[str, Any]] = []
+
+    def add_voice(self, file_id: str, transcript: str, size: int = 24_000) -> int:
+        """
+        음성 파일을 등록합니다. 파일 안에 받아 적을 문장을 넣어 두면 가짜 Whisper 가 그대로 돌려줍니다.
+        :return: 파일 크기
+        """
+        payload = b"OggS|" + transcript.encode("utf-8") + b"|"
+        self.files[file_id] = payload + b"\0" * max(0, size - len(payload))
+        return len(self.files[file_id])
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        delay, error = self.backend.next_call()
+        await asyncio.sleep(delay)
+        if error:
+            return _json_response(error, {"ok": False, "error_code": error, "description": "injected"})
+
+        path = request.url.path
+        if path.endswith("/sendMessage"):
+            message = json.loads(request.content)
+            self.sent.append(message)
+            return _json_response(200, {"ok": True, "result": {"message_id": len(self.sent), **message}})
+        if path.endswith("/getFile"):
+            file_id = request.url.params.get("file_id")
+            if file_id not in self.files:
+                return _json_response(400, {"ok": False, "error_code": 400, "description": "file not found"})
+            return _json_response(200, {"ok": True, "result": {
+                "file_id": file_id, "file_size": len(self.files[file_id]), "file_path": f"voice/{file_id}.oga"
+            }})
+        match = re.search(r"/file/bot[^/]+/voice/(.+)\.oga$", path)
+        if match and match.group(1) in self.files:
+            return httpx.Response(200, content=self.files[match.group(1)])
+        return _json_response(404, {"ok": False, "error_code": 404, "description": "not found"})
+
+
+# ✅ OpenAI (chat.completions structured output + audio.transcriptions)
+class FakeOpenAI:
+    _UPDATE_WORDS = ("바꿔", "변경", "수정", "옮겨")
+    _DELETE_WORDS = ("삭제", "취소", "지워")
+    _STOP_WORDS = re.compile(
+        r"(내일모레|내일|모레|오늘|다음\s*주쯤?|\d+월\s*\d+일|오전|오후|\d+시|등록해줘|등록|추가|잡아줘|넣어줘|"
+        r"바꿔줘|삭제해줘|일정|좀|님이랑|이랑|에)"
+    )
+
+    def __init__(self, chat: Backend, whisper: Backend):
+        self.chat = chat
+        self.whisper = whisper
+
+    def _parse(self, content: str) -> Dict[str, Any]:
+        today_match = re.search(r"오늘: (\d{4}-\d{2}-\d{2})", content)
+        command = content.split("명령:", 1)[-1].strip()
+        today = date.fromisoformat(today_match.group(1)) if today_match else date.today()
+        start = (today + timedelta(days=1)).isoformat()
+        title = re.sub(r"\s+", " ", self._STOP_WORDS.sub(" ", command)).strip()[:20] or "일정"
+
+        if any(word in command for word in self._DELETE_WORDS):
+            intent = "delete_schedule"
+        elif any(word in command for word in self._UPDATE_WORDS):
+            intent = "update_schedule"
+        else:
+            intent = "register_schedule"
+        updating = intent == "update_schedule"
+        return {
+            "intent": intent,
+            "title": title,
+            "start_date": start,
+            "origin_title": title if updating else None,
+            "origin_date": start if updating else None,
+            "category": "기타",
+            "confidence": 0.9,
+        }
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        transcribing = request.url.path.endswith("/audio/transcriptions")
+        backend = self.whisper if transcribing else self.chat
+        delay, error = backend.next_call()
+        await asyncio.sleep(delay)
+        if error:
+            code = "rate_limit_exceeded" if error == 429 else "server_error"
+            return _json_response(error, {"error": {"message": "injected", "type": code, "code": code}})
+
+        if transcribing:
+            match = re.search(rb"OggS\|(.*?)\|", request.content, re.S)
+            text = match.group(1).decode("utf-8") if match else ""
+            return httpx.Response(200, text=text + "\n", headers={"content-type": "text/plain"})
+
+        body = json.loads(request.content)
+        user = next(m["content"] for m in reversed(body["messages"]) if m["role"] == "user")
+        schema = body.get("response_format", {}).get("json_schema", {}).get("name")
+        if schema == "schedule_commands":
+            # 일괄 해석: "오늘: ...\n명령:\n0. ...\n1. ..." → 번호별 결과
+            head, _, lines = user.partition("명령:\n")
+            results = []
+            for line in lines.splitlines():
+                index, _, command = line.partition(". ")
+                results.append({"index": int(index), **self._parse(f"{head}명령: {command}")})
+            content = json.dumps({"results": results}, ensure_ascii=False)
+        else:
+            content = json.dumps(self._parse(user), ensure_ascii=False)
+        return _json_response(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": 400, "completion_tokens": 60, "total_tokens": 460,
+                "prompt_tokens_details": {"cached_tokens": 384},
+            },
+        })
+
+
+# ✅ Notion (pages.create / pages.update / databases.retrieve / databases.query)
+class FakeNotion:
+    # 속성 이름 → ID (실제 API 처럼 제목 속성은 "title", 나머지는 URL 인코딩된 짧은 문자열)
+    PROPERTY_IDS = {"일정 제목": "title", "날짜": "d%3Ate", "유형": "t%7Bpe"}
+
+    def __init__(self, backend: Backend):
+        self.backend = backend
+        self.pages: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _properties(properties: Dict[str, Any]) -> Dict[str, Any]:
+        result = {}
+        for name, value in properties.items():
+            for kind in ("title", "rich_text"):
+                if kind in value:
+                    value = {"type": kind, kind: [
+                        {"type": "text", "text": part["text"], "plain_text": part["text"]["content"]}
+                        for part in value[kind]
+                    ]}
+                    break
+            else:
+                kind = next(iter(value))
+                value = {"type": kind, **value}
+            result[name] = value
+        return result
+
+    def add_page(self, title: str, start: str, category: str = "기타") -> Dict[str, Any]:
+        return self._create({
+            "일정 제목": {"title": [{"text": {"content": title}}]},
+            "날짜": {"date": {"start": start}},
+            "유형": {"select": {"name": category}},
+        })
+
+    def _create(self, properties: Dict[str, Any]) -> Dict[str, Any]:
+        now = _now_iso()
+        page = {
+            "object": "page",
+            "id": str(uuid.uuid4()),
+            "created_time": now,
+            "last_edited_time": now,
+            "archived": False,
+            "in_trash": False,
+            "properties": self._properties(properties),
+        }
+        self.pages[page["id"]] = page
+        return page
+
+    @staticmethod
+    def _text(page: Dict[str, Any], name: str) -> str:
+        prop = page["properties"].get(name, {})
+        return "".join(part["plain_text"] for part in prop.get(prop.get("type"), []) or [])
+
+    def _matches(self, page: Dict[str, Any], condition: Optional[Dict[str, Any]]) -> bool:
+        if not condition:
+            return True
+        if "and" in condition:
+            return all(self._matches(page, c) for c in condition["and"])
+        if "or" in condition:
+            return any(self._matches(page, c) for c in condition["or"])
+        if condition.get("timestamp") == "last_edited_time":
+            bound = condition["last_edited_time"].get("on_or_after")
+            return not bound or _instant(page["last_edited_time"]) >= _instant(bound)
+        if "title" in condition or "rich_text" in condition:
+            rule = condition.get("title") or condition.get("rich_text")
+            text = self._text(page, condition["property"])
+            if "equals" in rule:
+                return text == rule["equals"]
+            if "contains" in rule:
+                return rule["contains"] in text
+            return True
+        if "date" in condition:
+            start = ((page["properties"].get(condition["property"]) or {}).get("date") or {}).get("start")
+            if not start:
+                return False
+            value, rule = _instant(start), condition["date"]
+            checks = {
+                "on_or_after": lambda bound: value >= bound,
+                "on_or_before": lambda bound: value <= bound,
+                "after": lambda bound: value > bound,
+                "before": lambda bound: value < bound,
+                "equals": lambda bound: value.astimezone(KST).date() == bound.astimezone(KST).date(),
+            }
+            return all(checks[op](_instant(bound)) for op, bound in rule.items() if op in checks)
+        return True
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        delay, error = self.backend.next_call()
+        await asyncio.sleep(delay)
+        if error:
+            code = "rate_limited" if error == 429 else "service_unavailable"
+            return _json_response(error, {"object": "error", "status": error, "code": code, "message": "injected"})
+
+        path = request.url.path
+        body = json.loads(request.content) if request.content else {}
+
+        if request.method == "POST" and path.endswith("/pages"):
+            return _json_response(200, self._create(body.get("properties", {})))
+
+        match = re.search(r"/pages/([^/]+)$", path)
+        if request.method == "PATCH" and match:
+            page = self.pages.get(match.group(1))
+            if page is None:
+                return _json_response(404, {"object": "error", "status": 404, "code": "object_not_found",
+                                            "message": "page not found"})
+            if "properties" in body:
+                page["properties"].update(self._properties(body["properties"]))
+            if "archived" in body:
+                page["archived"] = page["in_trash"] = bool(body["archived"])
+            page["last_edited_time"] = _now_iso()
+            return _json_response(200, page)
+
+        if request.method == "GET" and re.search(r"/databases/[^/]+$", path):
+            return _json_response(200, {"object": "database", "properties": {
+                name: {"id": prop_id, "name": name} for name, prop_id in self.PROPERTY_IDS.items()
+            }})
+
+        if request.method == "POST" and re.search(r"/databases/[^/]+/query$", path):
+            rows = [
+                page for page in self.pages.values()
+                if not page["archived"] and self._matches(page, body.get("filter"))
+            ]
+            offset = int(body.get("start_cursor") or 0)
+            size = int(body.get("page_size") or 100)
+            chunk = rows[offset:offset + size]
+            wanted = request.url.params.get_list("filter_properties")
+            if wanted:
+                names = {name for name, prop_id in self.PROPERTY_IDS.items() if unquote(prop_id) in wanted}
+                chunk = [
+                    {**page, "properties": {k: v for k, v in page["properties"].items() if k in names}}
+                    for page in chunk
+                ]
+            more = offset + size < len(rows)
+            return _json_response(200, {
+                "object": "list", "results": chunk,
+                "has_more": more, "next_cursor": str(offset + size) if more else None,
+            })
+
+        return _json_response(400, {"object": "error", "status": 400, "code": "invalid_request_url",
+                                     "message": f"unsupported: {request.method} {path}"})
+
+
+# ✅ Google Calendar v3 events (httplib2 인터페이스, 스레드 풀에서 호출됨)
+class _GoogleResponse(dict):
+    """
+    httplib2.Response 와 같은 모양 (dict + status/reason)
+    """
+
+    def __init__(self, status: int, headers: Optional[Dict[str, str]] = None):
+        super().__init__({"status": str(status), **(headers or {})})
+        self.status = status
+        self.reason = "OK" if status < 400 else "Error"
+
+
+class FakeCalendar:
+    def __init__(self, backend: Backend):
+        self.backend = backend
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.version = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.batches = 0
+
+    def add_event(self, title: str, start: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._insert({"summary": title, **self._span(start)})
+
+    @staticmethod
+    def _span(start: str) -> Dict[str, Any]:
+        if len(start) == 10:
+            end = (date.fromisoformat(start) + timedelta(days=1)).isoformat()
+            return {"start": {"date": start}, "end": {"date": end}}
+        end = (_instant(start) + timedelta(hours=1)).isoformat()
+        return {"start": {"dateTime": start, "timeZone": "Asia/Seoul"}, "end": {"dateTime": end, "timeZone": "Asia/Seoul"}}
+
+    def _touch(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        self.version += 1
+        event["_version"] = self.version
+        event["updated"] = _now_iso()
+        return event
+
+    @staticmethod
+    def _public(event: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in event.items() if not key.startswith("_")}
+
+    def _insert(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        event_id = body.get("id") or f"evt{next(self._ids):06d}"
+        event = self._touch({**body, "id": event_id, "status": "confirmed", "kind": "calendar#event"})
+        self.events[event_id] = event
+        return self._public(event)
+
+    @staticmethod
+    def _start(event: Dict[str, Any]) -> datetime:
+        start = event.get("start", {})
+        return _instant(start.get("dateTime") or start.get("date"))
+
+    def _list(self, query: Dict[str, str]) -> Tuple[int, Any]:
+        since = int(query["syncToken"]) if "syncToken" in query else None
+        show_deleted = query.get("showDeleted") == "true" or since is not None
+        time_min = _instant(query["timeMin"]) if "timeMin" in query else None
+        time_max = _instant(query["timeMax"]) if "timeMax" in query else None
+
+        rows = []
+        for event in self.events.values():
+            if since is not None and event["_version"] <= since:
+                continue
+            if event["status"] == "cancelled" and not show_deleted:
+                continue
+            if time_min and self._start(event) < time_min or time_max and self._start(event) >= time_max:
+                continue
+            rows.append(event)
+        if query.get("orderBy") == "startTime":
+            rows.sort(key=self._start)
+
+        offset = int(query.get("pageToken") or 0)
+        size = int(query.get("maxResults") or 250)
+        items = [self._public(e) for e in rows[offset:offset + size]]
+        projected = re.search(r"items\(([^)]*)\)", query.get("fields", ""))
+        if projected:
+            keep = {name.strip() for name in projected.group(1).split(",")}
+            items = [{key: value for key, value in item.items() if key in keep} for item in items]
+        body = {"kind": "calendar#events", "items": items}
+        if offset + size < len(rows):
+            body["nextPageToken"] = str(offset + size)
+        else:
+            body["nextSyncToken"] = str(self.version)
+        return 200, body
+
+    def _dispatch(self, method: str, path: str, query: Dict[str, str], body: Optional[str]) -> Tuple[int, Any]:
+        match = re.search(r"/calendars/[^/]+/events(?:/([^/?]+))?$", path)
+        if not match:
+            return 404, {"error": {"code": 404, "message": f"unsupported: {method} {path}"}}
+        event_id = match.group(1)
+        payload = json.loads(body) if body else {}
+
+        with self._lock:
+            if event_id is None:
+                if method == "GET":
+                    return self._list(query)
+                if method == "POST":
+                    if payload.get("id") in self.events:
+                        return 409, {"error": {"code": 409, "message": "The requested identifier already exists.",
+                                               "errors": [{"reason": "duplicate"}]}}
+                    return 200, self._insert(payload)
+            else:
+                event = self.events.get(event_id)
+                if event is None or event["status"] == "cancelled":
+                    return 404, {"error": {"code": 404, "message": "Not Found",
+                                           "errors": [{"reason": "notFound"}]}}
+                if method == "GET":
+                    return 200, self._public(event)
+                if method in ("PATCH", "PUT"):
+                    event.update(payload)
+                    return 200, self._public(self._touch(event))
+                if method == "DELETE":
+                    event["status"] = "cancelled"
+                    self._touch(event)
+                    return 204, None
+        return 405, {"error": {"code": 405, "message": "Method Not Allowed"}}
+
+    def _error(self, status: int) -> Tuple[int, Any]:
+        reason = "rateLimitExceeded" if status == 429 else "backendError"
+        return status, {"error": {"code": status, "message": "injected", "errors": [{"reason": reason}]}}
+
+    def _batch(self, body: str, content_type: str) -> Tuple[_GoogleResponse, bytes]:
+        boundary = re.search(r'boundary="?([^";]+)"?', content_type).group(1)
+        parts = [part for part in body.split(f"--{boundary}")[1:] if not part.startswith("--")]
+        self.batches += 1
+
+        boundary_out = f"batch_{uuid.uuid4().hex}"
+        lines = []
+        for part in parts:
+            headers, request = re.split(r"\r?\n\r?\n", part.strip(), maxsplit=1)
+            content_id = re.search(r"Content-ID:\s*<([^>]+)>", headers, re.I).group(1)
+            request_line, rest = request.split("\n", 1)
+            method, uri, _ = request_line.split(" ", 2)
+            inner = re.split(r"\r?\n\r?\n", rest, maxsplit=1)
+            inner_body = inner[1].strip() if len(inner) > 1 else ""
+            parsed = urlparse(uri)
+            query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+            # batch 안의 요청도 하나씩 지연·오류 주입 대상
+            _, error = self.backend.next_call()
+            status, result = self._error(error) if error else self._dispatch(method, parsed.path, query, inner_body)
+            content = json.dumps(result, ensure_ascii=False) if result is not None else ""
+            lines.append(
+                f"--{boundary_out}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n\r\n{content}\r\n"
+            )
+        lines.append(f"--{boundary_out}--\r\n")
+        return (
+            _GoogleResponse(200, {"content-type": f"multipart/mixed; boundary={boundary_out}"}),
+            "".join(lines).encode("utf-8"),
+        )
+
+    def request(self, uri: str, method: str = "GET", body: Optional[Any] = None,
+                headers: Optional[Dict[str, str]] = None, redirections: int = 5,
+                connection_type: Any = None) -> Tuple[_GoogleResponse, bytes]:
+        delay, error = self.backend.next_call()
+        time.sleep(delay)
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        parsed = urlparse(uri)
+
+        if parsed.path.startswith("/batch/"):
+            if error:
+                status, result = self._error(error)
+            else:
+                return self._batch(body, headers.get("content-type", ""))
+        else:
+            query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+            status, result = self._error(error) if error else self._dispatch(method, parsed.path, query, body)
+
+        response_headers = {"content-type": "application/json; charset=UTF-8"}
+        if status == 429:
+            response_headers["retry-after"] = RETRY_AFTER_SECONDS
+        content = json.dumps(result, ensure_ascii=False).encode("utf-8") if result is not None else b""
+        return _GoogleResponse(status, response_headers), content
+
+
+class FakeBackends:
+    """
+    네 가지 가짜 백엔드 묶음.
+    :param latency: {백엔드 이름: 평균 지연(초)} — 없으면 DEFAULT_LATENCY
+    :param errors: {백엔드 이름: (오류 비율, 상태 코드)}
+    """
+
+    def __init__(self, latency: Optional[Dict[str, float]] = None,
+                 errors: Optional[Dict[str, Tuple[float, int]]] = None, seed: int = 0):
+        latency = {**DEFAULT_LATENCY, **(latency or {})}
+        errors = errors or {}
+        self.backends = {
+            name: Backend(name, latency[name], *errors.get(name, (0.0, 503)))
+            for name in DEFAULT_LATENCY
+        }
+        for backend in self.backends.values():
+            backend.seed(seed)
+        self.telegram = FakeTelegram(self.backends["telegram"])
+        self.openai = FakeOpenAI(self.backends["openai"], self.backends["whisper"])
+        self.notion = FakeNotion(self.backends["notion"])
+        self.calendar = FakeCalendar(self.backends["calendar"])
+
+    def install(self, main_module) -> None:
+        """
+        앱의 공유 클라이언트를 가짜 백엔드로 연결합니다. (main import 후, 앱 시작 전에 호출)
+        """
+        from openai import AsyncOpenAI
+        from notion_client import AsyncClient
+        from tools import google_calendar, notion_api, openai_client
+
+        main_module.telegram_http = httpx.AsyncClient(
+            base_url="https://api.telegram.org", transport=httpx.MockTransport(self.telegram.handle)
+        )
+        openai_client._client = AsyncOpenAI(
+            api_key="bench", max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.openai.handle))
+        )
+        # 테넌트별 Notion 클라이언트도 모두 같은 가짜 백엔드로
+        notion_api._build_client = lambda tenant: AsyncClient(
+            auth="bench", client=httpx.AsyncClient(transport=httpx.MockTransport(self.notion.handle))
+        )
+        google_calendar.authorized_http = lambda credentials: self.calendar
+
+    def stats(self) -> Dict[str, Any]:
+        result = {name: backend.stats() for name, backend in self.backends.items()}
+        result["calendar"]["batches"] = self.calendar.batches
+        return result
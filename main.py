@@ -1,17 +1,18 @@
 import os
 import json
+import time
+import uuid
+import asyncio
 import logging
 import traceback
-import requests
-from typing import Union, Dict, Any
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
-from openai import OpenAI
-from tempfile import NamedTemporaryFile
+from io import BytesIO
 
-from tools.clarify import clarify_command
+from tools.clarify import clarify_batch, clarify_commands, get_clarify_stats
+from tools.gpt_parser import parse_command
 from tools.calendar_register import register_schedule
 from tools.calendar_update import update_schedule
 from tools.calendar_delete import delete_schedule
@@ -20,116 +21,515 @@ from tools.notion_writer import (
     delete_from_notion
 )
 from tools.update_notion_schedule import update_notion_schedule  # ✅ 수정된 import
+from tools.job_queue import JobQueue
+from tools.schedule_ledger import ScheduleLedger
+from tools.schedule_import import ImportFormatError, ImportStore, ScheduleImporter, parse_import
+from tools.schedule_query import answer_query, schedule_cache
+from tools.notion_lookup import find_exact_pages
+from tools.clarify_cache import clarify_cache
+from tools.google_calendar import calendar_client
+from tools.openai_client import get_openai, close_openai
+from tools.tenants import tenant_pool, tenant_registry, use_tenant
+from tools.rate_limit import openai_limiter, all_limiters, get_rate_limit_stats
+from tools.single_flight import SingleFlight
+from tools.metrics import (
+    QUEUE_WAIT, JOBS, QUEUE_DEPTH, RATE_LIMIT_WAITING,
+    observe_stage, track_stage, render_metrics
+)
+from tools.tracing import RequestIdFilter, current_trace, start_trace, trace_logger
 
 # ✅ 환경변수 로드 및 설정
 load_dotenv()
 log_level = os.getenv("LOG_LEVEL", "INFO").upper()
-logging.basicConfig(level=getattr(logging, log_level))
+logging.basicConfig(
+    level=getattr(logging, log_level),
+    format="%(levelname)s:%(name)s:[%(request_id)s] %(message)s"
+)
+for handler in logging.getLogger().handlers:
+    handler.addFilter(RequestIdFilter())
 logger = logging.getLogger(__name__)
 
+# ✅ 요청별 JSON 한 줄 로그 (접두어 없이 메시지만, TRACE_LOG=false 면 끔)
+_trace_handler = logging.StreamHandler()
+_trace_handler.setFormatter(logging.Formatter("%(message)s"))
+trace_logger.addHandler(_trace_handler)
+trace_logger.propagate = False
+trace_logger.setLevel(logging.INFO if os.getenv("TRACE_LOG", "true").lower() == "true" else logging.WARNING)
+
 REQUIRED_ENV_VARS = ["OPENAI_API_KEY", "NOTION_TOKEN", "NOTION_DATABASE_ID"]
 for var in REQUIRED_ENV_VARS:
     if not os.getenv(var):
         raise RuntimeError(f"❌ 환경변수 {var}가 설정되지 않았습니다.")
 
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# ✅ 백엔드별 응답 시간 예산 (초)
+CALENDAR_TIMEOUT = float(os.getenv("CALENDAR_TIMEOUT", "15"))
+NOTION_TIMEOUT = float(os.getenv("NOTION_TIMEOUT", "15"))
+
+# ✅ /clarify/batch 한 번에 받을 최대 명령 수
+CLARIFY_BATCH_MAX = int(os.getenv("CLARIFY_BATCH_MAX", "1000"))
+
+# ✅ 큐를 비우는 워커 수
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+
+# ✅ 켜면 시작 직후 백그라운드에서 캘린더 클라이언트를 미리 준비 (기본은 첫 사용 시 생성)
+PREWARM_BACKENDS = os.getenv("PREWARM_BACKENDS", "").lower() in ("1", "true", "yes")
+
+# ✅ Telegram API 호출용 비동기 HTTP 클라이언트 (첫 사용 시 생성, keep-alive 연결 풀 재사용)
+TELEGRAM_TIMEOUT = float(os.getenv("TELEGRAM_TIMEOUT", "30"))
+TELEGRAM_MAX_CONNECTIONS = int(os.getenv("TELEGRAM_MAX_CONNECTIONS", "10"))
+# ✅ 음성 파일 최대 크기 (Telegram Bot API 다운로드 한도 20MB)
+VOICE_MAX_BYTES = int(os.getenv("VOICE_MAX_BYTES", str(20 * 1024 * 1024)))
+
+telegram_http = None
+
+def get_telegram_http():
+    global telegram_http
+    if telegram_http is None:
+        import httpx
+        telegram_http = httpx.AsyncClient(
+            base_url="https://api.telegram.org",
+            timeout=httpx.Timeout(TELEGRAM_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=TELEGRAM_MAX_CONNECTIONS,
+                max_keepalive_connections=TELEGRAM_MAX_CONNECTIONS,
+                keepalive_expiry=60.0
+            )
+        )
+    return telegram_http
 
 # ✅ FastAPI 앱 초기화
 app = FastAPI()
+job_queue: Optional[JobQueue] = None
+schedule_ledger: Optional[ScheduleLedger] = None
+import_store: Optional[ImportStore] = None
+importer: Optional[ScheduleImporter] = None
+workers: List[asyncio.Task] = []
+
+@app.on_event("startup")
+async def start_workers():
+    global job_queue, schedule_ledger, import_store, importer
+    job_queue = JobQueue()
+    schedule_ledger = ScheduleLedger()
+    import_store = ImportStore()
+    importer = ScheduleImporter(import_store, schedule_ledger)
+    recovered = await job_queue.recover()
+    if recovered:
+        logger.info(f"[queue] 재시작 전 처리 중이던 작업 {recovered}건 복구")
+    resumed = await importer.resume_all()
+    if resumed:
+        logger.info(f"[import] 재시작 전 실행 중이던 가져오기 {resumed}건 이어서 실행")
+    for i in range(WORKER_CONCURRENCY):
+        workers.append(asyncio.create_task(worker_loop(i)))
+    tenant_pool.start()
+
+    if PREWARM_BACKENDS:
+        # 실패해도 앱 시작은 막지 않고, 첫 사용 시 다시 시도
+        warm_up = asyncio.create_task(asyncio.to_thread(calendar_client.warm_up))
+        warm_up.add_done_callback(
+            lambda task: task.exception() and logger.warning(f"[startup] 캘린더 사전 준비 실패: {task.exception()}")
+        )
 
-# ✅ intent 분기 처리
-@app.post("/trigger")
-async def trigger(request: Request):
+@app.on_event("shutdown")
+async def close_clients():
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    workers.clear()
+    if importer:
+        await importer.stop()
+    # 테넌트별 미러 동기화 루프, 캘린더 토큰 갱신 스레드, Notion 클라이언트 정리
+    await tenant_pool.close()
+    if job_queue:
+        job_queue.close()
+    if schedule_ledger:
+        schedule_ledger.close()
+    if import_store:
+        import_store.close()
+    if telegram_http is not None:
+        await telegram_http.aclose()
+    await close_openai()
+
+# ✅ 개별 저장소 작업 실행 (시간 예산 초과/예외 시 실패 메시지로 변환)
+async def run_sink(coro, timeout: float, fail_message: str, stage: str) -> Tuple[Any, bool]:
+    """
+    :param stage: 지표에 남길 단계 이름 (예: "calendar", "notion")
+    :return: (결과, 성공 여부) — 실패한 저장소만 큐에서 재시도합니다.
+    """
+    started = time.perf_counter()
     try:
-        body = await request.json()
-        msg_obj = body.get("message", {})
-        message_text = ""
-
-        # ✅ 음성 메시지 처리
-        if "voice" in msg_obj:
-            file_id = msg_obj["voice"]["file_id"]
-            file_info = requests.get(f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getFile?file_id={file_id}").json()
-            file_path = file_info["result"]["file_path"]
-            file_url = f"https://api.telegram.org/file/bot{TELEGRAM_TOKEN}/{file_path}"
-            voice_data = requests.get(file_url).content
-
-            with NamedTemporaryFile(delete=False, suffix=".ogg") as tmp_file:
-                tmp_file.write(voice_data)
-                tmp_path = tmp_file.name
-
-            with open(tmp_path, "rb") as audio_file:
-                transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
-                message_text = transcript.strip()
+        result = await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"[trigger] {fail_message}: {timeout}초 시간 초과")
+        observe_stage(stage, started, "timeout", "TimeoutError")
+        return f"{fail_message}: {timeout}초 시간 초과", False
+    except Exception as e:
+        observe_stage(stage, started, "error", type(e).__name__)
+        return f"{fail_message}: {e}", False
+
+    if isinstance(result, dict) and result.get("status") == "error":
+        observe_stage(stage, started, "error", "ErrorResult")
+        return result, False
+    observe_stage(stage, started)
+    return result, True
+
+# ✅ 텔레그램 음성 파일 → 메모리 버퍼 (스트리밍, 크기 제한)
+async def download_voice(voice: Dict[str, Any]) -> BytesIO:
+    """
+    음성 파일을 공유 연결로 조금씩 받아 메모리 버퍼에 담습니다. (디스크 기록 없음)
+    VOICE_MAX_BYTES 를 넘으면 받는 도중에 중단합니다.
+    """
+    if voice.get("file_size", 0) > VOICE_MAX_BYTES:
+        raise ValueError(f"음성 파일이 너무 큽니다: {voice['file_size']} bytes")
+
+    http = get_telegram_http()
+    file_info = await http.get(f"/bot{TELEGRAM_TOKEN}/getFile", params={"file_id": voice["file_id"]})
+    file_info.raise_for_status()
+    file_path = file_info.json()["result"]["file_path"]
+
+    buffer = BytesIO()
+    async with http.stream("GET", f"/file/bot{TELEGRAM_TOKEN}/{file_path}") as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            if buffer.tell() + len(chunk) > VOICE_MAX_BYTES:
+                raise ValueError(f"음성 파일이 너무 큽니다: {VOICE_MAX_BYTES} bytes 초과")
+            buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
+
+# ✅ 텔레그램 채팅으로 답장 (sendMessage 한도 4096자 → 줄 단위로 나눠 전송)
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+async def send_message(chat_id: Any, text: str) -> None:
+    chunks, current = [], ""
+    for line in text.splitlines() or [""]:
+        line = line[:TELEGRAM_MESSAGE_LIMIT]
+        if current and len(current) + 1 + len(line) > TELEGRAM_MESSAGE_LIMIT:
+            chunks.append(current)
+            current = line
         else:
-            message_text = msg_obj.get("text", "")
+            current = f"{current}\n{line}" if current else line
+    chunks.append(current)
+
+    http = get_telegram_http()
+    with track_stage("telegram_send"):
+        for chunk in chunks:
+            response = await http.post(f"/bot{TELEGRAM_TOKEN}/sendMessage", json={"chat_id": chat_id, "text": chunk})
+            response.raise_for_status()
+
+# ✅ 같은 음성 파일이 동시에 들어오면 다운로드/Whisper 는 한 번만
+transcribe_flight = SingleFlight("transcribe")
+
+async def transcribe_voice(voice: Dict[str, Any]) -> str:
+    with track_stage("telegram_download"):
+        audio = await download_voice(voice)
+    # 재시도해도 같은 내용을 보내도록 버퍼의 바이트를 그대로 전달
+    with track_stage("whisper"):
+        transcript = await openai_limiter.run(
+            lambda: get_openai().audio.transcriptions.create(
+                model="whisper-1",
+                file=("voice.ogg", audio.getvalue(), "audio/ogg"),
+                response_format="text"
+            )
+        )
+    return transcript.strip()
+
+# ✅ 텔레그램 메시지 → 텍스트 (음성은 Whisper 로 변환)
+async def extract_message_text(msg_obj: Dict[str, Any]) -> str:
+    if "voice" not in msg_obj:
+        return msg_obj.get("text", "")
+
+    voice = msg_obj["voice"]
+    key = voice.get("file_unique_id") or voice["file_id"]
+    return await transcribe_flight.do(key, lambda: transcribe_voice(voice))
+
+# ✅ 일정 하나의 저장소별 작업 구성
+async def prepare_sinks(parsed: Dict[str, Any], op_state: Dict[str, Any],
+                        chat_id: Any = None) -> Optional[Dict[str, Callable]]:
+    """
+    해석 결과 하나에 대해 저장소별(calendar / notion) 실행 함수를 만듭니다.
+    op_state 에는 이 일정의 원장 정보와 이미 성공한 저장소가 기록됩니다.
+    chat_id 는 조회 결과를 답장할 채팅 (없으면 작업 결과에만 남김)
+    :return: {저장소 이름: 실행 함수}, 처리할 수 없는 intent 면 None
+    """
+    intent = parsed.get("intent", "")
+    title = parsed.get("title", "")
+    start_date = parsed.get("start_date", "")
+    category = parsed.get("category", "")
+    origin_title = parsed.get("origin_title", "")
+    origin_date = parsed.get("origin_date", "")
+
+    if intent == "query_schedule":
+        # ✅ 조회는 저장소 쓰기 없이 날짜별 일정 캐시에서 응답 (캐시에 없는 날짜만 캘린더 목록 조회)
+        async def query_op():
+            result = await answer_query(parsed)
+            if chat_id is not None:
+                # 답장 전송이 실패하면 조회 작업도 실패로 처리 → 큐에서 다시 시도
+                await send_message(chat_id, result["message"])
+            return result
 
-        if not message_text:
-            logger.warning("[trigger] 입력된 메시지가 비어 있습니다.")
-            return {"status": "error", "message": "입력된 메시지가 없습니다."}
+        return {
+            "query": lambda: run_sink(query_op(), CALENDAR_TIMEOUT, "❌ 일정 조회 실패", "schedule_query"),
+        }
 
-        logger.info(f"[trigger] 수신된 메시지: {message_text}")
-        parsed = clarify_command(message_text)
-        logger.debug(f"[trigger] clarify 결과: {parsed}")
-
-        intent = parsed.get("intent", "")
-        title = parsed.get("title", "")
-        start_date = parsed.get("start_date", "")
-        category = parsed.get("category", "")
-        origin_title = parsed.get("origin_title", "")
-        origin_date = parsed.get("origin_date", "")
-
-        notion_result = None
-        calendar_result = None
-
-        if intent == "register_schedule":
-            try:
-                register_schedule(title, start_date, category)
-                calendar_result = "✅ Google Calendar 등록 완료"
-            except Exception as e:
-                calendar_result = f"❌ 캘린더 등록 실패: {e}"
-
-            try:
-                notion_result = save_to_notion(parsed)
-            except Exception as e:
-                notion_result = f"❌ Notion 등록 실패: {e}"
-
-        elif intent == "update_schedule":
-            try:
-                update_schedule(origin_title, origin_date, start_date, category)
-                calendar_result = "✅ Google Calendar 수정 완료"
-            except Exception as e:
-                calendar_result = f"❌ 캘린더 수정 실패: {e}"
-
-            try:
-                notion_result = update_notion_schedule(parsed)
-            except Exception as e:
-                notion_result = f"❌ Notion 수정 실패: {e}"
-
-        elif intent == "delete_schedule":
-            try:
-                calendar_result = delete_schedule(title, start_date, category)
-            except Exception as e:
-                calendar_result = f"❌ 캘린더 삭제 실패: {e}"
-
-            try:
-                notion_result = delete_from_notion(parsed)
-            except Exception as e:
-                notion_result = f"❌ Notion 삭제 실패: {e}"
+    if intent == "register_schedule":
+        # ✅ 원장 항목을 먼저 만들고, 각 저장소가 만든 ID 를 연결
+        if "ledger_id" not in op_state:
+            op_state["ledger_id"] = await schedule_ledger.create(title, start_date, category)
+        ledger_id = op_state["ledger_id"]
+        # 재시도해도 같은 ID 로 등록 → 이전 시도에서 이미 만들어졌으면 그 일정을 그대로 사용
+        op_state.setdefault("event_id", uuid.uuid4().hex)
+
+        async def calendar_op():
+            event = await register_schedule(title, start_date, category, event_id=op_state["event_id"])
+            await schedule_ledger.link_calendar(ledger_id, event)
+            return "✅ Google Calendar 등록 완료"
+
+        async def notion_op():
+            # 이전 시도가 응답 없이 끝났으면 이미 만들어진 페이지가 있는지 먼저 확인
+            if op_state.get("notion_started"):
+                pages = await find_exact_pages(title, start_date, limit=1)
+                if pages:
+                    await schedule_ledger.link_notion(ledger_id, pages[0]["id"])
+                    return {"status": "success", "page_id": pages[0]["id"], "title": title}
+            op_state["notion_started"] = True
+            result = await save_to_notion(parsed)
+            if result.get("status") == "success":
+                await schedule_ledger.link_notion(ledger_id, result["page_id"])
+            return result
 
-        else:
-            return {"status": "ignored", "message": "처리 가능한 명령이 아닙니다."}
+        return {
+            "calendar": lambda: run_sink(calendar_op(), CALENDAR_TIMEOUT, "❌ 캘린더 등록 실패", "calendar"),
+            "notion": lambda: run_sink(notion_op(), NOTION_TIMEOUT, "❌ Notion 등록 실패", "notion"),
+        }
+
+    if intent == "update_schedule":
+        # ✅ 우리가 등록한 일정이면 원장의 ID 로 바로 수정
+        if "ledger" not in op_state:
+            op_state["ledger"] = await schedule_ledger.find(origin_title, origin_date)
+        entry = op_state["ledger"]
+
+        async def calendar_op():
+            target_event = None
+            if entry and entry["calendar_event_id"]:
+                target_event = {
+                    "id": entry["calendar_event_id"],
+                    "start": entry["calendar_start"],
+                    "end": entry["calendar_end"]
+                }
+            result = await update_schedule(origin_title, origin_date, start_date, category, target_event=target_event)
+            if result.get("status") != "success":
+                # status "error" 는 run_sink 가 실패로 처리 → 큐에서 재시도
+                return result
+            if entry:
+                await schedule_ledger.link_calendar(entry["id"], result["event"])
+                await schedule_ledger.move(entry["id"], title, start_date, category)
+            return "✅ Google Calendar 수정 완료"
+
+        async def notion_op():
+            page_ids = [entry["notion_page_id"]] if entry and entry["notion_page_id"] else None
+            result = await update_notion_schedule(parsed, page_ids=page_ids)
+            if entry and result.get("status") == "success":
+                await schedule_ledger.move(entry["id"], title, start_date, category)
+            return result
 
         return {
-            "status": "success",
-            "calendar": calendar_result,
-            "notion": notion_result
+            "calendar": lambda: run_sink(calendar_op(), CALENDAR_TIMEOUT, "❌ 캘린더 수정 실패", "calendar"),
+            "notion": lambda: run_sink(notion_op(), NOTION_TIMEOUT, "❌ Notion 수정 실패", "notion"),
+        }
+
+    if intent == "delete_schedule":
+        # ✅ 우리가 등록한 일정이면 원장의 ID 로 바로 삭제 (카테고리까지 같은 일정이 하나뿐일 때만)
+        if "ledger" not in op_state:
+            op_state["ledger"] = await schedule_ledger.find_exact(title, start_date, category)
+        entry = op_state["ledger"]
+
+        async def calendar_op():
+            event_ids = [entry["calendar_event_id"]] if entry and entry["calendar_event_id"] else None
+            result = await delete_schedule(title, start_date, category, event_ids=event_ids)
+            if entry and "삭제 완료" in result:
+                await schedule_ledger.mark_deleted(entry["id"])
+            return result
+
+        async def notion_op():
+            page_ids = [entry["notion_page_id"]] if entry and entry["notion_page_id"] else None
+            result = await delete_from_notion(parsed, page_ids=page_ids)
+            if entry and result.get("status") == "success":
+                await schedule_ledger.mark_deleted(entry["id"])
+            return result
+
+        return {
+            "calendar": lambda: run_sink(calendar_op(), CALENDAR_TIMEOUT, "❌ 캘린더 삭제 실패", "calendar"),
+            "notion": lambda: run_sink(notion_op(), NOTION_TIMEOUT, "❌ Notion 삭제 실패", "notion"),
         }
 
+    return None
+
+# ✅ intent 분기 처리 (큐 워커에서 실행)
+async def process_update(body: Dict[str, Any], state: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """
+    텔레그램 update 하나를 처리합니다.
+    메시지에 일정이 여러 건이면 모두 한꺼번에 처리합니다. (캘린더 쓰기는 batch 요청 하나로 묶이고,
+    Notion 쓰기는 한도 안에서 동시에 실행)
+    state 에는 이전 시도에서 끝난 단계(텍스트, 일정별 파싱 결과와 성공한 저장소)가 들어 있어
+    재시도 시 실패한 저장소만 다시 실행합니다.
+    :return: (응답 결과, 전체 성공 여부)
+    """
+    msg_obj = body.get("message", {})
+
+    if "message_text" not in state:
+        try:
+            state["message_text"] = await extract_message_text(msg_obj)
+        except ValueError as e:
+            # 크기 초과 등은 재시도해도 같으므로 바로 종료
+            logger.warning(f"[trigger] 음성 처리 불가: {e}")
+            return {"status": "error", "message": str(e)}, True
+    message_text = state["message_text"]
+
+    if not message_text:
+        logger.warning("[trigger] 입력된 메시지가 비어 있습니다.")
+        return {"status": "error", "message": "입력된 메시지가 없습니다."}, True
+
+    if "operations" not in state:
+        logger.info(f"[trigger] 수신된 메시지: {message_text}")
+        parsed_list = await clarify_commands(message_text)
+        logger.debug(f"[trigger] clarify 결과: {parsed_list}")
+        state["operations"] = [{"parsed": parsed} for parsed in parsed_list]
+    operations = state["operations"]
+
+    chat_id = msg_obj.get("chat", {}).get("id")
+    sink_sets = await asyncio.gather(*(prepare_sinks(op["parsed"], op, chat_id) for op in operations))
+
+    # ✅ 모든 일정의 아직 성공하지 못한 저장소를 동시에 처리 → 지연 시간은 가장 느린 쪽 기준
+    pending = [
+        (op, name, sinks[name])
+        for op, sinks in zip(operations, sink_sets) if sinks is not None
+        for name in sinks if name not in op.get("done", {})
+    ]
+    outcomes = await asyncio.gather(*(run() for _, _, run in pending))
+
+    attempted = {}
+    for (op, name, _), (result, ok) in zip(pending, outcomes):
+        attempted[(id(op), name)] = result
+        if ok:
+            op.setdefault("done", {})[name] = result
+
+    responses = []
+    all_ok = True
+    for op, sinks in zip(operations, sink_sets):
+        if sinks is None:
+            responses.append({"status": "ignored", "message": "처리 가능한 명령이 아닙니다."})
+            continue
+        done = op.get("done", {})
+        all_ok = all_ok and all(name in done for name in sinks)
+        responses.append({
+            "status": "success",
+            **{name: done[name] if name in done else attempted.get((id(op), name)) for name in sinks}
+        })
+
+    if len(responses) == 1:
+        return responses[0], all_ok
+    return {"status": "success", "results": responses}, all_ok
+
+# ✅ 큐 워커: 작업을 하나씩 꺼내 처리하고, 실패 시 백오프 후 재시도
+async def worker_loop(worker_id: int):
+    while True:
+        try:
+            job = await job_queue.claim()
+            if job is None:
+                continue
+            if job.attempts == 1:
+                QUEUE_WAIT.observe(time.time() - job.created_at)
+
+            state = job.state
+            # /trigger 에서 받은 요청 ID 를 이어 써서 webhook 로그와 작업 로그를 묶음
+            with start_trace("job", state.get("request_id")) as trace:
+                trace.attrs.update(job_id=job.id, attempt=job.attempts)
+                started = time.perf_counter()
+                try:
+                    # 보낸 채팅의 테넌트(팀) 캘린더·Notion 으로 처리
+                    # (설정 파일 오류도 작업 실패로 처리해 재시도 → 최종 실패, running 에 남지 않도록)
+                    tenant = tenant_registry.for_chat(job.payload.get("message", {}).get("chat", {}).get("id"))
+                    trace.attrs["tenant"] = tenant.id
+                    with use_tenant(tenant):
+                        result, ok = await process_update(job.payload, state)
+                except Exception as e:
+                    logger.error(f"[worker-{worker_id}] 작업 {job.id} 처리 오류: {e}")
+                    observe_stage("job", started, "error", type(e).__name__)
+                    result, ok = {"status": "error", "message": str(e)}, False
+                else:
+                    observe_stage("job", started, "ok" if ok else "error")
+                if state.get("debug") and isinstance(result, dict):
+                    result = {**result, "timing": trace.summary()}
+
+                if ok:
+                    await job_queue.complete(job.id, state, result)
+                    JOBS.inc(outcome="done")
+                    trace.attrs["outcome"] = "done"
+                    logger.info(f"[worker-{worker_id}] 작업 {job.id} 완료: {result}")
+                    continue
+
+                delay = await job_queue.retry(job, state, json.dumps(result, ensure_ascii=False))
+                outcome = "failed" if delay is None else "retry"
+                JOBS.inc(outcome=outcome)
+                trace.attrs["outcome"] = outcome
+                if delay is None:
+                    logger.error(f"[worker-{worker_id}] 작업 {job.id} 최종 실패 ({job.attempts}회 시도): {result}")
+                else:
+                    logger.warning(f"[worker-{worker_id}] 작업 {job.id} 재시도 예정 ({delay:.1f}초 후): {result}")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[worker-{worker_id}] 큐 처리 오류: {e}")
+            await asyncio.sleep(1)
+
+# ✅ 요청 추적: 요청 ID 발급(X-Request-ID 가 오면 그대로), 외부 호출별 span, 끝나면 JSON 한 줄 로그
+TRACED_PATHS = {"/trigger": "trigger", "/clarify": "clarify", "/clarify/batch": "clarify_batch", "/agent": "agent"}
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    kind = TRACED_PATHS.get(request.url.path)
+    if kind is None:
+        return await call_next(request)
+    with start_trace(kind, request.headers.get("x-request-id")) as trace:
+        response = await call_next(request)
+        trace.attrs["status_code"] = response.status_code
+        response.headers["X-Request-ID"] = trace.request_id
+        return response
+
+def wants_timing(request: Request) -> bool:
+    """
+    ?debug=1 또는 X-Debug-Timing: 1 이면 응답에 단계별 소요 시간을 붙임
+    """
+    flag = request.query_params.get("debug") or request.headers.get("x-debug-timing") or ""
+    return flag.lower() in ("1", "true", "yes")
+
+def with_timing(request: Request, response: Any) -> Any:
+    trace = current_trace()
+    if trace is None or not wants_timing(request):
+        return response
+    return {"result": response, "timing": trace.summary()}
+
+# ✅ 텔레그램 webhook: 큐에 저장 후 즉시 응답
+@app.post("/trigger")
+async def trigger(request: Request):
+    try:
+        body = await request.json()
+        trace = current_trace()
+        state = {"request_id": trace.request_id} if trace else {}
+        if wants_timing(request):
+            state["debug"] = True  # 작업 결과(/queue/jobs/{id})에 처리 단계별 소요 시간 포함
+        # ✅ 응답이 늦어 Telegram 이 같은 update 를 다시 보내도 작업은 한 번만
+        job_id, created = await job_queue.enqueue(body, dedup_key=body.get("update_id"), state=state)
+        if trace:
+            trace.attrs.update(job_id=job_id, duplicate=not created)
+        if not created:
+            logger.info(f"[trigger] 중복 update 무시 (update_id={body.get('update_id')}, job_id={job_id})")
+            return with_timing(request, {"status": "duplicate", "job_id": job_id})
+        return with_timing(request, {"status": "queued", "job_id": job_id})
+
     except Exception as e:
         logger.error(f"[trigger] 오류 발생: {str(e)}")
         return JSONResponse(status_code=200, content={
@@ -137,20 +537,134 @@ async def trigger(request: Request):
             "message": str(e)
         })
 
+# ✅ ICS/CSV 일정 일괄 가져오기 (GPT 없이 바로 등록, 백그라운드 실행 + 체크포인트)
+@app.post("/import")
+async def import_schedules(request: Request):
+    """
+    요청 본문에 파일 내용을 그대로 담아 보냅니다.
+    형식은 ?format=ics|csv, 없으면 Content-Type / 내용으로 판단합니다. ?dry_run=1 이면 해석 결과만 반환
+    ?chat_id= 를 주면 그 채팅의 테넌트 캘린더·Notion 으로 가져옵니다. (없으면 기본 테넌트)
+    """
+    try:
+        data = await request.body()
+        source = request.query_params.get("format", "").lower()
+        if not source:
+            content_type = request.headers.get("content-type", "")
+            is_ics = "calendar" in content_type or data.lstrip()[:15].upper() == b"BEGIN:VCALENDAR"
+            source = "ics" if is_ics else "csv"
+        rows = parse_import(data, source)
+        if not rows:
+            return JSONResponse(status_code=400, content={"detail": "가져올 일정이 없습니다."})
+
+        if request.query_params.get("dry_run", "").lower() in ("1", "true", "yes"):
+            return {"status": "dry_run", "total": len(rows), "rows": rows}
+
+        tenant = tenant_registry.for_chat(request.query_params.get("chat_id"))
+        import_id = await import_store.create(source, rows, tenant.id)
+        importer.start(import_id)
+        return JSONResponse(status_code=202, content={"status": "running", "import_id": import_id, "total": len(rows)})
+
+    except (ImportFormatError, UnicodeDecodeError) as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    except Exception as e:
+        logger.error(f"[import] 오류 발생: {str(e)}")
+        return JSONResponse(status_code=500, content={"detail": str(e)})
+
+@app.get("/import/{import_id}")
+async def import_progress(import_id: int):
+    progress = await import_store.progress(import_id)
+    if progress is None:
+        return JSONResponse(status_code=404, content={"detail": "가져오기를 찾을 수 없습니다."})
+    return progress
+
+# ✅ 중단됐거나 일부 실패한 가져오기를 남은 행부터 다시 실행
+@app.post("/import/{import_id}/resume")
+async def import_resume(import_id: int):
+    if await import_store.header(import_id) is None:
+        return JSONResponse(status_code=404, content={"detail": "가져오기를 찾을 수 없습니다."})
+    started = importer.start(import_id)
+    return {"status": "running" if started else "already_running", "import_id": import_id}
+
+# ✅ 큐 상태 (대기 작업 수, 가장 오래된 작업의 대기 시간)
+@app.get("/queue/stats")
+async def queue_stats():
+    return await job_queue.stats()
+
+@app.get("/queue/jobs/{job_id}")
+async def queue_job(job_id: int):
+    job = await job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"detail": "작업을 찾을 수 없습니다."})
+    return job
+
 # ✅ 명령어 파싱 테스트용
 @app.post("/clarify")
 async def clarify_test(request: Request):
     try:
         body = await request.json()
         message_text = body.get("message", "")
-        parsed = clarify_command(message_text)
-        return parsed
+        parsed_list = await clarify_commands(message_text)
+        # 일정 한 건이면 기존처럼 객체 하나, 여러 건이면 목록
+        return with_timing(request, parsed_list[0] if len(parsed_list) == 1 else parsed_list)
 
     except Exception as e:
         logger.error(f"[clarify] 테스트 오류 발생: {str(e)}")
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
-# ✅ GPT 기반 명령어 구조화 (릴스, 블로그 등 확장 가능)
+# ✅ 명령 여러 개 일괄 해석 (로컬에서 못 푼 명령만 묶어서 GPT 몇 번으로)
+@app.post("/clarify/batch")
+async def clarify_batch_endpoint(request: Request):
+    try:
+        body = await request.json()
+        commands = body.get("commands")
+        if not isinstance(commands, list):
+            return JSONResponse(status_code=400, content={"detail": "commands 는 명령 문자열 목록이어야 합니다."})
+        if len(commands) > CLARIFY_BATCH_MAX:
+            return JSONResponse(status_code=400, content={
+                "detail": f"한 번에 최대 {CLARIFY_BATCH_MAX}건까지 처리할 수 있습니다."
+            })
+
+        results = await clarify_batch(commands)
+        failed = sum(1 for item in results if item["status"] != "ok")
+        return with_timing(request, {"total": len(results), "ok": len(results) - failed, "error": failed, "results": results})
+
+    except Exception as e:
+        logger.error(f"[clarify] 일괄 해석 오류 발생: {str(e)}")
+        return JSONResponse(status_code=500, content={"detail": str(e)})
+
+# ✅ 해석 경로별(regex / rule / gpt) 처리 건수와 소요 시간
+@app.get("/clarify/stats")
+async def clarify_stats():
+    return get_clarify_stats()
+
+# ✅ 조회 명령용 일정 캐시 상태 (적중률, 목록 API 호출 수, 무효화 횟수)
+@app.get("/schedule/stats")
+async def schedule_stats(chat_id: Optional[int] = None):
+    with use_tenant(tenant_registry.for_chat(chat_id)):
+        return schedule_cache.stats()
+
+# ✅ 테넌트 클라이언트 풀 상태 (보관 중인 테넌트, 유휴 시간, 생성·정리 횟수 — 인증 정보는 포함하지 않음)
+@app.get("/tenants")
+async def tenants_stats():
+    return tenant_pool.stats()
+
+# ✅ Prometheus 지표 (단계별/백엔드별 지연 히스토그램, 오류 클래스별 카운터)
+@app.get("/metrics")
+async def metrics():
+    QUEUE_DEPTH.set((await job_queue.stats())["depth"])
+    waiting: Dict[str, int] = {}
+    for limiter in all_limiters():
+        waiting[limiter.name] = waiting.get(limiter.name, 0) + limiter.waiting
+    for name, count in waiting.items():
+        RATE_LIMIT_WAITING.set(count, backend=name)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# ✅ 백엔드별 요청 한도 상태 (대기 중/누적 대기 시간, 한도 초과·재시도 횟수 — Notion·Google 은 테넌트별)
+@app.get("/rate-limits")
+async def rate_limits():
+    return get_rate_limit_stats()
+
+# ✅ GPT 기반 명령어 구조화 (clarify 와 같은 structured output 해석기 사용, 릴스·블로그 등 확장 가능)
 @app.post("/agent")
 async def agent(request: Request):
     try:
@@ -160,45 +674,14 @@ async def agent(request: Request):
         if not text:
             return {"error": "text 필드가 비어 있습니다."}
 
-        today = datetime.now().strftime("%Y-%m-%d")
-        prompt = f"""오늘 날짜는 {today}야.
-명령어를 분석해서 intent, title, start_date, origin_date, category, origin_title 값을 아래 형식의 JSON으로 반환해줘.
-
-📌 intent 값은 아래 중 하나로만:
-- "register_schedule"
-- "update_schedule"
-- "delete_schedule"
-
-📌 category 값은 반드시 아래 중 하나로 한글로만 써줘:
-- 회의
-- 상담
-- 시공
-- 공사
-- 콘텐츠
-- 개인
-- 현장방문
-- 기타
-
-명령어: {text}
-
-형식:
-{{
-  "title": "...",
-  "start_date": "...",
-  "origin_date": "...",
-  "intent": "...",
-  "category": "...",
-  "origin_title": "..."
-}}"""
-
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt.strip()}],
-            temperature=0
-        )
+        cached = await clarify_cache.get(text, namespace="agent")
+        if cached is not None:
+            return with_timing(request, cached)
 
-        parsed = json.loads(response.choices[0].message.content.strip())
-        return parsed
+        with track_stage("agent_parse"):
+            parsed = await parse_command(text)
+        await clarify_cache.set(text, parsed, namespace="agent")
+        return with_timing(request, parsed)
 
     except Exception as e:
         logger.error(f"[agent] 오류 발생: {str(e)}")
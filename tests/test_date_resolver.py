@@ -0,0 +1,66 @@
+from datetime import date
+
+import pytest
+
+from tools.date_resolver import resolve_command, split_commands
+
+TODAY = date(2026, 10, 18)
+
+
+def test_split_commands_shares_trailing_verb():
+    assert split_commands("내일 오전 10시 상담, 모레 시공, 금요일 현장방문 등록해줘", TODAY) == [
+        "내일 오전 10시 상담 등록해줘", "모레 시공 등록해줘", "금요일 현장방문 등록해줘"
+    ]
+
+
+def test_split_commands_strips_leading_connective():
+    assert split_commands("내일 상담 등록, 그리고 모레 시공 삭제해줘", TODAY) == ["내일 상담 등록", "모레 시공 삭제해줘"]
+    assert split_commands("내일 상담 및 모레 시공 등록", TODAY) == ["내일 상담 등록", "모레 시공 등록"]
+
+
+def test_split_commands_keeps_update_whole():
+    command = "5월 18일 상담, 5월 20일 오후 3시로 바꿔줘"
+    assert split_commands(command, TODAY) == [command]
+
+
+def test_split_commands_keeps_query_whole():
+    command = "오늘 상담 및 내일 시공 일정 알려줘"
+    assert split_commands(command, TODAY) == [command]
+
+
+def test_split_commands_keeps_mixed_update_and_register_whole():
+    command = "내일 상담을 모레로 변경, 그리고 글피 시공 등록"
+    assert split_commands(command, TODAY) == [command]
+
+
+def test_split_commands_requires_verb_for_every_segment():
+    command = "내일 상담, 모레 시공"
+    assert split_commands(command, TODAY) == [command]
+
+
+@pytest.mark.parametrize("command, start_date", [
+    ("내일 오후 3시 상담 등록해줘", "2026-10-19T15:00:00"),
+    ("내일 오전 10시 상담", "2026-10-19T10:00:00"),
+    ("내일 저녁 7시 회식", "2026-10-19T19:00:00"),
+    ("내일 밤 11시 배포", "2026-10-19T23:00:00"),
+    ("내일 새벽 3시 배포", "2026-10-19T03:00:00"),
+    ("내일 14시 상담", "2026-10-19T14:00:00"),
+    ("내일 오후 12시 점심", "2026-10-19T12:00:00"),
+    ("내일 정오 점심", "2026-10-19T12:00:00"),
+    ("내일 상담 등록", "2026-10-19"),
+])
+def test_resolve_command_times(command, start_date):
+    assert resolve_command(command, TODAY)["start_date"] == start_date
+
+
+@pytest.mark.parametrize("command", [
+    "내일 3시 상담 등록해줘",
+    "내일 10시 상담",
+    "내일 3:30 상담",
+    "내일 밤 12시 배포",
+    "내일 저녁 12시 배포",
+    "내일 오전 12시 배포",
+    "내일 밤 1시 배포",
+])
+def test_resolve_command_leaves_ambiguous_times_to_gpt(command):
+    assert resolve_command(command, TODAY) is None
@@ -0,0 +1,31 @@
+import asyncio
+
+from tools.schedule_ledger import ScheduleLedger
+
+
+def test_find_exact_matches_category(tmp_path):
+    async def run():
+        ledger = ScheduleLedger(str(tmp_path / "ledger.db"))
+        consult = await ledger.create("김철수", "2026-11-03T10:00:00", "상담")
+        build = await ledger.create("김철수", "2026-11-03T14:00:00", "시공")
+        try:
+            assert (await ledger.find_exact("김철수", "2026-11-03", "시공"))["id"] == build
+            assert (await ledger.find_exact("김철수", "2026-11-03", "상담"))["id"] == consult
+            assert await ledger.find_exact("김철수", "2026-11-03", "실측") is None
+        finally:
+            ledger.close()
+
+    asyncio.run(run())
+
+
+def test_find_exact_skips_duplicates(tmp_path):
+    async def run():
+        ledger = ScheduleLedger(str(tmp_path / "ledger.db"))
+        await ledger.create("박영희", "2026-11-03T10:00:00", "실측")
+        await ledger.create("박영희", "2026-11-03T15:00:00", "실측")
+        try:
+            assert await ledger.find_exact("박영희", "2026-11-03", "실측") is None
+        finally:
+            ledger.close()
+
+    asyncio.run(run())
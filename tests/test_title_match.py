@@ -0,0 +1,38 @@
+from tools.title_match import TitleIndex, normalize_title, schedule_key, summary_key
+
+
+def test_normalize_title_ignores_case_spacing_and_tags():
+    assert normalize_title("[상담] 김철수  고객") == "김철수고객"
+    assert normalize_title("Kim  Consult!") == normalize_title("kim consult")
+    assert normalize_title("욕실 타일 (시공)") == "욕실타일"
+
+
+def test_schedule_key_includes_category():
+    assert schedule_key("김철수 고객", "상담") == ("상담", "김철수고객")
+    assert schedule_key("김철수", "상담") != schedule_key("김철수", "시공")
+    assert schedule_key("김철수", None) == ("기타", "김철수")
+    assert schedule_key("김철수", " ") == ("기타", "김철수")
+
+
+def test_summary_key_parses_category_prefix():
+    assert summary_key("[상담] 김철수 고객") == ("상담", "김철수고객")
+    assert summary_key("  [시공]김철수") == ("시공", "김철수")
+    assert summary_key("김철수 상담") is None
+    assert summary_key("") is None
+
+
+def test_summary_key_matches_only_exact_schedule():
+    key = schedule_key("김철수", "시공")
+    assert summary_key("[시공] 김철수") == key
+    assert summary_key("[시공]  김 철수") == key
+    assert summary_key("[상담] 김철수") != key
+    assert summary_key("[시공] 김철수 고객") != key
+    assert summary_key("[시공] 김철스") != key
+
+
+def test_title_index_fuzzy_search_still_finds_near_miss():
+    # 수정 대상 찾기는 유사도 검색 (삭제는 위의 정확 키만 사용)
+    index = TitleIndex()
+    index.add("a", "[상담] 김철수")
+    index.add("b", "[시공] 욕실 타일")
+    assert [item_id for item_id, _ in index.search("김철스")] == ["a"]
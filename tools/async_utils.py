@@ -0,0 +1,47 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+# ✅ 블로킹 호출(googleapiclient 등) 전용 제한된 스레드 풀
+GOOGLE_EXECUTOR_WORKERS = int(os.getenv("GOOGLE_EXECUTOR_WORKERS", "8"))
+_executor = ThreadPoolExecutor(
+    max_workers=GOOGLE_EXECUTOR_WORKERS,
+    thread_name_prefix="google-api"
+)
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    블로킹 함수를 제한된 스레드 풀에서 실행하고 결과를 기다립니다.
+    이벤트 루프는 그동안 다른 요청을 계속 처리합니다.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+async def paginate(fetch_page: Callable[[Optional[str]], Awaitable[Tuple[List[Any], Optional[str]]]]) -> AsyncIterator[Any]:
+    """
+    커서 기반 목록 API 의 결과를 페이지를 따라가며 하나씩 돌려줍니다.
+    쓰는 쪽이 원하는 항목을 찾아 멈추면 다음 페이지는 요청하지 않습니다.
+    :param fetch_page: 커서(첫 페이지는 None)를 받아 (항목 목록, 다음 커서 또는 None) 을 돌려주는 함수
+    """
+    cursor = None
+    while True:
+        items, cursor = await fetch_page(cursor)
+        for item in items:
+            yield item
+        if not cursor:
+            return
+
+
+def authorized_http(credentials):
+    """
+    인증 정보로 서명하는 새 AuthorizedHttp
+    httplib2.Http 는 스레드 안전하지 않으므로 스레드마다 하나씩 만들어 쓸 것 (CalendarClient 가 보관)
+    """
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+
+    return AuthorizedHttp(credentials, http=httplib2.Http())
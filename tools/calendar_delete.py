@@ -1,40 +1,23 @@
-import os
-import json
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request  # ✅ 토큰 갱신용
+from datetime import datetime
+from typing import List, Optional
+from googleapiclient.errors import HttpError
 
-logger = logging.getLogger(__name__)
-
-# ✅ 인증 처리
-creds_json = os.getenv("GOOGLE_CALENDAR_CREDENTIALS")
-if not creds_json:
-    raise RuntimeError("❌ GOOGLE_CALENDAR_CREDENTIALS 환경변수가 없습니다.")
-
-creds_data = json.loads(creds_json)
-creds = Credentials.from_authorized_user_info(
-    creds_data, ["https://www.googleapis.com/auth/calendar"]
-)
-
-# ✅ 만료된 경우 토큰 자동 갱신
-if creds.expired and creds.refresh_token:
-    try:
-        creds.refresh(Request())
-        logger.info("🔄 Google Calendar 토큰 자동 갱신 완료")
-    except Exception as e:
-        logger.error(f"❌ Google Calendar 토큰 갱신 실패: {e}")
-        raise RuntimeError("Google Calendar 인증 갱신 실패")
-
-calendar_service = build("calendar", "v3", credentials=creds)
+from tools.google_calendar import calendar_client
+from tools.calendar_mirror import calendar_mirror
+from tools.schedule_query import schedule_cache
+from tools.title_match import schedule_key, summary_key
 
-# ✅ 제목 정규화 함수
-def normalize_title(text: str) -> str:
-    return " ".join(text.lower().split())
+logger = logging.getLogger(__name__)
 
 # ✅ 일정 삭제 함수
-def delete_schedule(title: str, start_date: str, category: str) -> str:
+async def delete_schedule(title: str, start_date: str, category: str,
+                          event_ids: Optional[List[str]] = None) -> str:
+    """
+    :param event_ids: 원장에 기록된 이벤트 ID — 주어지면 검색 없이 ID 로 바로 삭제
+    API 오류는 그대로 올려 보내 큐가 캘린더 삭제만 다시 시도하도록 합니다.
+    """
     try:
         # ✅ 날짜 검증
         if not start_date:
@@ -47,31 +30,58 @@ def delete_schedule(title: str, start_date: str, category: str) -> str:
         time_min = f"{date_str}T00:00:00+09:00"
         time_max = f"{date_str}T23:59:59+09:00"
 
-        # ✅ 일정 조회
-        events_result = calendar_service.events().list(
-            calendarId="primary",
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
+        expected = f"[{category}] {title}"
+        key = schedule_key(title, category)
+
+        # ✅ 원장 ID → 로컬 미러 → 목록 API 순으로 대상 찾기
+        # 삭제는 되돌릴 수 없으므로 유사도가 아니라 카테고리 + 정규화 제목이 정확히 같은 일정만
+        if event_ids:
+            targets = [{"id": event_id} for event_id in event_ids]
+        else:
+            calendar_mirror.ensure_started()
+            targets = [
+                event for event in calendar_mirror.events_on(date_str) or []
+                if summary_key(event.get("summary", "")) == key
+            ]
+
+        if not targets:
+            # 미러가 아직 반영하지 못한 일정까지 보도록 그날 일정은 끝 페이지까지 (id·summary 만)
+            events = [
+                event async for event in calendar_client.iter_events(
+                    fields="id,summary", timeMin=time_min, timeMax=time_max, singleEvents=True
+                )
+            ]
+            if not events:
+                logger.warning(f"⚠️ {date_str}에는 등록된 일정이 없습니다.")
+                return f"{date_str}에는 등록된 일정이 없습니다."
+
+            targets = [event for event in events if summary_key(event.get("summary", "")) == key]
+
+        if len(targets) > 1:
+            # 어느 쪽을 지울지 알 수 없으면 아무것도 지우지 않음
+            logger.warning(f"⚠️ '{expected}' 일정이 {date_str}에 {len(targets)}건 있어 삭제하지 않았습니다.")
+            return f"{date_str}에 '{expected}' 일정이 {len(targets)}건 있어 삭제하지 않았습니다. 캘린더에서 직접 삭제해 주세요."
 
-        events = events_result.get("items", [])
-        if not events:
-            logger.warning(f"⚠️ {date_str}에는 등록된 일정이 없습니다.")
-            return f"{date_str}에는 등록된 일정이 없습니다."
+        # ✅ 삭제 (같은 메시지의 다른 삭제와 batch 요청 하나로 묶여 전송)
+        calendar_id = calendar_client.calendar_id
 
-        expected = normalize_title(f"[{category}] {title}")
-        deleted_count = 0
+        async def delete_event(event_id: str) -> None:
+            try:
+                await calendar_client.execute_batched(
+                    lambda service: service.events().delete(
+                        calendarId=calendar_id,
+                        eventId=event_id
+                    )
+                )
+            except HttpError as e:
+                # 미러가 늦게 반영된 경우: 이미 삭제된 일정
+                if e.resp.status not in (404, 410):
+                    raise
+            calendar_mirror.discard(event_id)
+            schedule_cache.discard(event_id)
 
-        for event in events:
-            event_title = normalize_title(event.get("summary", ""))
-            if event_title == expected:
-                calendar_service.events().delete(
-                    calendarId="primary",
-                    eventId=event["id"]
-                ).execute()
-                deleted_count += 1
+        await asyncio.gather(*(delete_event(event["id"]) for event in targets))
+        deleted_count = len(targets)
 
         if deleted_count == 0:
             logger.info(f"⚠️ '{expected}' 일정이 {date_str}에 존재하지 않습니다.")
@@ -82,4 +92,4 @@ def delete_schedule(title: str, start_date: str, category: str) -> str:
 
     except Exception as e:
         logger.error(f"❌ 일정 삭제 중 오류: {str(e)}")
-        return f"일정 삭제 중 오류 발생: {str(e)}"
+        raise
@@ -0,0 +1,201 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Dict, List, Set, Tuple, Any
+
+from tools.date_resolver import KST
+from tools.google_calendar import calendar_client
+from tools.tenants import TenantEvicted, TenantScoped, tenant_pool
+from tools.title_match import TitleIndex, TITLE_MATCH_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# ✅ 증분 동기화 주기 (초)
+CALENDAR_SYNC_INTERVAL = float(os.getenv("CALENDAR_SYNC_INTERVAL", "60"))
+
+# 목록 응답에서 필요한 필드만 요청
+_LIST_FIELDS = "nextPageToken,nextSyncToken,items(id,status,summary,start,end,recurrence,recurringEventId)"
+
+
+def event_date(event: Dict[str, Any]) -> Optional[str]:
+    start = event.get("start", {})
+    if "date" in start:
+        return start["date"]
+    if "dateTime" in start:
+        return datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00")).astimezone(KST).date().isoformat()
+    return None
+
+
+class CalendarMirror:
+    """
+    Google Calendar 이벤트의 로컬 사본.
+    - events().list 의 syncToken 으로 변경분만 받아 유지 (토큰 만료 410 시에만 전체 재동기화)
+    - 날짜별 색인 + 제목 유사도 색인(TitleIndex) → 수정·삭제 대상 조회에 목록 API 호출 불필요
+    - 반복 일정 원본은 색인하지 않음 (조회 실패 시 호출부가 API 로 대체)
+    """
+
+    def __init__(self, calendar_id: str = "primary"):
+        self.calendar_id = calendar_id
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.by_date: Dict[str, Set[str]] = {}
+        self.titles = TitleIndex()
+        self.sync_token: Optional[str] = None
+        self.last_synced: Optional[float] = None
+        self._sync_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.sync_token is not None
+
+    # ✅ 색인 관리
+    def _unindex(self, event_id: str) -> None:
+        event = self.events.pop(event_id, None)
+        if event is None:
+            return
+        self.titles.remove(event_id)
+        day = event_date(event)
+        ids = self.by_date.get(day)
+        if ids is not None:
+            ids.discard(event_id)
+            if not ids:
+                del self.by_date[day]
+
+    def _clear(self) -> None:
+        self.events.clear()
+        self.by_date.clear()
+        self.titles.clear()
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """
+        이벤트 하나를 반영합니다. (동기화 결과와 우리가 직접 쓴 결과 모두 이 경로로)
+        """
+        event_id = event.get("id")
+        if not event_id:
+            return
+        self._unindex(event_id)
+        if event.get("status") == "cancelled" or event.get("recurrence"):
+            return
+
+        day = event_date(event)
+        if day is None:
+            return
+        self.events[event_id] = {
+            key: event[key] for key in ("id", "summary", "start", "end", "status") if key in event
+        }
+        self.by_date.setdefault(day, set()).add(event_id)
+        self.titles.add(event_id, event.get("summary", ""))
+
+    def discard(self, event_id: str) -> None:
+        self._unindex(event_id)
+
+    # ✅ 조회
+    def events_on(self, day: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        해당 날짜의 이벤트 목록 (시작 시간순). 아직 동기화 전이면 None
+        """
+        if not self.ready:
+            return None
+        events = [self.events[event_id] for event_id in self.by_date.get(day, ())]
+        return sorted(events, key=lambda e: e["start"].get("dateTime") or e["start"].get("date", ""))
+
+    def match(self, title: str, day: Optional[str] = None,
+              min_score: float = TITLE_MATCH_THRESHOLD) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        제목이 비슷한 이벤트를 점수 높은 순으로 반환합니다. (day 를 주면 그 날짜 안에서만)
+        """
+        if not self.ready:
+            return []
+        within = self.by_date.get(day, set()) if day is not None else None
+        return [
+            (self.events[event_id], score)
+            for event_id, score in self.titles.search(title, within=within, min_score=min_score)
+        ]
+
+    # ✅ 동기화
+    async def _list_all(self, **params) -> Optional[str]:
+        page_token = None
+        while True:
+            result = await calendar_client.execute(
+                lambda service: service.events().list(
+                    calendarId=self.calendar_id,
+                    pageToken=page_token,
+                    maxResults=2500,
+                    fields=_LIST_FIELDS,
+                    **params
+                )
+            )
+            for event in result.get("items", []):
+                self.apply(event)
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return result.get("nextSyncToken")
+
+    async def sync(self) -> None:
+        """
+        syncToken 이 있으면 변경분만, 없거나 만료(410)되면 전체 동기화합니다.
+        """
+        from googleapiclient.errors import HttpError
+
+        async with self._sync_lock:
+            started = time.perf_counter()
+            full = self.sync_token is None
+            try:
+                if full:
+                    self._clear()
+                    self.sync_token = await self._list_all(showDeleted=False)
+                else:
+                    self.sync_token = await self._list_all(syncToken=self.sync_token, showDeleted=True)
+            except HttpError as e:
+                if e.resp.status != 410:
+                    raise
+                logger.warning("⚠️ Google Calendar syncToken 만료 → 전체 재동기화")
+                self.sync_token = None
+                self._clear()
+                self.sync_token = await self._list_all(showDeleted=False)
+                full = True
+
+            self.last_synced = time.time()
+            logger.debug(
+                f"[calendar_mirror] {'전체' if full else '증분'} 동기화 완료: "
+                f"{len(self.events)}건 ({time.perf_counter() - started:.3f}초)"
+            )
+
+    async def _sync_loop(self) -> None:
+        # 요청이 아니므로 테넌트를 사용 중으로 치지 않음 → 유휴 테넌트는 그대로 정리되고, 정리되면 루프 종료
+        with tenant_pool.background():
+            while calendar_mirror.peek() is self:
+                try:
+                    await self.sync()
+                except asyncio.CancelledError:
+                    raise
+                except TenantEvicted:
+                    break
+                except Exception as e:
+                    logger.error(f"❌ Google Calendar 미러 동기화 실패: {e}")
+                await asyncio.sleep(CALENDAR_SYNC_INTERVAL)
+        logger.debug("[calendar_mirror] 테넌트 정리됨 → 동기화 루프 종료")
+
+    def ensure_started(self) -> None:
+        """
+        첫 사용 시 백그라운드 동기화 루프를 시작합니다.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+# ✅ 테넌트별 미러 (테넌트가 정리되면 동기화 루프도 종료)
+calendar_mirror: "TenantScoped[CalendarMirror]" = TenantScoped(
+    "calendar_mirror", lambda tenant: CalendarMirror(tenant.calendar_id), close=CalendarMirror.stop
+)
@@ -1,52 +1,77 @@
-import os
-import json
 import logging
-from datetime import datetime, timedelta
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
-from tenacity import retry, stop_after_attempt, wait_exponential
-import re
+from datetime import datetime
+from typing import Optional
+from googleapiclient.errors import HttpError
 
-logger = logging.getLogger(__name__)
-
-# ✅ 환경변수에서 인증 정보 로딩
-try:
-    creds_json = os.getenv("GOOGLE_CALENDAR_CREDENTIALS")
-    creds_data = json.loads(creds_json)
-except json.JSONDecodeError:
-    logger.error("❌ GOOGLE_CALENDAR_CREDENTIALS JSON 형식 오류")
-    raise RuntimeError("Google Calendar 인증 정보 파싱 실패")
-
-# ✅ 인증 객체 생성
-creds = Credentials.from_authorized_user_info(creds_data, ["https://www.googleapis.com/auth/calendar"])
-
-# ✅ 토큰 만료 시 자동 갱신
-if creds.expired and creds.refresh_token:
-    try:
-        creds.refresh(Request())
-        logger.info("🔄 Google Calendar 토큰 자동 갱신 완료")
-    except Exception as e:
-        logger.error(f"❌ Google Calendar 토큰 갱신 실패: {e}")
-        raise RuntimeError("Google Calendar 인증 갱신 실패")
+from tools.google_calendar import calendar_client
+from tools.calendar_mirror import calendar_mirror
+from tools.schedule_query import schedule_cache
+from tools.title_match import normalize_title, rank_titles
 
-calendar_service = build("calendar", "v3", credentials=creds)
+logger = logging.getLogger(__name__)
 
-# ✅ 제목 비교 정규화 함수
-def normalize_title(title: str) -> str:
-    return re.sub(r"\s+", "", title.lower().strip().replace("[", "").replace("]", ""))
+# ✅ 일정 수정 API (한도 초과/일시 오류 재시도는 google_limiter 가 담당)
+async def update_calendar_event(event_id, event_body):
+    calendar_id = calendar_client.calendar_id
+    return await calendar_client.execute_batched(
+        lambda service: service.events().patch(
+            calendarId=calendar_id,
+            eventId=event_id,
+            body=event_body
+        )
+    )
+
+# ✅ 수정 요청 본문 구성 (기존 일정이 시간 기반인지 여부에 따라 분기)
+def build_event_body(target_event: dict, title: str, new_datetime: datetime, category: str) -> dict:
+    if "dateTime" in target_event["start"]:
+        old_start = datetime.fromisoformat(target_event["start"]["dateTime"])
+        old_end = datetime.fromisoformat(target_event["end"]["dateTime"])
+        duration = old_end - old_start
+
+        new_start = new_datetime
+        new_end = new_start + duration
+
+        event_body = {
+            "summary": f"[{category}] {title}",
+            "start": {
+                "dateTime": new_start.isoformat(),
+                "timeZone": "Asia/Seoul"
+            },
+            "end": {
+                "dateTime": new_end.isoformat(),
+                "timeZone": "Asia/Seoul"
+            },
+            "reminders": {
+                "useDefault": False,
+                "overrides": [
+                    {"method": "popup", "minutes": 120},
+                    {"method": "popup", "minutes": 60 * 24 - 240}
+                ]
+            }
+        }
+
+    else:
+        # 종일 일정
+        event_body = {
+            "summary": f"[{category}] {title}",
+            "start": {"date": new_datetime.date().isoformat()},
+            "end": {"date": new_datetime.date().isoformat()},
+            "reminders": {
+                "useDefault": False,
+                "overrides": [
+                    {"method": "popup", "minutes": 60 * 24}
+                ]
+            }
+        }
 
-# ✅ 일정 수정 API 재시도 래퍼
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def update_calendar_event(calendar_service, event_id, event_body):
-    return calendar_service.events().patch(
-        calendarId="primary",
-        eventId=event_id,
-        body=event_body
-    ).execute()
+    return event_body
 
 # ✅ 메인 함수
-def update_schedule(origin_title: str, origin_date: str, new_date: str, category: str):
+async def update_schedule(origin_title: str, origin_date: str, new_date: str, category: str,
+                          target_event: Optional[dict] = None):
+    """
+    :param target_event: 원장에 기록된 이벤트 {"id", "start", "end"} — 주어지면 검색 없이 ID 로 바로 수정
+    """
     try:
         if not origin_date:
             logger.error("❌ origin_date 값이 비어 있습니다. 기존 일정을 찾을 수 없습니다.")
@@ -55,88 +80,58 @@ def update_schedule(origin_title: str, origin_date: str, new_date: str, category
         origin_day = datetime.fromisoformat(origin_date).date()
         new_datetime = datetime.fromisoformat(new_date)
 
+        # ✅ 원장(ledger)에 ID 가 있으면 바로 수정, 외부에서 지워졌으면 제목 검색으로 대체
+        if target_event is not None:
+            try:
+                updated_event = await update_calendar_event(
+                    target_event["id"],
+                    build_event_body(target_event, origin_title, new_datetime, category)
+                )
+                calendar_mirror.apply(updated_event)
+                schedule_cache.discard(target_event["id"])
+                schedule_cache.invalidate_event(updated_event)
+                logger.info(f"✅ 일정 수정 완료 (ID): '{origin_title}' → {new_date}")
+                return {"status": "success", "event_id": target_event["id"], "event": updated_event}
+            except HttpError as e:
+                if e.resp.status not in (404, 410):
+                    raise
+                logger.warning(f"⚠️ 원장의 일정 ID({target_event['id']})가 없어 제목으로 다시 찾습니다.")
+                calendar_mirror.discard(target_event["id"])
+
         time_min = f"{origin_day}T00:00:00+09:00"
         time_max = f"{origin_day}T23:59:59+09:00"
 
-        events_result = calendar_service.events().list(
-            calendarId="primary",
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy="startTime"
-        ).execute()
-
-        events = events_result.get("items", [])
-
-        # ✅ 다양한 형식으로 유사 제목 후보 생성
-        expected_variants = [
-            f"[{category}] {origin_title}",
-            origin_title,
-            f"{origin_title} [{category}]",
-            f"{origin_title} ({category})"
-        ]
-        expected_variants = [normalize_title(v) for v in expected_variants]
-
-        # ✅ 유사 제목 매칭 (부분 포함 허용)
-        target_event = next(
-            (
-                event for event in events
-                if any(variant in normalize_title(event.get("summary", "")) for variant in expected_variants)
-            ),
-            None
-        )
+        # ✅ 로컬 미러의 제목 유사도 색인에서 먼저 찾고, 없을 때만 목록 API 호출
+        calendar_mirror.ensure_started()
+        ranked = calendar_mirror.match(origin_title, origin_day.isoformat())
+        target_event = ranked[0][0] if ranked else None
+
+        if not target_event:
+            # 제목이 그대로 같은 일정이 나오면 남은 페이지는 받지 않음
+            events = {}
+            wanted = normalize_title(origin_title)
+            async for event in calendar_client.iter_events(
+                timeMin=time_min, timeMax=time_max, singleEvents=True, orderBy="startTime"
+            ):
+                events[event["id"]] = event
+                if normalize_title(event.get("summary", "")) == wanted:
+                    break
+            ranked = rank_titles(origin_title, ((event_id, event.get("summary", "")) for event_id, event in events.items()))
+            target_event = events[ranked[0][0]] if ranked else None
 
         if not target_event:
             logger.warning(f"⚠️ '{origin_title}' 일정({origin_date})을 찾을 수 없습니다.")
             return {"status": "fail", "reason": "event not found"}
 
-        event_id = target_event["id"]
-
-        # ✅ 기존 일정이 시간 기반인지 여부에 따라 분기
-        if "dateTime" in target_event["start"]:
-            old_start = datetime.fromisoformat(target_event["start"]["dateTime"])
-            old_end = datetime.fromisoformat(target_event["end"]["dateTime"])
-            duration = old_end - old_start
-
-            new_start = new_datetime
-            new_end = new_start + duration
-
-            event_body = {
-                "summary": f"[{category}] {origin_title}",
-                "start": {
-                    "dateTime": new_start.isoformat(),
-                    "timeZone": "Asia/Seoul"
-                },
-                "end": {
-                    "dateTime": new_end.isoformat(),
-                    "timeZone": "Asia/Seoul"
-                },
-                "reminders": {
-                    "useDefault": False,
-                    "overrides": [
-                        {"method": "popup", "minutes": 120},
-                        {"method": "popup", "minutes": 60 * 24 - 240}
-                    ]
-                }
-            }
-
-        else:
-            # 종일 일정
-            event_body = {
-                "summary": f"[{category}] {origin_title}",
-                "start": {"date": new_datetime.date().isoformat()},
-                "end": {"date": new_datetime.date().isoformat()},
-                "reminders": {
-                    "useDefault": False,
-                    "overrides": [
-                        {"method": "popup", "minutes": 60 * 24}
-                    ]
-                }
-            }
-
-        update_calendar_event(calendar_service, event_id, event_body)
-        logger.info(f"✅ 일정 수정 완료: '{origin_title}' → {new_date}")
-        return {"status": "success", "event_id": event_id}
+        updated_event = await update_calendar_event(
+            target_event["id"],
+            build_event_body(target_event, origin_title, new_datetime, category)
+        )
+        calendar_mirror.apply(updated_event)
+        schedule_cache.discard(target_event["id"])
+        schedule_cache.invalidate_event(updated_event)
+        logger.info(f"✅ 일정 수정 완료: '{origin_title}' → {new_date} (대상: '{target_event.get('summary', '')}', 유사도 {ranked[0][1]})")
+        return {"status": "success", "event_id": target_event["id"], "event": updated_event}
 
     except Exception as e:
         logger.error(f"❌ 일정 수정 중 오류 발생: {e}")
@@ -1,126 +1,195 @@
 import re
-import json
-import os
-from typing import Optional, Dict
-from openai import OpenAI
-
-# ✅ 클라이언트 객체 생성
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-def clarify_command(command: str) -> Dict[str, Optional[str]]:
-    def extract_command_details(command: str) -> Dict[str, Optional[str]]:
-        title_pattern = r'title:\s*(.+?)\s*(?:,|$)'
-        start_date_pattern = r'start_date:\s*(\d{4}-\d{2}-\d{2})'
-        origin_date_pattern = r'origin_date:\s*(\d{4}-\d{2}-\d{2})'
-        intent_pattern = r'intent:\s*(.+?)\s*(?:,|$)'
-        category_pattern = r'category:\s*(.+?)\s*(?:,|$)'
-        origin_title_pattern = r'origin_title:\s*(.+?)\s*(?:,|$)'
-
-        title_match = re.search(title_pattern, command)
-        start_date_match = re.search(start_date_pattern, command)
-        origin_date_match = re.search(origin_date_pattern, command)
-        intent_match = re.search(intent_pattern, command)
-        category_match = re.search(category_pattern, command)
-        origin_title_match = re.search(origin_title_pattern, command)
-
-        result = {
-            'title': title_match.group(1)[:20] if title_match else None,
-            'start_date': start_date_match.group(1) if start_date_match else None,
-            'origin_date': origin_date_match.group(1) if origin_date_match else None,
-            'intent': intent_match.group(1) if intent_match else None,
-            'category': category_match.group(1) if category_match else '기타',
-            'origin_title': origin_title_match.group(1) if origin_title_match else None
+import time
+import asyncio
+import logging
+from typing import Any, Optional, Dict, List, Tuple
+
+from tools.date_resolver import resolve_command, resolve_query, split_commands
+from tools.clarify_cache import clarify_cache
+from tools.gpt_parser import parse_command, parse_commands, is_complete, get_gpt_usage
+from tools.single_flight import SingleFlight
+from tools.metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+# ✅ 해석 경로별 처리 건수와 누적 소요 시간
+# (cache: 캐시 적중, regex: key:value 형식, rule: 규칙 해석기, gpt: GPT structured output)
+clarify_stats = {
+    source: {"count": 0, "seconds": 0.0}
+    for source in ("cache", "regex", "rule", "gpt")
+}
+
+clarify_flight = SingleFlight("clarify")
+
+
+def get_clarify_stats() -> Dict[str, Dict[str, Any]]:
+    stats = {
+        source: {
+            "count": stat["count"],
+            "seconds": round(stat["seconds"], 4),
+            "avg_seconds": round(stat["seconds"] / stat["count"], 4) if stat["count"] else 0.0
         }
-
-        if result['intent'] == 'register_schedule':
-            result['origin_title'] = None
-            result['origin_date'] = None
-
-        if not all(result.values()):
-            result = gpt_correction(command)
-
+        for source, stat in clarify_stats.items()
+    }
+    stats["cache"].update(clarify_cache.stats())
+    stats["single_flight"] = clarify_flight.stats()
+    stats["gpt_usage"] = get_gpt_usage()
+    return stats
+
+
+def _extract_fields(command: str) -> Dict[str, Optional[str]]:
+    """
+    "title: ..., start_date: ..." 처럼 key:value 로 적힌 명령을 그대로 읽습니다.
+    """
+    title_pattern = r'title:\s*(.+?)\s*(?:,|$)'
+    start_date_pattern = r'start_date:\s*(\d{4}-\d{2}-\d{2})'
+    origin_date_pattern = r'origin_date:\s*(\d{4}-\d{2}-\d{2})'
+    intent_pattern = r'intent:\s*(.+?)\s*(?:,|$)'
+    category_pattern = r'category:\s*(.+?)\s*(?:,|$)'
+    origin_title_pattern = r'origin_title:\s*(.+?)\s*(?:,|$)'
+
+    title_match = re.search(title_pattern, command)
+    start_date_match = re.search(start_date_pattern, command)
+    origin_date_match = re.search(origin_date_pattern, command)
+    intent_match = re.search(intent_pattern, command)
+    category_match = re.search(category_pattern, command)
+    origin_title_match = re.search(origin_title_pattern, command)
+
+    result = {
+        'title': title_match.group(1)[:20] if title_match else None,
+        'start_date': start_date_match.group(1) if start_date_match else None,
+        'origin_date': origin_date_match.group(1) if origin_date_match else None,
+        'intent': intent_match.group(1) if intent_match else None,
+        'category': category_match.group(1) if category_match else '기타',
+        'origin_title': origin_title_match.group(1) if origin_title_match else None
+    }
+
+    if result['intent'] == 'register_schedule':
+        result['origin_title'] = None
+        result['origin_date'] = None
+    return result
+
+
+async def _resolve_local(command: str) -> Optional[Dict[str, Optional[str]]]:
+    """
+    GPT 없이 해석합니다. (cache → regex → rule 순서)
+    :return: 해석 결과, 로컬에서 풀 수 없으면 None
+    """
+    result = await clarify_cache.get(command)
+    if result is not None:
+        result["source"] = "cache"
         return result
 
-    def gpt_correction(command: str) -> Dict[str, Optional[str]]:
-        today = "2025-05-19"  # 기준일 고정
-        tomorrow = "2025-05-20"
-        day_after_tomorrow = "2025-05-21"
-
-        prompt = f"""
-오늘 날짜는 {today}야.
-너는 일정관리 AI야.
-다음 명령어에서 title, start_date, origin_date, intent, category, origin_title 값을 추출해서 반드시 아래 JSON 형식 그대로 출력해줘.
-
-📌 intent 값은 반드시 아래 중 하나로만 써야 해:
-- "register_schedule"
-- "update_schedule"
-- "delete_schedule"
-
-📌 category 값은 반드시 아래 중 하나로 한글로만 써야 해:
-- 회의
-- 상담
-- 시공
-- 공사
-- 콘텐츠
-- 개인
-- 현장방문
-- 기타
-
-📌 날짜 해석 규칙 (매우 중요):
-- 오늘은 {today}
-- "내일"은 {tomorrow}
-- "모레", "내일모레"는 {day_after_tomorrow}
-- "어제", "그제"도 오늘을 기준으로 정확히 해석해
-- 절대 '내일모레 = 3일 후'처럼 해석하지 마
-
-❗ 주의사항:
-- "수정", "변경", "바꿔" 등이 포함된 문장은 intent가 "update_schedule"이야.
-- 이 경우 "등록된 일정" 앞에 나온 날짜와 제목은 origin_date, origin_title이야.
-- "으로 바꿔줘" 또는 "로 바꿔줘" 뒤에 나온 내용은 새로운 일정이야. → start_date, title
-
-명령어:
-{command}
-
-반드시 아래 형식처럼 JSON만 출력해:
-{{
-  "title": "...",
-  "start_date": "...",
-  "origin_date": "...",
-  "intent": "...",
-  "category": "...",
-  "origin_title": "..."
-}}
-"""
-
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt.strip()}],
-            temperature=0
-        )
-
-        gpt_result = response.choices[0].message.content.strip()
-        try:
-            result = json.loads(gpt_result)
-        except json.JSONDecodeError:
-            result = {
-                'title': None,
-                'start_date': None,
-                'origin_date': None,
-                'intent': None,
-                'category': '기타',
-                'origin_title': None
-            }
-
-        if result['title']:
-            result['title'] = result['title'][:20]
-
-        if not result['category']:
-            result['category'] = '기타'
-
-        if result['intent'] == 'register_schedule':
-            result['origin_title'] = None
-            result['origin_date'] = None
+    result = _extract_fields(command)
+    if is_complete(result):
+        result["source"] = "regex"
+        return result
 
+    # ✅ 규칙 기반 해석기로 확신할 수 있으면 GPT 호출 생략 (조회 명령은 여기서만 해석)
+    result = resolve_query(command) or resolve_command(command)
+    if result is None:
+        return None
+    result["source"] = "rule"
+    # ✅ 비용이 드는 경로(rule/gpt)의 완성된 결과만 캐시
+    if is_complete(result):
+        await clarify_cache.set(command, result)
+    return result
+
+
+def _record(source: str, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    stat = clarify_stats[source]
+    stat["count"] += 1
+    stat["seconds"] += elapsed
+    observe_stage(f"clarify_{source}", started)
+    logger.info(f"[clarify] {source} 경로로 해석 ({elapsed:.3f}초)")
+
+
+async def clarify_command(command: str) -> Dict[str, Optional[str]]:
+    async def resolve() -> Dict[str, Optional[str]]:
+        started = time.perf_counter()
+        result = await _resolve_local(command)
+        if result is None:
+            result = await parse_command(command)
+            result["source"] = "gpt"
+            if is_complete(result):
+                await clarify_cache.set(command, result)
+        _record(result["source"], started)
         return result
 
-    return extract_command_details(command)
+    # ✅ 같은 명령이 동시에 들어오면 해석(GPT 호출 포함)은 한 번만 하고 결과를 나눠 씀
+    return dict(await clarify_flight.do(clarify_cache.make_key(command), resolve))
+
+async def clarify_commands(command: str) -> List[Dict[str, Optional[str]]]:
+    """
+    한 메시지에 담긴 일정 명령을 모두 해석합니다.
+    "내일 10시 상담, 모레 시공, 금요일 현장방문 등록해줘" → 일정 3건
+    (일정 하나짜리 메시지는 길이 1 의 목록)
+    """
+    commands = split_commands(command)
+    if len(commands) == 1:
+        return [await clarify_command(command)]
+    logger.info(f"[clarify] 메시지 하나에서 일정 {len(commands)}건 분리")
+    return list(await asyncio.gather(*(clarify_command(part) for part in commands)))
+
+
+async def clarify_batch(commands: List[str]) -> List[Dict[str, Any]]:
+    """
+    여러 메시지를 한꺼번에 해석합니다. (가져올 명령 사전 검증용)
+    모든 명령이 먼저 로컬 경로(cache → regex → rule)를 거치고,
+    남은 명령만 중복을 없앤 뒤 묶어서 GPT 요청 몇 번으로 해석합니다.
+    :return: 입력 순서대로 {"index", "command", "status": "ok"/"error", "results": [일정별 결과], "errors": [...]}
+    """
+    items = [
+        {"index": index, "command": command,
+         "parts": split_commands(command) if isinstance(command, str) and command.strip() else []}
+        for index, command in enumerate(commands)
+    ]
+    positions = [(i, j) for i, item in enumerate(items) for j in range(len(item["parts"]))]
+    results: Dict[Tuple[int, int], Dict[str, Optional[str]]] = {}
+    errors: Dict[Tuple[int, int], str] = {}
+
+    started = time.perf_counter()
+    local = await asyncio.gather(*(_resolve_local(items[i]["parts"][j]) for i, j in positions))
+
+    pending: Dict[str, List[Tuple[int, int]]] = {}
+    for position, result in zip(positions, local):
+        if result is None:
+            pending.setdefault(items[position[0]]["parts"][position[1]], []).append(position)
+        else:
+            _record(result["source"], started)
+            results[position] = result
+
+    if pending:
+        logger.info(f"[clarify] 일괄 해석: {len(positions)}건 중 {len(pending)}건 GPT 로 전달")
+        gpt_started = time.perf_counter()
+        outcomes = await parse_commands(list(pending))
+        for (command, targets), (result, error) in zip(pending.items(), outcomes):
+            result["source"] = "gpt"
+            if error is None and is_complete(result):
+                await clarify_cache.set(command, result)
+            for position in targets:
+                _record("gpt", gpt_started)
+                results[position] = dict(result)
+                if error is not None:
+                    errors[position] = error
+
+    response = []
+    for i, item in enumerate(items):
+        parsed = [results[(i, j)] for j in range(len(item["parts"]))]
+        item_errors = [errors[(i, j)] for j in range(len(item["parts"])) if (i, j) in errors]
+        if not item["parts"]:
+            item_errors.append("명령이 비어 있습니다.")
+        item_errors.extend(
+            f"필수 필드 누락: {result.get('title') or item['parts'][j]}"
+            for j, result in enumerate(parsed)
+            if not is_complete(result) and (i, j) not in errors
+        )
+        response.append({
+            "index": item["index"],
+            "command": item["command"],
+            "status": "error" if item_errors else "ok",
+            "results": parsed,
+            "errors": item_errors,
+        })
+    return response
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Tuple
+
+from tools.date_resolver import KST, today_kst
+
+logger = logging.getLogger(__name__)
+
+# ✅ 캐시 설정 (CLARIFY_CACHE_PATH 를 비우면 메모리 전용)
+CLARIFY_CACHE_SIZE = int(os.getenv("CLARIFY_CACHE_SIZE", "1024"))
+CLARIFY_CACHE_TTL = float(os.getenv("CLARIFY_CACHE_TTL", str(6 * 3600)))
+CLARIFY_CACHE_PATH = os.getenv("CLARIFY_CACHE_PATH", "")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clarify_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def normalize_command(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+def _next_midnight_kst() -> float:
+    tomorrow = today_kst() + timedelta(days=1)
+    return datetime(tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=KST).timestamp()
+
+
+class ClarifyCache:
+    """
+    명령어 해석 결과 LRU 캐시.
+    키 = 네임스페이스 + 기준일(KST) + 정규화된 명령어 → "내일" 같은 상대 날짜는 자정에 자동 만료
+    """
+
+    def __init__(self, max_size: int = CLARIFY_CACHE_SIZE, ttl: float = CLARIFY_CACHE_TTL,
+                 path: str = CLARIFY_CACHE_PATH):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute("DELETE FROM clarify_cache WHERE expires_at < ?", (time.time(),))
+
+    def make_key(self, text: str, namespace: str = "clarify") -> str:
+        return f"{namespace}:{today_kst().isoformat()}:{normalize_command(text)}"
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def _put_memory(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def _get_disk(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM clarify_cache WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return row[1], json.loads(row[0])
+
+    def _put_disk(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO clarify_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at)
+            )
+
+    async def get(self, text: str, namespace: str = "clarify") -> Optional[Dict[str, Any]]:
+        key = self.make_key(text, namespace)
+        value = self._get_memory(key)
+
+        if value is None and self._conn is not None:
+            item = await asyncio.to_thread(self._get_disk, key)
+            if item is not None:
+                expires_at, value = item
+                self._put_memory(key, value, expires_at)
+                self.disk_hits += 1
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return dict(value)
+
+    async def set(self, text: str, value: Dict[str, Any], namespace: str = "clarify") -> None:
+        key = self.make_key(text, namespace)
+        expires_at = min(time.time() + self.ttl, _next_midnight_kst())
+        value = dict(value)
+        self._put_memory(key, value, expires_at)
+        if self._conn is not None:
+            await asyncio.to_thread(self._put_disk, key, value, expires_at)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "persistent": self._conn is not None
+        }
+
+
+clarify_cache = ClarifyCache()
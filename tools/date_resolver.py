@@ -0,0 +1,407 @@
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, List
+from zoneinfo import ZoneInfo
+
+KST = ZoneInfo("Asia/Seoul")
+
+WEEKDAYS = "월화수목금토일"
+
+# ✅ 상대 날짜 (오늘 기준 일수)
+RELATIVE_DAYS = {
+    "오늘": 0, "금일": 0,
+    "내일": 1, "명일": 1,
+    "모레": 2, "내일모레": 2,
+    "글피": 3,
+    "어제": -1,
+    "그제": -2, "그저께": -2,
+}
+
+# ✅ 주 단위 표현 (이번 주 기준 주 오프셋)
+WEEK_OFFSETS = {
+    "이번주": 0, "금주": 0,
+    "다음주": 1, "차주": 1,
+    "다다음주": 2,
+    "지난주": -1, "저번주": -1,
+}
+
+# ✅ 달 단위 표현 (이번 달 기준 달 오프셋)
+MONTH_OFFSETS = {
+    "이번달": 0, "이달": 0, "금월": 0,
+    "다음달": 1, "익월": 1,
+    "지난달": -1, "저번달": -1,
+}
+
+DATE_PATTERN = re.compile(
+    r"(?P<ymd>(?P<y>\d{4})\s*[-./년]\s*(?P<m>\d{1,2})\s*[-./월]\s*(?P<d>\d{1,2})\s*일?)"
+    r"|(?P<md>(?P<m2>\d{1,2})\s*월\s*(?P<d2>\d{1,2})\s*일)"
+    r"|(?P<slash>(?<![\d/])(?P<m3>\d{1,2})/(?P<d3>\d{1,2})(?![\d/]))"
+    r"|(?P<after>(?P<n>\d{1,3})\s*(?P<unit>일|주)\s*(?:후|뒤))"
+    r"|(?P<week>(?:(?P<wk>이번\s*주|금주|다음\s*주|차주|다다음\s*주|지난\s*주|저번\s*주)\s*)?(?P<wd>[월화수목금토일])요일)"
+    r"|(?P<rel>내일모레|그저께|오늘|금일|내일|명일|모레|글피|어제|그제)"
+)
+
+TIME_PATTERN = re.compile(
+    r"(?:(?P<ampm>오전|오후|아침|낮|저녁|밤|새벽)\s*)?"
+    r"(?:(?P<h>\d{1,2})\s*시(?:\s*(?P<mi>\d{1,2})\s*분|\s*(?P<half>반))?|(?P<hh>\d{1,2}):(?P<mm>\d{2}))"
+    r"|(?P<noon>정오)"
+)
+
+INTENT_KEYWORDS = {
+    "update_schedule": ["수정", "변경", "바꿔", "바꾸", "옮겨", "옮기", "미뤄", "미루", "당겨", "연기"],
+    "delete_schedule": ["삭제", "취소", "지워", "지우", "없애", "빼줘"],
+    "register_schedule": ["등록", "추가", "잡아", "넣어", "만들어", "예약"],
+}
+
+# ✅ 카테고리 키워드 (앞에 있을수록 우선)
+CATEGORY_KEYWORDS = [
+    ("현장방문", ["현장방문", "현장 방문", "실측", "답사"]),
+    ("시공", ["시공"]),
+    ("공사", ["공사"]),
+    ("상담", ["상담"]),
+    ("회의", ["회의", "미팅"]),
+    ("콘텐츠", ["콘텐츠", "컨텐츠", "촬영", "릴스", "블로그", "유튜브"]),
+    ("개인", ["개인", "병원", "운동"]),
+]
+
+# ✅ 제목에서 걷어낼 군더더기 (의도 동사, 조사, 요청 표현)
+FILLER_PATTERN = re.compile(
+    r"(등록된|등록돼\s*있는|잡혀\s*있는|일정|스케줄|"
+    r"(?:등록|추가|수정|변경|삭제|취소|예약)\s*(?:해\s*줘|해\s*주세요|해|좀|요)?|"
+    r"바꿔\s*(?:줘|주세요)?|바꾸기|옮겨\s*(?:줘|주세요)?|미뤄\s*(?:줘|주세요)?|당겨\s*(?:줘|주세요)?|"
+    r"지워\s*(?:줘|주세요)?|없애\s*(?:줘|주세요)?|빼\s*줘|잡아\s*(?:줘|주세요)?|넣어\s*(?:줘|주세요)?|"
+    r"만들어\s*(?:줘|주세요)?|연기\s*(?:해\s*줘)?|부탁해|부탁합니다|해\s*줘|주세요|좀)"
+)
+# ✅ 조회 명령: 기간(주·달) 표현과 문장 끝의 "일정 (알려줘/뭐야/?)" 부분
+PERIOD_PATTERN = re.compile(
+    r"(?P<wk>이번\s*주|금주|다다음\s*주|다음\s*주|차주|지난\s*주|저번\s*주)(?!\s*[월화수목금토일]요일)"
+    r"|(?P<mo>이번\s*달|이달|금월|다음\s*달|익월|지난\s*달|저번\s*달)"
+)
+QUERY_PATTERN = re.compile(
+    r"(?:일정|스케줄)\s*(?:이|은|좀|들)?\s*"
+    r"(?P<ask>(?:뭐|무엇)\s*(?:야|있어|있지|있나요?|예요|에요|인가요?)?|(?:알려|보여)\s*(?:줘|주세요|줄래)?|"
+    r"(?:확인|조회)\s*(?:해\s*줘|해\s*주세요|해)?|있어|있나요?|있니)?\s*(?P<mark>\?)?$"
+)
+QUERY_FILLER_PATTERN = re.compile(r"전체|전부|모든|등록된|잡힌|잡혀\s*있는|\s(?:의|에|에는)(?=\s|$)")
+# ✅ 한 메시지 안의 여러 일정 구분자
+SEGMENT_PATTERN = re.compile(r"\s*(?:[,;\n]|\s그리고\s|\s및\s)\s*")
+# 구분자 뒤에 남는 접속어 (", 그리고 글피 시공 등록" → "글피 시공 등록")
+CONNECTIVE_PATTERN = re.compile(r"^\s*(?:그리고|및|또)\s+")
+PARTICLE_PATTERN = re.compile(r"\s(?:을|를|은|는|이|가|에|의|에서|으로|로)(?=\s|$)|(?<=\S)(?:을|를|에서)(?=\s|$)")
+
+
+@dataclass
+class DateSpan:
+    start: int
+    end: int
+    day: date
+    hour: Optional[int] = None
+    minute: int = 0
+    ambiguous: bool = False  # "3시", "밤 12시" 처럼 규칙만으로 시각을 확정할 수 없는 시간
+
+    def isoformat(self) -> str:
+        if self.hour is None:
+            return self.day.isoformat()
+        return datetime(self.day.year, self.day.month, self.day.day, self.hour, self.minute).isoformat()
+
+
+def today_kst() -> date:
+    """
+    Asia/Seoul 기준 오늘 날짜
+    """
+    return datetime.now(KST).date()
+
+
+def _resolve_date(match: re.Match, today: date) -> Optional[date]:
+    try:
+        if match.group("ymd"):
+            return date(int(match.group("y")), int(match.group("m")), int(match.group("d")))
+        if match.group("md"):
+            return date(today.year, int(match.group("m2")), int(match.group("d2")))
+        if match.group("slash"):
+            return date(today.year, int(match.group("m3")), int(match.group("d3")))
+    except ValueError:
+        return None
+
+    if match.group("after"):
+        n = int(match.group("n"))
+        return today + timedelta(days=n * (7 if match.group("unit") == "주" else 1))
+
+    if match.group("week"):
+        weekday = WEEKDAYS.index(match.group("wd"))
+        week_word = match.group("wk")
+        if week_word:
+            offset = WEEK_OFFSETS[re.sub(r"\s+", "", week_word)]
+            monday = today - timedelta(days=today.weekday())
+            return monday + timedelta(weeks=offset, days=weekday)
+        # 요일만 있으면 오늘 이후 가장 가까운 해당 요일
+        return today + timedelta(days=(weekday - today.weekday()) % 7)
+
+    return today + timedelta(days=RELATIVE_DAYS[match.group("rel")])
+
+
+def _resolve_time(match: re.Match) -> Optional[tuple]:
+    """
+    :return: (시, 분, 애매한지), 없는 시각이면 None
+    애매한 시간은 GPT 가 문맥으로 판단하도록 넘깁니다.
+    - 오전/오후 없는 1~12시 (13시 이상·0시만 확정)
+    - 자정 전후: "밤 12시", "오전 12시", "밤 1시" 처럼 0시 근처라 날짜까지 달라질 수 있는 시간
+    """
+    if match.group("noon"):
+        return 12, 0, False
+
+    if match.group("hh"):
+        hour, minute = int(match.group("hh")), int(match.group("mm"))
+    else:
+        hour = int(match.group("h"))
+        minute = 30 if match.group("half") else int(match.group("mi") or 0)
+    if hour > 23 or minute > 59:
+        return None
+
+    ampm = match.group("ampm")
+    if ampm is None:
+        return hour, minute, 1 <= hour <= 12
+    if hour == 12:
+        # 오후·낮 12시만 정오
+        return hour, minute, ampm not in ("오후", "낮")
+    if ampm in ("저녁", "밤") and hour < 6:
+        return hour, minute, True
+    if ampm in ("오후", "저녁", "밤") and hour < 12:
+        hour += 12
+    elif ampm == "낮" and hour < 6:
+        hour += 12
+    return hour, minute, False
+
+
+def find_datetimes(text: str, today: Optional[date] = None) -> Optional[List[DateSpan]]:
+    """
+    문장 속 날짜/시간 표현을 찾아 위치와 함께 반환합니다.
+    시간만 있는 표현은 바로 앞 날짜에 붙이고, 떨어져 있으면 앞 날짜(없으면 오늘)를 따릅니다.
+    해석할 수 없는 표현(없는 날짜, 25시 등)이 있으면 None
+    """
+    today = today or today_kst()
+    spans: List[DateSpan] = []
+
+    for match in DATE_PATTERN.finditer(text):
+        day = _resolve_date(match, today)
+        if day is None:
+            return None
+        spans.append(DateSpan(match.start(), match.end(), day))
+
+    for match in TIME_PATTERN.finditer(text):
+        resolved = _resolve_time(match)
+        if resolved is None:
+            return None
+        hour, minute, ambiguous = resolved
+
+        previous = next((s for s in reversed(spans) if s.end <= match.start()), None)
+        if previous and previous.hour is None and not text[previous.end:match.start()].strip():
+            previous.end = match.end()
+            previous.hour, previous.minute, previous.ambiguous = hour, minute, ambiguous
+        else:
+            day = previous.day if previous else today
+            spans.append(DateSpan(match.start(), match.end(), day, hour, minute, ambiguous))
+
+    return sorted(spans, key=lambda s: s.start)
+
+
+def _intent_keywords(text: str) -> List[str]:
+    text = re.sub(r"등록된|등록돼\s*있는", " ", text)
+    return [
+        intent for intent, keywords in INTENT_KEYWORDS.items()
+        if any(keyword in text for keyword in keywords)
+    ]
+
+
+def detect_intent(text: str) -> Optional[str]:
+    found = _intent_keywords(text)
+    if len(found) == 1:
+        return found[0]
+    if not found:
+        return "register_schedule"  # 동사 없이 "내일 3시 상담" 처럼 쓰면 등록
+    return None
+
+
+def detect_category(text: str) -> str:
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return category
+    return "기타"
+
+
+def clean_title(text: str) -> str:
+    text = FILLER_PATTERN.sub(" ", text)
+    text = re.sub(r"[,.!?~]", " ", text)
+    text = PARTICLE_PATTERN.sub(" ", f" {text} ")
+    return " ".join(text.split())[:20]
+
+
+def _strip_spans(text: str, spans: List[DateSpan]) -> str:
+    for span in sorted(spans, key=lambda s: s.start, reverse=True):
+        text = text[:span.start] + " " + text[span.end:]
+    return text
+
+
+def resolve_command(command: str, today: Optional[date] = None) -> Optional[Dict[str, Optional[str]]]:
+    """
+    규칙 기반으로 명령어를 해석합니다. 모든 필드를 확신할 수 있을 때만 결과를 반환하고,
+    애매하면 None 을 반환해 GPT 보정으로 넘깁니다.
+    """
+    text = " ".join(command.split())
+    spans = find_datetimes(text, today)
+    if not spans or any(span.ambiguous for span in spans):
+        return None  # 애매한 시간(오전/오후 없음, 자정 전후)은 GPT 가 문맥으로 판단
+
+    intent = detect_intent(text)
+    if intent is None:
+        return None
+
+    category = detect_category(text)
+    result = {
+        "title": None,
+        "start_date": None,
+        "origin_date": None,
+        "intent": intent,
+        "category": category,
+        "origin_title": None,
+    }
+
+    if intent == "update_schedule":
+        # "<기존 날짜> <기존 제목> ... <새 날짜> (<새 제목>)(으)로 바꿔줘"
+        if len(spans) != 2:
+            return None
+        origin, new = spans
+        target = re.match(r"\s*(.*?)\s*(?:으로|로)(?:\s|$)", text[new.end:])
+        if target is None:
+            return None
+
+        origin_title = clean_title(text[:origin.start] + " " + text[origin.end:new.start])
+        new_title = clean_title(target.group(1)) or origin_title
+        if not origin_title:
+            return None
+
+        result.update(
+            origin_title=origin_title,
+            origin_date=origin.isoformat(),
+            title=new_title,
+            start_date=new.isoformat(),
+        )
+        return result
+
+    if len(spans) != 1:
+        return None
+
+    title = clean_title(_strip_spans(text, spans))
+    if not title:
+        return None
+
+    result.update(title=title, start_date=spans[0].isoformat())
+    return result
+
+
+def _period(match: re.Match, today: date) -> tuple:
+    if match.group("wk"):
+        monday = today - timedelta(days=today.weekday())
+        monday += timedelta(weeks=WEEK_OFFSETS[re.sub(r"\s+", "", match.group("wk"))])
+        return monday, monday + timedelta(days=6)
+
+    offset = MONTH_OFFSETS[re.sub(r"\s+", "", match.group("mo"))]
+    year, month = divmod(today.year * 12 + today.month - 1 + offset, 12)
+    first = date(year, month + 1, 1)
+    next_year, next_month = divmod(year * 12 + month + 1, 12)
+    return first, date(next_year, next_month + 1, 1) - timedelta(days=1)
+
+
+def resolve_query(command: str, today: Optional[date] = None) -> Optional[Dict[str, Optional[str]]]:
+    """
+    "오늘 일정", "이번 주 시공 일정 알려줘", "5월 20일 일정 뭐야?" 같은 조회 명령을 해석합니다.
+    기간·카테고리 말고 다른 말(제목 등)이 섞여 있거나 쓰기 동사가 있으면 None
+    :return: start_date ~ end_date (양끝 포함), category 가 None 이면 전체
+    """
+    today = today or today_kst()
+    text = " ".join(command.split())
+    tail = QUERY_PATTERN.search(text)
+    if tail is None:
+        return None
+    rest = text[:tail.start()]
+    if any(keyword in rest for keywords in INTENT_KEYWORDS.values() for keyword in keywords):
+        return None
+
+    period = PERIOD_PATTERN.search(rest)
+    if period:
+        first, last = _period(period, today)
+        rest = rest[:period.start()] + " " + rest[period.end():]
+    else:
+        spans = find_datetimes(rest, today)
+        if spans is None or len(spans) > 1 or (spans and spans[0].hour is not None):
+            return None
+        if not spans and not (tail.group("ask") or tail.group("mark")):
+            return None  # "일정" 한 단어만으로는 조회로 보지 않음
+        first = last = spans[0].day if spans else today
+        rest = _strip_spans(rest, spans)
+
+    category = None
+    for name, keywords in CATEGORY_KEYWORDS:
+        for keyword in keywords:
+            if keyword in rest:
+                category = category or name
+                rest = rest.replace(keyword, " ")
+    if QUERY_FILLER_PATTERN.sub(" ", f" {rest} ").strip():
+        return None
+
+    return {
+        "title": None,
+        "start_date": first.isoformat(),
+        "end_date": last.isoformat(),
+        "origin_date": None,
+        "intent": "query_schedule",
+        "category": category,
+        "origin_title": None,
+    }
+
+
+def _intent_phrase(text: str) -> Optional[str]:
+    """
+    문장 끝의 의도 표현("삭제해줘", "등록해 주세요" 등)을 잘라 냅니다.
+    """
+    stripped = re.sub(r"등록된|등록돼\s*있는", lambda m: " " * len(m.group()), text)
+    positions = [
+        stripped.find(keyword)
+        for keywords in INTENT_KEYWORDS.values()
+        for keyword in keywords
+        if keyword in stripped
+    ]
+    if not positions:
+        return None
+    return text[min(positions):].strip()
+
+
+def split_commands(command: str, today: Optional[date] = None) -> List[str]:
+    """
+    "내일 10시 상담, 모레 시공, 금요일 현장방문 등록해줘" 처럼 여러 일정을 담은 메시지를
+    일정별 명령어로 나눕니다. 마지막 조각의 의도 표현은 동사가 없는 앞 조각들에도 붙입니다.
+    - 조회·수정 메시지는 나누지 않음 (여러 날짜가 명령 하나에 속함: "오늘 및 내일 일정", "18일 상담 20일로 바꿔줘")
+    - 조각마다 날짜와 등록/삭제 동사(자기 것 또는 마지막 조각에서 붙인 것)가 있을 때만 나눔
+    나눌 수 없으면 원문 하나를 그대로 돌려줍니다.
+    """
+    text = " ".join(command.split())
+    if QUERY_PATTERN.search(text) or "update_schedule" in _intent_keywords(text):
+        return [command]
+
+    segments = [CONNECTIVE_PATTERN.sub("", segment) for segment in SEGMENT_PATTERN.split(command.strip())]
+    segments = [segment for segment in segments if segment.strip()]
+    if len(segments) < 2:
+        return [command]
+    if not all(find_datetimes(segment, today) for segment in segments):
+        return [command]
+
+    trailing = _intent_phrase(segments[-1])
+    commands = []
+    for segment in segments:
+        if trailing and _intent_phrase(segment) is None:
+            segment = f"{segment} {trailing}"
+        if _intent_keywords(segment) not in (["register_schedule"], ["delete_schedule"]):
+            return [command]
+        commands.append(segment)
+    return commands
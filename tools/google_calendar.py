@@ -0,0 +1,294 @@
+import os
+import json
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from tools.async_utils import authorized_http, paginate, run_blocking
+from tools.rate_limit import google_limiter, may_retry
+from tools.tenants import Tenant, TenantScoped
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ["https://www.googleapis.com/auth/calendar"]
+
+# ✅ 만료 몇 초 전에 미리 토큰을 갱신할지
+CALENDAR_TOKEN_REFRESH_MARGIN = float(os.getenv("CALENDAR_TOKEN_REFRESH_MARGIN", "300"))
+# 갱신 실패 시 재시도 간격 (초)
+CALENDAR_TOKEN_RETRY_INTERVAL = float(os.getenv("CALENDAR_TOKEN_RETRY_INTERVAL", "30"))
+
+# ✅ 쓰기 요청을 모아 batch HTTP 로 보낼 대기 시간 (초) / batch 당 최대 요청 수 (API 한도 50)
+CALENDAR_BATCH_WINDOW = float(os.getenv("CALENDAR_BATCH_WINDOW", "0.01"))
+CALENDAR_BATCH_MAX = 50
+
+# ✅ 목록 조회 시 기본으로 받을 이벤트 필드 (fields= 부분 응답)
+EVENT_FIELDS = "id,status,summary,start,end"
+
+
+class CalendarClient:
+    """
+    테넌트(팀) 하나의 Google Calendar 클라이언트. (calendar_client 가 테넌트별로 만들어 보관)
+    - 인증 정보 파싱과 discovery build 는 첫 사용 시 한 번만 수행 (import 시 부작용 없음)
+    - 백그라운드 스레드가 만료 전에 토큰을 미리 갱신 → 요청 처리 중에는 갱신 비용 없음
+    - 실제 HTTP 호출은 스레드별 AuthorizedHttp 로 실행되어 워커 스레드 간 공유해도 안전 (정리 시 함께 닫힘)
+    - 동시에 들어온 쓰기 요청(insert/patch/delete)은 batch HTTP 한 번으로 묶어 전송
+    - 모든 요청은 google_limiter 를 거쳐 한도 안에서 전송되고, 한도 초과/일시 오류는 재시도
+    """
+
+    def __init__(self, credentials_json: Optional[str] = None, calendar_id: str = "primary",
+                 name: str = "default"):
+        """
+        :param credentials_json: authorized user 인증 정보 JSON
+            (환경변수 GOOGLE_CALENDAR_CREDENTIALS 는 기본 테넌트를 만들 때만 읽음 — 다른 테넌트가 기본 팀 계정을 쓰지 않도록)
+        :param calendar_id: 이 테넌트의 일정을 쓰고 읽을 캘린더
+        """
+        self.name = name
+        self.calendar_id = calendar_id
+        self._credentials_json = credentials_json
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+        self._credentials = None
+        self._service = None
+        self._pending: List[Tuple[Callable[[Any], Any], asyncio.Future, bool]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+        # 스레드별 AuthorizedHttp — 클라이언트가 들고 있다가 정리(stop) 시 연결과 함께 놓음
+        self._local = threading.local()
+        self._https: List[Any] = []
+        self._https_lock = threading.Lock()
+
+    def _load_credentials(self):
+        from google.oauth2.credentials import Credentials
+
+        creds_json = self._credentials_json
+        if not creds_json:
+            logger.error(f"❌ [{self.name}] Google Calendar 인증 정보가 설정되지 않았습니다.")
+            raise RuntimeError("구글 인증 정보 누락")
+
+        try:
+            creds_data = json.loads(creds_json)
+        except json.JSONDecodeError:
+            logger.error(f"❌ [{self.name}] Google Calendar 인증 정보 JSON 형식 오류")
+            raise RuntimeError("Google Calendar 인증 정보 파싱 실패")
+
+        return Credentials.from_authorized_user_info(creds_data, SCOPES)
+
+    def _ensure_built(self) -> None:
+        if self._service is not None:
+            return
+        with self._lock:
+            if self._service is not None:
+                return
+            from googleapiclient.discovery import build
+
+            credentials = self._load_credentials()
+            if credentials.expired and credentials.refresh_token:
+                self._refresh(credentials)
+            self._credentials = credentials
+            self._service = build("calendar", "v3", credentials=credentials, cache_discovery=False)
+            logger.info(f"✅ [{self.name}] Google Calendar 클라이언트 초기화 완료")
+            self._start_refresher()
+
+    def _refresh(self, credentials) -> None:
+        from google.auth.transport.requests import Request
+
+        with self._refresh_lock:
+            try:
+                credentials.refresh(Request())
+                logger.info(f"🔄 [{self.name}] Google Calendar 토큰 갱신 완료")
+            except Exception as e:
+                logger.error(f"❌ [{self.name}] Google Calendar 토큰 갱신 실패: {e}")
+                raise RuntimeError("Google Calendar 인증 갱신 실패")
+
+    def _seconds_until_refresh(self) -> float:
+        expiry = self._credentials.expiry
+        if expiry is None:
+            return CALENDAR_TOKEN_RETRY_INTERVAL * 10
+        remaining = (expiry - datetime.utcnow()).total_seconds()
+        return max(0.0, remaining - CALENDAR_TOKEN_REFRESH_MARGIN)
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.is_set():
+            if self._stop.wait(self._seconds_until_refresh()):
+                return
+            try:
+                self._refresh(self._credentials)
+            except RuntimeError:
+                self._stop.wait(CALENDAR_TOKEN_RETRY_INTERVAL)
+
+    def _start_refresher(self) -> None:
+        if self._refresher is None and self._credentials.refresh_token:
+            self._stop.clear()
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name=f"calendar-token-refresh-{self.name}", daemon=True
+            )
+            self._refresher.start()
+
+    def warm_up(self) -> None:
+        """
+        서비스를 미리 만들어 둡니다. (PREWARM_BACKENDS 사용 시 백그라운드에서 호출)
+        """
+        self._ensure_built()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._refresher = None
+        with self._https_lock:
+            https, self._https = self._https, []
+            self._local = threading.local()
+        for http in https:
+            close = getattr(http, "close", None)
+            if close is not None:
+                close()
+
+    def _thread_http(self):
+        """
+        현재 스레드 전용 AuthorizedHttp (스레드마다 하나씩 재사용)
+        """
+        local = self._local
+        http = getattr(local, "http", None)
+        if http is None:
+            http = local.http = authorized_http(self.credentials)
+            with self._https_lock:
+                self._https.append(http)
+        return http
+
+    @property
+    def service(self):
+        self._ensure_built()
+        return self._service
+
+    @property
+    def credentials(self):
+        self._ensure_built()
+        return self._credentials
+
+    async def execute(self, make_request: Callable[[Any], Any], idempotent: bool = True) -> Any:
+        """
+        공유 스레드 풀에서 요청을 만들고 실행합니다.
+        첫 호출의 서비스 build 도 스레드에서 일어나 이벤트 루프를 막지 않습니다.
+        :param make_request: service 를 받아 실행 전 요청을 만드는 함수
+            예) lambda service: service.events().insert(calendarId=calendar_id, body=event)
+            스레드에서 실행되므로 calendar_id 등은 호출 전에 이벤트 루프에서 꺼내 둘 것
+        :param idempotent: ID 없이 만드는 insert 처럼 다시 보내면 중복될 수 있는 요청은 False
+        """
+        def run():
+            request = make_request(self.service)
+            return request.execute(http=self._thread_http())
+
+        return await google_limiter.run(lambda: run_blocking(run), idempotent=idempotent)
+
+    def iter_events(self, fields: str = EVENT_FIELDS, calendar_id: Optional[str] = None,
+                    **params: Any) -> AsyncIterator[Dict[str, Any]]:
+        """
+        events().list 결과를 nextPageToken 을 따라가며 하나씩 돌려줍니다.
+        이벤트마다 fields 에 적은 필드만 받고, 쓰는 쪽이 멈추면 남은 페이지는 요청하지 않습니다.
+        예) async for event in calendar_client.iter_events(timeMin=..., timeMax=..., singleEvents=True)
+        """
+        calendar_id = calendar_id or self.calendar_id
+
+        async def fetch_page(page_token: Optional[str]):
+            result = await self.execute(
+                lambda service: service.events().list(
+                    calendarId=calendar_id,
+                    pageToken=page_token,
+                    fields=f"nextPageToken,items({fields})",
+                    **params
+                )
+            )
+            return result.get("items", []), result.get("nextPageToken")
+
+        return paginate(fetch_page)
+
+    async def execute_batched(self, make_request: Callable[[Any], Any], idempotent: bool = True) -> Any:
+        """
+        execute 와 같지만, CALENDAR_BATCH_WINDOW 안에 함께 들어온 요청과 묶어
+        batch HTTP 한 번으로 보냅니다. (여러 일정을 담은 메시지 → 왕복 한 번)
+        요청별 오류(HttpError 등)는 해당 호출에만 그대로 전달됩니다.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((make_request, future, idempotent))
+        if len(self._pending) >= CALENDAR_BATCH_MAX:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(CALENDAR_BATCH_WINDOW, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.get_running_loop().create_task(self._send_batch(pending))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _send_batch(self, pending: List[Tuple[Callable[[Any], Any], asyncio.Future, bool]]) -> None:
+        # 한 건뿐이면 batch 봉투 없이 일반 요청으로
+        if len(pending) == 1:
+            make_request, future, idempotent = pending[0]
+            try:
+                result = await self.execute(make_request, idempotent)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            return
+
+        def run():
+            responses = {}
+
+            def callback(request_id, response, exception):
+                responses[request_id] = (response, exception)
+
+            batch = self.service.new_batch_http_request(callback=callback)
+            for i, (make_request, _, _) in enumerate(pending):
+                batch.add(make_request(self.service), request_id=str(i))
+            batch.execute(http=self._thread_http())
+            return responses
+
+        try:
+            # batch 안의 요청도 각각 한도에 포함되므로 건수만큼 토큰 사용
+            # 중복될 수 있는 요청이 하나라도 있으면 batch 전체를 그 기준으로 재시도
+            responses = await google_limiter.run(
+                lambda: run_blocking(run), tokens=len(pending),
+                idempotent=all(idempotent for _, _, idempotent in pending)
+            )
+        except Exception as e:
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"[calendar] batch 요청 {len(pending)}건 전송")
+        retry_later = []
+        for i, (make_request, future, idempotent) in enumerate(pending):
+            if future.done():  # 호출부가 시간 초과로 이미 포기한 요청
+                continue
+            response, exception = responses.get(str(i), (None, RuntimeError("batch 응답 누락")))
+            if exception is not None and may_retry(google_limiter.classify(exception), idempotent):
+                # batch 안에서 한도 초과/일시 오류가 난 요청만 개별로 재시도
+                retry_later.append((make_request, future, idempotent))
+            elif exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(response)
+
+        for item in retry_later:
+            await self._send_batch([item])
+
+
+def _build_calendar(tenant: Tenant) -> CalendarClient:
+    return CalendarClient(tenant.google_credentials, tenant.calendar_id, name=tenant.id)
+
+
+# ✅ 현재 테넌트의 CalendarClient (처음 쓸 때 만들고, 정리될 때 토큰 갱신 스레드 종료)
+calendar_client: "TenantScoped[CalendarClient]" = TenantScoped("calendar", _build_calendar, close=CalendarClient.stop)
@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.date_resolver import CATEGORY_KEYWORDS, WEEKDAYS, today_kst
+from tools.openai_client import get_openai
+from tools.rate_limit import openai_limiter
+
+logger = logging.getLogger(__name__)
+
+# ✅ 싼 모델부터 시도하고, 확신이 낮거나 검증에 실패하면 다음 모델로 (쉼표로 구분)
+GPT_PARSE_MODELS = [
+    model.strip() for model in os.getenv("GPT_PARSE_MODELS", "gpt-4o-mini,gpt-4o").split(",") if model.strip()
+]
+GPT_MIN_CONFIDENCE = float(os.getenv("GPT_MIN_CONFIDENCE", "0.7"))
+# ✅ 일괄 해석 시 GPT 요청 하나에 담을 최대 명령 수
+GPT_BATCH_SIZE = int(os.getenv("GPT_BATCH_SIZE", "40"))
+
+INTENTS = ["register_schedule", "update_schedule", "delete_schedule"]
+CATEGORIES = [name for name, _ in CATEGORY_KEYWORDS] + ["기타"]
+
+REQUIRED_FIELDS = {
+    "register_schedule": ("title", "start_date"),
+    "delete_schedule": ("title", "start_date"),
+    "update_schedule": ("title", "start_date", "origin_title", "origin_date"),
+    "query_schedule": ("start_date", "end_date"),  # 조회는 규칙 해석기에서만 나옴
+}
+
+_NULLABLE_STRING = {"type": ["string", "null"]}
+
+# ✅ 응답 형식 (structured output 으로 강제 → 자유 형식 JSON 파싱 실패 없음)
+COMMAND_SCHEMA = {
+    "name": "schedule_command",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "intent": {"type": ["string", "null"], "enum": INTENTS + [None]},
+            "title": _NULLABLE_STRING,
+            "start_date": _NULLABLE_STRING,
+            "origin_title": _NULLABLE_STRING,
+            "origin_date": _NULLABLE_STRING,
+            "category": {"type": "string", "enum": CATEGORIES},
+            "confidence": {"type": "number"},
+        },
+        "required": ["intent", "title", "start_date", "origin_title", "origin_date", "category", "confidence"],
+        "additionalProperties": False,
+    },
+}
+
+# ✅ 여러 명령을 한 번에: 같은 필드 + 입력 번호(index)
+BATCH_SCHEMA = {
+    "name": "schedule_commands",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    **COMMAND_SCHEMA["schema"],
+                    "properties": {"index": {"type": "integer"}, **COMMAND_SCHEMA["schema"]["properties"]},
+                    "required": ["index"] + COMMAND_SCHEMA["schema"]["required"],
+                },
+            },
+        },
+        "required": ["results"],
+        "additionalProperties": False,
+    },
+}
+
+# ✅ 모든 요청이 같은 시스템 프롬프트를 써서 접두부 캐시가 적중하도록, 날짜는 사용자 메시지에만
+SYSTEM_PROMPT = f"""한국어 일정 명령을 구조화한다.
+- intent: 등록/추가 → register_schedule, 수정/변경/옮겨 → update_schedule, 삭제/취소 → delete_schedule
+- 날짜는 주어진 오늘 날짜(Asia/Seoul) 기준으로 해석: 내일=+1일, 모레·내일모레=+2일, 요일만 있으면 오늘 이후 가장 가까운 그 요일
+- start_date/origin_date: 시간이 있으면 YYYY-MM-DDTHH:MM:SS, 없으면 YYYY-MM-DD
+- update_schedule: "등록된 일정" 앞의 날짜·제목이 origin_date·origin_title, "(으)로 바꿔" 앞이 새 start_date·title (새 제목이 없으면 기존 제목)
+- register/delete 는 origin_* 를 null 로
+- title: 날짜·시간·동사를 뺀 일정 이름, 20자 이내
+- category: {", ".join(CATEGORIES)} 중 하나
+- confidence: 해석이 확실한 정도 0~1 (모호하면 낮게)"""
+
+# 일괄 해석은 단건 프롬프트 뒤에 규칙 한 줄만 덧붙임 (앞부분은 그대로 캐시 적중)
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+- 명령이 번호와 함께 여러 개 주어지면 번호마다 하나씩 빠짐없이 results 에 담고 index 에 그 번호를 쓴다"""
+
+# ✅ 모델별 누적 사용량
+gpt_usage: Dict[str, Dict[str, float]] = {}
+
+
+def is_complete(result: Dict[str, Optional[str]]) -> bool:
+    """
+    intent 에 필요한 필드가 모두 채워졌는지 확인합니다.
+    (등록/삭제는 origin_* 가 비어 있는 것이 정상)
+    """
+    required = REQUIRED_FIELDS.get(result.get("intent"))
+    return bool(required) and all(result.get(field) for field in required)
+
+
+def empty_result() -> Dict[str, Optional[str]]:
+    return {
+        "title": None,
+        "start_date": None,
+        "origin_date": None,
+        "intent": None,
+        "category": "기타",
+        "origin_title": None,
+    }
+
+
+def _validate(result: Dict[str, Any]) -> Optional[str]:
+    """
+    :return: 문제가 있으면 그 이유, 없으면 None
+    """
+    if not is_complete(result):
+        return "필수 필드 누락"
+    for field in ("start_date", "origin_date"):
+        if result.get(field):
+            try:
+                datetime.fromisoformat(result[field])
+            except ValueError:
+                return f"{field} 형식 오류: {result[field]}"
+    return None
+
+
+def _record_usage(model: str, usage, elapsed: float, escalated: bool) -> Dict[str, int]:
+    stat = gpt_usage.setdefault(model, {
+        "calls": 0, "escalations": 0, "prompt_tokens": 0, "cached_tokens": 0,
+        "completion_tokens": 0, "seconds": 0.0
+    })
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    stat["calls"] += 1
+    stat["escalations"] += int(escalated)
+    stat["prompt_tokens"] += prompt_tokens
+    stat["cached_tokens"] += cached_tokens
+    stat["completion_tokens"] += completion_tokens
+    stat["seconds"] += elapsed
+    return {"prompt_tokens": prompt_tokens, "cached_tokens": cached_tokens, "completion_tokens": completion_tokens}
+
+
+def get_gpt_usage() -> Dict[str, Dict[str, float]]:
+    return {
+        model: {**stat, "seconds": round(stat["seconds"], 4)}
+        for model, stat in gpt_usage.items()
+    }
+
+
+def _today_line(today: date) -> str:
+    return f"오늘: {today.isoformat()} ({WEEKDAYS[today.weekday()]})"
+
+
+async def _ask(model: str, content: str, schema: Dict[str, Any] = COMMAND_SCHEMA,
+               system: str = SYSTEM_PROMPT) -> Tuple[Dict[str, Any], Any]:
+    response = await openai_limiter.run(
+        lambda: get_openai().chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": content},
+            ],
+            response_format={"type": "json_schema", "json_schema": schema},
+            temperature=0
+        )
+    )
+    message = response.choices[0].message
+    if getattr(message, "refusal", None):
+        raise ValueError(f"응답 거부: {message.refusal}")
+    return json.loads(message.content), response.usage
+
+
+def _normalize(raw: Dict[str, Any]) -> Tuple[Dict[str, Optional[str]], float]:
+    """
+    GPT 응답 한 건 → (결과, confidence)
+    """
+    raw = dict(raw)
+    confidence = raw.pop("confidence", 0.0)
+    raw.pop("index", None)
+    result = {**empty_result(), **raw}
+    if result["title"]:
+        result["title"] = result["title"][:20]
+    if result["intent"] in ("register_schedule", "delete_schedule"):
+        result["origin_title"] = None
+        result["origin_date"] = None
+    return result, confidence
+
+
+async def parse_command(command: str, today: Optional[date] = None) -> Dict[str, Optional[str]]:
+    """
+    GPT structured output 으로 명령을 해석합니다.
+    GPT_PARSE_MODELS 순서대로 시도해, 검증을 통과하고 confidence 가 GPT_MIN_CONFIDENCE 이상이면 바로 반환합니다.
+    끝까지 기준을 못 넘으면 검증을 통과한 마지막 결과를, 그것도 없으면 빈 결과를 반환합니다.
+    """
+    today = today or today_kst()
+    fallback: Optional[Dict[str, Optional[str]]] = None
+    usage_log: List[str] = []
+
+    for tier, model in enumerate(GPT_PARSE_MODELS):
+        started = time.perf_counter()
+        try:
+            raw, usage = await _ask(model, f"{_today_line(today)}\n명령: {command}")
+        except (ValueError, json.JSONDecodeError) as e:
+            logger.warning(f"[gpt_parser] {model} 응답 해석 실패: {e}")
+            continue
+        tokens = _record_usage(model, usage, time.perf_counter() - started, escalated=tier > 0)
+        usage_log.append(f"{model}={tokens['prompt_tokens']}+{tokens['completion_tokens']}")
+
+        result, confidence = _normalize(raw)
+        problem = _validate(result)
+        if problem is None:
+            fallback = result
+            if confidence >= GPT_MIN_CONFIDENCE:
+                logger.info(f"[gpt_parser] {model} 해석 (confidence {confidence:.2f}, tokens {', '.join(usage_log)})")
+                return result
+            problem = f"confidence {confidence:.2f} < {GPT_MIN_CONFIDENCE}"
+        logger.info(f"[gpt_parser] {model} 결과 보류 ({problem}) → 다음 모델")
+
+    if fallback is None:
+        logger.error(f"[gpt_parser] 모든 모델에서 해석 실패: {command} (tokens {', '.join(usage_log) or '-'})")
+        return empty_result()
+    logger.info(f"[gpt_parser] 확신 낮은 결과 사용 (tokens {', '.join(usage_log)})")
+    return fallback
+
+
+async def _ask_batch(model: str, commands: List[str], today: date) -> Tuple[Dict[int, Dict[str, Any]], Any, float]:
+    """
+    :return: ({입력 번호: 응답 한 건}, usage, 소요 시간)
+    """
+    started = time.perf_counter()
+    lines = "\n".join(f"{i}. {command}" for i, command in enumerate(commands))
+    raw, usage = await _ask(model, f"{_today_line(today)}\n명령:\n{lines}", BATCH_SCHEMA, BATCH_SYSTEM_PROMPT)
+    items = {
+        item["index"]: item for item in raw.get("results", [])
+        if isinstance(item.get("index"), int) and 0 <= item["index"] < len(commands)
+    }
+    return items, usage, time.perf_counter() - started
+
+
+async def parse_commands(commands: List[str], today: Optional[date] = None) -> List[Tuple[Dict[str, Optional[str]], Optional[str]]]:
+    """
+    여러 명령을 GPT_BATCH_SIZE 개씩 묶어 요청 몇 번으로 해석합니다. (묶음끼리는 동시에, 한도는 openai_limiter 가 조절)
+    단건 parse_command 와 같은 기준으로, 통과하지 못한 명령만 모아 다음 모델로 다시 묶어 보냅니다.
+    :return: 명령별 (결과, 오류 메시지) — 해석에 성공했으면 오류는 None
+    """
+    today = today or today_kst()
+    outcomes: List[Tuple[Dict[str, Optional[str]], Optional[str]]] = [
+        (empty_result(), "해석 실패") for _ in commands
+    ]
+    fallback: Dict[int, Dict[str, Optional[str]]] = {}
+    remaining = list(range(len(commands)))
+
+    for tier, model in enumerate(GPT_PARSE_MODELS):
+        if not remaining:
+            break
+        chunks = [remaining[i:i + GPT_BATCH_SIZE] for i in range(0, len(remaining), GPT_BATCH_SIZE)]
+        replies = await asyncio.gather(
+            *(_ask_batch(model, [commands[i] for i in chunk], today) for chunk in chunks),
+            return_exceptions=True
+        )
+
+        remaining = []
+        for chunk, reply in zip(chunks, replies):
+            if isinstance(reply, BaseException):
+                logger.warning(f"[gpt_parser] {model} 일괄 해석 실패 ({len(chunk)}건): {reply}")
+                for i in chunk:
+                    if i not in fallback:
+                        outcomes[i] = (empty_result(), f"GPT 호출 실패: {reply}")
+                remaining.extend(chunk)
+                continue
+
+            items, usage, elapsed = reply
+            tokens = _record_usage(model, usage, elapsed, escalated=tier > 0)
+            logger.info(
+                f"[gpt_parser] {model} 일괄 해석 {len(chunk)}건 "
+                f"(tokens {tokens['prompt_tokens']}+{tokens['completion_tokens']}, {elapsed:.3f}초)"
+            )
+            for position, i in enumerate(chunk):
+                raw = items.get(position)
+                if raw is None:
+                    problem = "응답 누락"
+                else:
+                    result, confidence = _normalize(raw)
+                    problem = _validate(result)
+                    if problem is None:
+                        fallback[i] = result
+                        if confidence >= GPT_MIN_CONFIDENCE:
+                            outcomes[i] = (result, None)
+                            continue
+                        problem = f"confidence {confidence:.2f} < {GPT_MIN_CONFIDENCE}"
+                # 확신 낮은 결과는 일단 채택하고 다음 모델에서 다시 시도
+                outcomes[i] = (fallback[i], None) if i in fallback else (empty_result(), problem)
+                remaining.append(i)
+
+    return outcomes
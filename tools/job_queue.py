@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ✅ 큐 설정 (환경변수로 조정 가능)
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.db")
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE = float(os.getenv("JOB_RETRY_BASE", "2"))
+JOB_RETRY_MAX = float(os.getenv("JOB_RETRY_MAX", "300"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+# ✅ 같은 update_id 재전송을 무시할 기간 (Telegram 은 최대 24시간 재전송) / 기억할 최대 건수
+DEDUP_WINDOW_SECONDS = float(os.getenv("DEDUP_WINDOW_SECONDS", str(24 * 3600)))
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "10000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, available_at);
+CREATE TABLE IF NOT EXISTS seen_updates (
+    update_id INTEGER PRIMARY KEY,
+    job_id INTEGER NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_seen_updates_age ON seen_updates (seen_at);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    payload: Dict[str, Any]
+    state: Dict[str, Any]
+    attempts: int
+    created_at: float
+
+
+class JobQueue:
+    """
+    SQLite 기반 영속 작업 큐.
+    /trigger 는 update 를 저장만 하고 즉시 응답하며, 워커가 큐를 비웁니다.
+    상태: pending → running → done | failed (재시도 시 다시 pending)
+    update_id 는 DEDUP_WINDOW_SECONDS 동안 (최대 DEDUP_MAX_ENTRIES 건) 기억해 재전송을 한 번만 처리합니다.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._ready = asyncio.Event()
+        self._since_prune = 0
+        self.duplicates = 0
+
+    # ✅ 동기 구현 (스레드에서 실행)
+    def _enqueue(self, payload: Dict[str, Any], dedup_key: Optional[int],
+                 state: Optional[Dict[str, Any]]) -> Tuple[int, bool]:
+        now = time.time()
+        with self._lock:
+            if dedup_key is not None:
+                row = self._conn.execute(
+                    "SELECT job_id FROM seen_updates WHERE update_id = ? AND seen_at >= ?",
+                    (dedup_key, now - DEDUP_WINDOW_SECONDS)
+                ).fetchone()
+                if row is not None:
+                    self.duplicates += 1
+                    return row["job_id"], False
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._conn.execute(
+                    "INSERT INTO jobs (payload, state, available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (json.dumps(payload, ensure_ascii=False), json.dumps(state or {}, ensure_ascii=False), now, now, now)
+                )
+                job_id = cur.lastrowid
+                if dedup_key is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO seen_updates (update_id, job_id, seen_at) VALUES (?, ?, ?)",
+                        (dedup_key, job_id, now)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._since_prune += 1
+            if self._since_prune >= 100:
+                self._prune_seen(now)
+            return job_id, True
+
+    def _prune_seen(self, now: float) -> None:
+        # 기간이 지났거나 최대 건수를 넘는 오래된 update_id 정리 (lock 보유 상태에서 호출)
+        self._conn.execute(
+            "DELETE FROM seen_updates WHERE seen_at < ? OR update_id IN ("
+            "SELECT update_id FROM seen_updates ORDER BY seen_at DESC LIMIT -1 OFFSET ?)",
+            (now - DEDUP_WINDOW_SECONDS, DEDUP_MAX_ENTRIES)
+        )
+        self._since_prune = 0
+
+    def _claim(self) -> Optional[Job]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' AND available_at <= ? "
+                "ORDER BY available_at, id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (now, row["id"])
+            )
+        return Job(
+            id=row["id"],
+            payload=json.loads(row["payload"]),
+            state=json.loads(row["state"]),
+            attempts=row["attempts"] + 1,
+            created_at=row["created_at"]
+        )
+
+    def _complete(self, job_id: int, state: Dict[str, Any], result: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', state = ?, result = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(state, ensure_ascii=False), json.dumps(result, ensure_ascii=False), time.time(), job_id)
+            )
+
+    def _retry(self, job: Job, state: Dict[str, Any], error: str) -> Optional[float]:
+        now = time.time()
+        with self._lock:
+            if job.attempts >= JOB_MAX_ATTEMPTS:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', state = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(state, ensure_ascii=False), error, now, job.id)
+                )
+                return None
+
+            # ✅ 지수 백오프 + 지터
+            delay = min(JOB_RETRY_MAX, JOB_RETRY_BASE * (2 ** (job.attempts - 1)))
+            delay = delay * (0.5 + random.random() / 2)
+            self._conn.execute(
+                "UPDATE jobs SET status = 'pending', state = ?, last_error = ?, available_at = ?, updated_at = ? "
+                "WHERE id = ?",
+                (json.dumps(state, ensure_ascii=False), error, now + delay, now, job.id)
+            )
+            return delay
+
+    def _recover(self) -> int:
+        # ✅ 재시작 전 처리 중이던 작업은 다시 대기열로
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'pending', available_at = ?, updated_at = ? WHERE status = 'running'",
+                (now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status = 'done' AND updated_at < ?",
+                (now - JOB_RETENTION_SECONDS,)
+            )
+            self._prune_seen(now)
+            return cur.rowcount
+
+    def _get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "last_error": row["last_error"],
+            "result": json.loads(row["result"]) if row["result"] else None
+        }
+
+    def _stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            counts = {
+                row["status"]: row["n"]
+                for row in self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+            }
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM jobs WHERE status IN ('pending', 'running')"
+            ).fetchone()[0]
+        return {
+            "depth": counts.get("pending", 0) + counts.get("running", 0),
+            "pending": counts.get("pending", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_age_seconds": round(now - oldest, 3) if oldest else 0.0,
+            "duplicates_dropped": self.duplicates
+        }
+
+    # ✅ 비동기 인터페이스
+    async def enqueue(self, payload: Dict[str, Any], dedup_key: Optional[int] = None,
+                      state: Optional[Dict[str, Any]] = None) -> Tuple[int, bool]:
+        """
+        :param dedup_key: Telegram update_id — 기간 안에 이미 받은 값이면 새 작업을 만들지 않음
+        :param state: 작업의 초기 상태 (예: 요청 ID)
+        :return: (작업 ID, 새로 만들었는지 여부)
+        """
+        job_id, created = await asyncio.to_thread(self._enqueue, payload, dedup_key, state)
+        if created:
+            self._ready.set()
+        return job_id, created
+
+    async def claim(self, wait: float = 1.0) -> Optional[Job]:
+        """
+        처리 가능한 작업을 하나 가져옵니다. 없으면 최대 wait 초 동안 새 작업을 기다립니다.
+        """
+        job = await asyncio.to_thread(self._claim)
+        if job is not None:
+            return job
+
+        self._ready.clear()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+        return None
+
+    async def complete(self, job_id: int, state: Dict[str, Any], result: Any) -> None:
+        await asyncio.to_thread(self._complete, job_id, state, result)
+
+    async def retry(self, job: Job, state: Dict[str, Any], error: str) -> Optional[float]:
+        """
+        실패한 작업을 백오프 후 재시도하도록 되돌립니다.
+        :return: 다음 시도까지의 지연(초). 최대 시도 횟수를 넘기면 None (failed 처리)
+        """
+        return await asyncio.to_thread(self._retry, job, state, error)
+
+    async def recover(self) -> int:
+        return await asyncio.to_thread(self._recover)
+
+    async def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def stats(self) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._stats)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,181 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from tools.tracing import record_span
+
+# ✅ 지연 시간 버킷 (초) — 로컬 캐시 적중부터 GPT/외부 API 재시도까지
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합별 [버킷별 개수..., +Inf 개수], 합계
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def _samples(self) -> Iterator[str]:
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), self._counts[key]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {self._sums[key]:.6f}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+# ✅ 파이프라인 지표 (값은 이벤트 루프에서만 기록 → 잠금 없이 dict 연산 몇 번)
+STAGE_SECONDS = Histogram(
+    "jarvis_stage_seconds", "Latency of each trigger pipeline stage", ("stage", "outcome")
+)
+STAGE_ERRORS = Counter(
+    "jarvis_stage_errors_total", "Errors per pipeline stage by error class", ("stage", "error")
+)
+BACKEND_SECONDS = Histogram(
+    "jarvis_backend_request_seconds", "Latency of each outbound backend call attempt", ("backend", "outcome")
+)
+BACKEND_ERRORS = Counter(
+    "jarvis_backend_errors_total", "Outbound backend call errors by error class", ("backend", "error")
+)
+RATE_LIMIT_WAIT = Histogram(
+    "jarvis_rate_limit_wait_seconds", "Time spent waiting for a rate limiter token", ("backend",)
+)
+QUEUE_WAIT = Histogram(
+    "jarvis_queue_wait_seconds", "Time from enqueue to first claim by a worker"
+)
+JOBS = Counter(
+    "jarvis_jobs_total", "Processed jobs by outcome", ("outcome",)
+)
+QUEUE_DEPTH = Gauge(
+    "jarvis_queue_depth", "Pending and running jobs"
+)
+RATE_LIMIT_WAITING = Gauge(
+    "jarvis_rate_limit_waiting", "Calls currently waiting for a rate limiter token", ("backend",)
+)
+
+
+def observe(histogram: Histogram, errors: Counter, span: str, started: float,
+            outcome: str = "ok", error: Optional[str] = None, **labels: str) -> None:
+    """
+    지연 시간(started 는 time.perf_counter() 기준)과 오류 클래스를 기록하고,
+    진행 중인 요청이 있으면 같은 구간을 trace span 으로도 남깁니다.
+    """
+    histogram.observe(time.perf_counter() - started, **labels, outcome=outcome)
+    if error:
+        errors.inc(**labels, error=error)
+    record_span(span, started, outcome, error)
+
+
+def observe_stage(stage: str, started: float, outcome: str = "ok", error: Optional[str] = None) -> None:
+    observe(STAGE_SECONDS, STAGE_ERRORS, stage, started, outcome, error, stage=stage)
+
+
+@contextmanager
+def track(histogram: Histogram, errors: Counter, span: str, **labels: str) -> Iterator[None]:
+    """
+    블록 실행 시간을 outcome(ok/error) 과 함께 기록하고, 예외는 클래스 이름으로 셉니다.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        observe(histogram, errors, span, started, "error", type(e).__name__, **labels)
+        raise
+    observe(histogram, errors, span, started, **labels)
+
+
+def track_stage(stage: str):
+    return track(STAGE_SECONDS, STAGE_ERRORS, stage, stage=stage)
+
+
+def track_backend(backend: str):
+    return track(BACKEND_SECONDS, BACKEND_ERRORS, f"{backend}.request", backend=backend)
+
+
+def render_metrics() -> str:
+    """
+    Prometheus text exposition format (0.0.4)
+    """
+    return "\n".join(metric.render() for metric in _registry) + "\n"
@@ -0,0 +1,72 @@
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import unquote
+
+from tools.async_utils import paginate
+from tools.rate_limit import notion_limiter
+from tools.tenants import Tenant, TenantScoped, current_tenant
+
+logger = logging.getLogger(__name__)
+
+
+def _build_client(tenant: Tenant):
+    from notion_client import AsyncClient
+    return AsyncClient(auth=tenant.notion_token)
+
+
+# ✅ Notion 클라이언트는 테넌트마다 첫 사용 시점에 생성합니다. (import 시 네트워크/환경변수 의존 없음)
+_client = TenantScoped("notion", lambda tenant: _build_client(tenant), close=lambda client: client.aclose())
+# 속성 이름 → 속성 ID (filter_properties 는 ID 로만 지정 가능, 첫 사용 시 데이터베이스 정보에서 읽음)
+_property_ids: "TenantScoped[Dict[str, str]]" = TenantScoped("notion_property_ids", lambda tenant: {})
+
+
+def get_notion():
+    """
+    현재 테넌트의 notion_client.AsyncClient (첫 호출 시 생성)
+    """
+    return _client.get()
+
+
+def get_database_id() -> str:
+    return current_tenant().notion_database_id
+
+
+async def get_property_ids() -> Dict[str, str]:
+    property_ids = _property_ids.get()
+    if not property_ids:
+        database = await notion_limiter.run(lambda: get_notion().databases.retrieve(database_id=get_database_id()))
+        # 응답의 ID 는 URL 인코딩된 값 → 쿼리 파라미터로 다시 인코딩되도록 원래 문자로
+        property_ids.update({name: unquote(prop["id"]) for name, prop in database.get("properties", {}).items()})
+    return property_ids
+
+
+async def query_database(filter: Optional[Dict[str, Any]] = None, sorts: Optional[List[Dict[str, Any]]] = None,
+                         properties: Optional[List[str]] = None, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+    """
+    일정 데이터베이스 조회 결과를 has_more / next_cursor 를 따라가며 하나씩 돌려줍니다.
+    :param properties: 받을 속성 이름 (filter_properties) — 없으면 모든 속성
+    :param page_size: 한 번에 받을 페이지 수 (최대 100, 하나만 필요하면 작게)
+    쓰는 쪽이 멈추면 남은 페이지는 요청하지 않습니다.
+    """
+    params: Dict[str, Any] = {"database_id": get_database_id(), "page_size": min(page_size, 100)}
+    if filter:
+        params["filter"] = filter
+    if sorts:
+        params["sorts"] = sorts
+    if properties:
+        try:
+            ids = await get_property_ids()
+        except Exception as e:
+            # 속성 ID 를 못 읽어도 조회는 그대로 (모든 속성을 받음)
+            logger.warning(f"⚠️ Notion 속성 ID 조회 실패, 전체 속성으로 조회: {e}")
+        else:
+            if all(name in ids for name in properties):
+                params["filter_properties"] = [ids[name] for name in properties]
+
+    async def fetch_page(cursor: Optional[str]):
+        page_params = {**params, "start_cursor": cursor} if cursor else params
+        result = await notion_limiter.run(lambda: get_notion().databases.query(**page_params))
+        return result.get("results", []), result.get("next_cursor") if result.get("has_more") else None
+
+    async for page in paginate(fetch_page):
+        yield page
@@ -0,0 +1,96 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from dateutil import parser
+
+from tools.notion_api import query_database
+from tools.notion_mirror import page_category, page_title
+from tools.title_match import distinctive_token, rank_titles, schedule_key, top_matches, TITLE_MATCH_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+
+def day_bounds(date_str: str) -> Tuple[datetime, datetime]:
+    date = parser.parse(date_str) if isinstance(date_str, str) else date_str
+    return (
+        date.replace(hour=0, minute=0, second=0, microsecond=0),
+        date.replace(hour=23, minute=59, second=59, microsecond=999999),
+    )
+
+
+def _date_filter(start_of_day: datetime, end_of_day: datetime) -> Dict[str, Any]:
+    return {
+        "property": "날짜",
+        "date": {
+            "on_or_after": start_of_day.isoformat(),
+            "on_or_before": end_of_day.isoformat()
+        }
+    }
+
+
+async def _query(conditions: List[Dict[str, Any]], limit: Optional[int] = None,
+                 properties: Tuple[str, ...] = ("일정 제목",)) -> List[Dict[str, Any]]:
+    pages = []
+    async for page in query_database(filter={"and": conditions}, properties=list(properties), page_size=limit or 100):
+        pages.append(page)
+        if limit and len(pages) >= limit:
+            break
+    return pages
+
+
+async def find_pages(title: str, date_str: str, min_score: float = TITLE_MATCH_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    그날 페이지 중 제목이 가장 비슷한 것들 (같은 제목 중복 등록분 모두)
+    - 날짜 범위 + 제목의 가장 특징적인 단어 title contains 를 서버에서 걸러 받고, 유사도 순위는 로컬에서
+    - 음성 인식 오타 등으로 그 단어가 들어간 페이지가 없으면 날짜 조건만으로 한 번 더 조회
+    """
+    start_of_day, end_of_day = day_bounds(date_str)
+    date_filter = _date_filter(start_of_day, end_of_day)
+    token = distinctive_token(title)
+
+    def best(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        by_id = {page["id"]: page for page in pages}
+        ranked = rank_titles(title, ((page_id, page_title(page)) for page_id, page in by_id.items()), min_score=min_score)
+        return [by_id[page_id] for page_id in top_matches(ranked)]
+
+    if token:
+        matched = best(await _query([date_filter, {"property": "일정 제목", "title": {"contains": token}}]))
+        if matched:
+            return matched
+        logger.debug(f"[notion_lookup] '{token}' 포함 페이지 없음 → 날짜 조건만으로 다시 조회: {title}")
+    return best(await _query([date_filter]))
+
+
+async def find_exact_pages(title: str, date_str: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    제목이 정확히 같은 그 날짜의 페이지 (가져오기를 이어서 실행할 때 이미 만든 페이지 확인용)
+    :param limit: 이만큼 찾으면 남은 페이지는 받지 않음
+    """
+    start_of_day, end_of_day = day_bounds(date_str)
+    return await _query(
+        [{"property": "일정 제목", "title": {"equals": title}}, _date_filter(start_of_day, end_of_day)],
+        limit=limit
+    )
+
+
+async def find_schedule_pages(title: str, category: Optional[str], date_str: str) -> List[Dict[str, Any]]:
+    """
+    삭제 대상: 그 날짜에서 카테고리 + 정규화 제목(schedule_key)이 정확히 같은 페이지
+    - 제목의 가장 특징적인 단어 title contains 로 서버에서 좁힌 뒤 로컬에서 정확 비교
+    - 그 단어로 찾지 못하면 날짜 조건만으로 한 번 더 조회 (띄어쓰기가 다르게 저장된 제목 등)
+    """
+    start_of_day, end_of_day = day_bounds(date_str)
+    date_filter = _date_filter(start_of_day, end_of_day)
+    key = schedule_key(title, category)
+    token = distinctive_token(title)
+
+    def exact(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [page for page in pages if schedule_key(page_title(page), page_category(page)) == key]
+
+    properties = ("일정 제목", "유형")
+    if token:
+        matched = exact(await _query([date_filter, {"property": "일정 제목", "title": {"contains": token}}],
+                                     properties=properties))
+        if matched:
+            return matched
+    return exact(await _query([date_filter], properties=properties))
@@ -0,0 +1,199 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Dict, List, Set, Tuple, Any
+
+from tools.date_resolver import KST
+from tools.notion_api import query_database
+from tools.tenants import TenantEvicted, TenantScoped, tenant_pool
+from tools.title_match import TitleIndex, TITLE_MATCH_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# 색인과 삭제 대상 확인(카테고리)에 필요한 속성만 받음
+_SYNC_PROPERTIES = ["일정 제목", "날짜", "유형"]
+
+# ✅ 증분 동기화 주기 / 전체 재동기화 주기 (초)
+NOTION_SYNC_INTERVAL = float(os.getenv("NOTION_SYNC_INTERVAL", "30"))
+NOTION_FULL_SYNC_INTERVAL = float(os.getenv("NOTION_FULL_SYNC_INTERVAL", "3600"))
+
+
+def page_title(page: Dict[str, Any]) -> str:
+    title_prop = page.get("properties", {}).get("일정 제목", {}).get("title", [])
+    return "".join(part.get("plain_text", "") for part in title_prop)
+
+
+def page_category(page: Dict[str, Any]) -> Optional[str]:
+    select = (page.get("properties", {}).get("유형", {}) or {}).get("select") or {}
+    return select.get("name")
+
+
+def page_date(page: Dict[str, Any]) -> Optional[str]:
+    date_prop = (page.get("properties", {}).get("날짜", {}) or {}).get("date") or {}
+    start = date_prop.get("start")
+    if not start:
+        return None
+    if "T" not in start:
+        return start[:10]
+    parsed = datetime.fromisoformat(start.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        return parsed.date().isoformat()
+    return parsed.astimezone(KST).date().isoformat()
+
+
+class NotionMirror:
+    """
+    Notion 일정 데이터베이스의 로컬 사본.
+    - last_edited_time 기준 증분 동기화 (보관 처리된 페이지는 주기적 전체 동기화로 정리)
+    - 날짜별 색인 + 제목 유사도 색인(TitleIndex) → 페이지 ID 를 로컬에서 찾고, 없을 때만 API 조회
+    """
+
+    def __init__(self):
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.by_date: Dict[str, Set[str]] = {}
+        self.titles = TitleIndex()
+        self.cursor: Optional[str] = None  # 마지막으로 본 last_edited_time
+        self.last_full_sync: Optional[float] = None
+        self._sync_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.last_full_sync is not None
+
+    # ✅ 색인 관리
+    def _unindex(self, page_id: str) -> None:
+        page = self.pages.pop(page_id, None)
+        if page is None:
+            return
+        self.titles.remove(page_id)
+        ids = self.by_date.get(page["date"])
+        if ids is not None:
+            ids.discard(page_id)
+            if not ids:
+                del self.by_date[page["date"]]
+
+    def _clear(self) -> None:
+        self.pages.clear()
+        self.by_date.clear()
+        self.titles.clear()
+
+    def apply(self, page: Dict[str, Any], from_sync: bool = False) -> None:
+        """
+        페이지 하나를 반영합니다. (동기화 결과와 우리가 직접 쓴 결과 모두 이 경로로)
+        증분 기준 시각은 동기화 결과로만 전진시켜, 그 사이 다른 사람의 수정을 놓치지 않습니다.
+        """
+        page_id = page.get("id")
+        if not page_id:
+            return
+        self._unindex(page_id)
+
+        edited = page.get("last_edited_time")
+        if from_sync and edited and (self.cursor is None or edited > self.cursor):
+            self.cursor = edited
+
+        if page.get("archived") or page.get("in_trash"):
+            return
+        day = page_date(page)
+        if day is None:
+            return
+
+        title = page_title(page)
+        self.pages[page_id] = {"id": page_id, "title": title, "date": day, "page": page}
+        self.by_date.setdefault(day, set()).add(page_id)
+        self.titles.add(page_id, title)
+
+    def discard(self, page_id: str) -> None:
+        self._unindex(page_id)
+
+    # ✅ 조회
+    def pages_on(self, day: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        해당 날짜의 페이지 목록 (Notion API 응답 형식). 아직 동기화 전이면 None
+        """
+        if not self.ready:
+            return None
+        return [self.pages[page_id]["page"] for page_id in self.by_date.get(day, ())]
+
+    def match(self, title: str, day: Optional[str] = None,
+              min_score: float = TITLE_MATCH_THRESHOLD) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        제목이 비슷한 페이지를 점수 높은 순으로 반환합니다. (day 를 주면 그 날짜 안에서만)
+        """
+        if not self.ready:
+            return []
+        within = self.by_date.get(day, set()) if day is not None else None
+        return [
+            (self.pages[page_id]["page"], score)
+            for page_id, score in self.titles.search(title, within=within, min_score=min_score)
+        ]
+
+    # ✅ 동기화
+    async def _query_all(self, query_filter: Optional[Dict[str, Any]] = None) -> int:
+        count = 0
+        async for page in query_database(filter=query_filter, properties=_SYNC_PROPERTIES):
+            self.apply(page, from_sync=True)
+            count += 1
+        return count
+
+    async def sync(self, full: bool = False) -> None:
+        async with self._sync_lock:
+            started = time.perf_counter()
+            full = full or not self.ready or time.time() - self.last_full_sync > NOTION_FULL_SYNC_INTERVAL
+            if full:
+                sync_started_at = datetime.now(timezone.utc).isoformat()
+                self._clear()
+                self.cursor = None
+                self.last_full_sync = None
+                count = await self._query_all()
+                self.cursor = self.cursor or sync_started_at
+                self.last_full_sync = time.time()
+            else:
+                count = await self._query_all({
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": self.cursor}
+                })
+
+            logger.debug(
+                f"[notion_mirror] {'전체' if full else '증분'} 동기화 완료: "
+                f"{count}건 수신, {len(self.pages)}건 보유 ({time.perf_counter() - started:.3f}초)"
+            )
+
+    async def _sync_loop(self) -> None:
+        # 요청이 아니므로 테넌트를 사용 중으로 치지 않음 → 유휴 테넌트는 그대로 정리되고, 정리되면 루프 종료
+        with tenant_pool.background():
+            while notion_mirror.peek() is self:
+                try:
+                    await self.sync()
+                except asyncio.CancelledError:
+                    raise
+                except TenantEvicted:
+                    break
+                except Exception as e:
+                    logger.error(f"❌ Notion 미러 동기화 실패: {e}")
+                await asyncio.sleep(NOTION_SYNC_INTERVAL)
+        logger.debug("[notion_mirror] 테넌트 정리됨 → 동기화 루프 종료")
+
+    def ensure_started(self) -> None:
+        """
+        첫 사용 시 백그라운드 동기화 루프를 시작합니다.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+# ✅ 테넌트별 미러 (테넌트가 정리되면 동기화 루프도 종료)
+notion_mirror: "TenantScoped[NotionMirror]" = TenantScoped(
+    "notion_mirror", lambda tenant: NotionMirror(), close=NotionMirror.stop
+)
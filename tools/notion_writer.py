@@ -1,103 +1,126 @@
-import os
-import logging
-from datetime import datetime
-from notion_client import Client
-from dateutil import parser
-
-logger = logging.getLogger(__name__)
-notion = Client(auth=os.environ["NOTION_TOKEN"])
-database_id = os.environ["NOTION_DATABASE_ID"]
-
-
-def save_to_notion(parsed_data: dict) -> dict:
-    try:
-        title = parsed_data.get("title")
-        date_str = parsed_data.get("start_date") or parsed_data.get("date")
-        category = parsed_data.get("category") or "기타"
-
-        if not title or not date_str:
-            raise ValueError("❌ title 또는 start_date 누락")
-
-        date = parser.parse(date_str) if isinstance(date_str, str) else date_str
-        has_time = date.hour != 0 or date.minute != 0 or date.second != 0
-
-        start_iso = date.isoformat()
-        properties = {
-            "일정 제목": {"title": [{"text": {"content": title[:100]}}]},
-            "날짜": {
-                "date": {
-                    "start": start_iso,
-                    "time_zone": "Asia/Seoul" if has_time else None
-                }
-            },
-            "유형": {"select": {"name": category}}
-        }
-
-        notion.pages.create(
-            parent={"database_id": database_id},
-            properties=properties
-        )
-        logger.info(f"✅ Notion 등록 성공: {title}")
-        return {"status": "success", "title": title, "start": start_iso, "category": category}
-
-    except Exception as e:
-        logger.error(f"Notion 등록 오류: {e}")
-        return {"status": "error", "message": str(e)}
-
-
-def delete_from_notion(parsed_data: dict) -> dict:
-    try:
-        title = parsed_data.get("origin_title") or parsed_data.get("title")
-        date_str = parsed_data.get("origin_date") or parsed_data.get("start_date") or parsed_data.get("date")
-
-        if not title or not date_str:
-            raise ValueError("❌ 삭제를 위해 title과 date가 필요합니다.")
-
-        date = parser.parse(date_str) if isinstance(date_str, str) else date_str
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = date.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        query = {
-            "and": [
-                {
-                    "property": "일정 제목",
-                    "title": {"equals": title}
-                },
-                {
-                    "property": "날짜",
-                    "date": {
-                        "on_or_after": start_of_day.isoformat(),
-                        "on_or_before": end_of_day.isoformat()
-                    }
-                }
-            ]
-        }
-
-        result = notion.databases.query(database_id=database_id, filter=query)
-        results = result.get("results", [])
-        if not results:
-            return {"status": "not_found", "message": f"일정 찾을 수 없음: {title} ({date.isoformat()})"}
-
-        for page in results:
-            notion.pages.update(page["id"], archived=True)
-
-        logger.info(f"🗑️ Notion 정확 삭제 완료: {title}")
-        return {"status": "success", "deleted": len(results)}
-
-    except Exception as e:
-        logger.error(f"Notion 삭제 오류: {e}")
-        return {"status": "error", "message": str(e)}
-
-
-def update_notion_schedule(parsed_data: dict) -> dict:
-    try:
-        delete_result = delete_from_notion(parsed_data)
-        if delete_result.get("status") != "success":
-            return {"status": "delete_failed", "detail": delete_result}
-
-        save_result = save_to_notion(parsed_data)
-        return {"status": "updated", "detail": save_result}
-
-    except Exception as e:
-        logger.error(f"Notion 수정 오류: {e}")
-        return {"status": "error", "message": str(e)}
+import asyncio
+import logging
+from typing import List, Optional
+from dateutil import parser
+from notion_client import APIResponseError
+
+from tools.notion_api import get_notion, get_database_id
+from tools.notion_lookup import find_schedule_pages
+from tools.rate_limit import notion_limiter
+from tools.notion_mirror import notion_mirror, page_category, page_title
+from tools.title_match import schedule_key
+
+logger = logging.getLogger(__name__)
+
+
+async def save_to_notion(parsed_data: dict) -> dict:
+    try:
+        title = parsed_data.get("title")
+        date_str = parsed_data.get("start_date") or parsed_data.get("date")
+        category = parsed_data.get("category") or "기타"
+
+        if not title or not date_str:
+            raise ValueError("❌ title 또는 start_date 누락")
+
+        date = parser.parse(date_str) if isinstance(date_str, str) else date_str
+        has_time = date.hour != 0 or date.minute != 0 or date.second != 0
+
+        start_iso = date.isoformat()
+        properties = {
+            "일정 제목": {"title": [{"text": {"content": title[:100]}}]},
+            "날짜": {
+                "date": {
+                    "start": start_iso,
+                    "time_zone": "Asia/Seoul" if has_time else None
+                }
+            },
+            "유형": {"select": {"name": category}}
+        }
+
+        # 생성은 응답 시간 초과 뒤 다시 보내면 중복될 수 있어 한도 초과/연결 실패만 재시도
+        page = await notion_limiter.run(
+            lambda: get_notion().pages.create(
+                parent={"database_id": get_database_id()},
+                properties=properties
+            ),
+            idempotent=False
+        )
+        notion_mirror.apply(page)
+        logger.info(f"✅ Notion 등록 성공: {title}")
+        return {"status": "success", "page_id": page["id"], "title": title, "start": start_iso, "category": category}
+
+    except Exception as e:
+        logger.error(f"Notion 등록 오류: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+async def delete_from_notion(parsed_data: dict, page_ids: Optional[List[str]] = None) -> dict:
+    """
+    :param page_ids: 원장에 기록된 페이지 ID — 주어지면 검색 없이 바로 보관 처리
+    """
+    try:
+        title = parsed_data.get("origin_title") or parsed_data.get("title")
+        date_str = parsed_data.get("origin_date") or parsed_data.get("start_date") or parsed_data.get("date")
+
+        if not title or not date_str:
+            raise ValueError("❌ 삭제를 위해 title과 date가 필요합니다.")
+
+        date = parser.parse(date_str) if isinstance(date_str, str) else date_str
+        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # ✅ 원장 ID → 로컬 미러 → API 조회 순으로 대상 찾기
+        # 삭제는 되돌릴 수 없으므로 유사도가 아니라 카테고리 + 정규화 제목이 정확히 같은 페이지만
+        if page_ids:
+            results = [{"id": page_id} for page_id in page_ids]
+        else:
+            key = schedule_key(title, parsed_data.get("category"))
+            notion_mirror.ensure_started()
+            results = [
+                page for page in notion_mirror.pages_on(start_of_day.date().isoformat()) or []
+                if schedule_key(page_title(page), page_category(page)) == key
+            ]
+            if not results:
+                results = await find_schedule_pages(title, parsed_data.get("category"), start_of_day.isoformat())
+        if not results:
+            return {"status": "not_found", "message": f"일정 찾을 수 없음: {title} ({date.isoformat()})"}
+        if len(results) > 1:
+            # 어느 쪽을 지울지 알 수 없으면 아무것도 지우지 않음
+            logger.warning(f"⚠️ Notion '{title}' 페이지가 {len(results)}건 있어 삭제하지 않았습니다.")
+            return {
+                "status": "ambiguous",
+                "message": f"'{title}' 일정이 {len(results)}건 있어 삭제하지 않았습니다. Notion 에서 직접 삭제해 주세요."
+            }
+
+        async def archive(page_id: str) -> None:
+            await notion_limiter.run(lambda: get_notion().pages.update(page_id, archived=True))
+            notion_mirror.discard(page_id)
+
+        try:
+            await asyncio.gather(*(archive(page["id"]) for page in results))
+        except APIResponseError as e:
+            # 원장 ID 가 외부에서 지워졌거나 이미 보관된 경우 → 제목 검색으로 다시 시도
+            if not page_ids or e.status not in (400, 404):
+                raise
+            logger.warning(f"⚠️ 원장의 Notion 페이지({', '.join(page_ids)})를 보관할 수 없어 제목으로 다시 찾습니다.")
+            return await delete_from_notion(parsed_data)
+
+        logger.info(f"🗑️ Notion 정확 삭제 완료: {title}")
+        return {"status": "success", "deleted": len(results)}
+
+    except Exception as e:
+        logger.error(f"Notion 삭제 오류: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+async def update_notion_schedule(parsed_data: dict) -> dict:
+    try:
+        delete_result = await delete_from_notion(parsed_data)
+        if delete_result.get("status") != "success":
+            return {"status": "delete_failed", "detail": delete_result}
+
+        save_result = await save_to_notion(parsed_data)
+        return {"status": "updated", "detail": save_result}
+
+    except Exception as e:
+        logger.error(f"Notion 수정 오류: {e}")
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,27 @@
+import os
+import threading
+
+# ✅ openai 패키지는 import 비용이 커서 첫 사용 시점에 불러옵니다.
+_client = None
+_lock = threading.Lock()
+
+
+def get_openai():
+    """
+    공유 AsyncOpenAI 클라이언트 (첫 호출 시 생성)
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                from openai import AsyncOpenAI
+                # 재시도는 openai_limiter 가 담당 (SDK 자체 재시도와 겹치지 않도록)
+                _client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    return _client
+
+
+async def close_openai() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
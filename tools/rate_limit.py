@@ -0,0 +1,276 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, TypeVar
+
+from tools.metrics import RATE_LIMIT_WAIT, track_backend
+from tools.tenants import TenantScoped
+from tools.tracing import record_span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# ✅ 재시도 횟수 / 지터 백오프 기준·상한 (초)
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))
+RATE_LIMIT_BACKOFF_BASE = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "0.5"))
+RATE_LIMIT_BACKOFF_MAX = float(os.getenv("RATE_LIMIT_BACKOFF_MAX", "20"))
+
+
+class RetryHint(NamedTuple):
+    throttled: bool               # 한도 초과(429 등) → 버킷 전체를 잠시 멈춤
+    retry_after: Optional[float]  # 서버가 알려준 대기 시간 (초)
+    unsent: bool = False          # 연결 단계 실패 → 요청이 서버에 닿지 않음
+
+
+def may_retry(hint: Optional[RetryHint], idempotent: bool = True) -> bool:
+    """
+    다시 보내도 되는 오류인지.
+    만드는 요청(idempotent=False)은 응답 시간 초과·5xx 뒤에도 서버에 이미 만들어졌을 수 있으므로
+    처리되지 않은 게 확실할 때(한도 초과, 연결 실패)만 다시 보냅니다.
+    """
+    return hint is not None and (idempotent or hint.throttled or hint.unsent)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After 헤더 (초 또는 HTTP 날짜) → 대기 초
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    백엔드별 토큰 버킷.
+    - 초당 rate 개씩 토큰이 차고 최대 burst 개까지 모임, 호출마다 토큰을 쓰고 없으면 순서대로 대기
+    - 한도 초과 응답이면 Retry-After 만큼 버킷 전체를 멈춰 다른 호출도 함께 쉼
+    - 일시적 오류는 지터 백오프로 재시도
+    """
+
+    def __init__(self, name: str, rate: float, burst: int,
+                 classify: Callable[[BaseException], Optional[RetryHint]],
+                 max_retries: int = RATE_LIMIT_MAX_RETRIES):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.classify = classify
+        self.max_retries = max_retries
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+        self.waiting = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.throttled = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def pause(self, seconds: float) -> None:
+        """
+        서버가 한도 초과를 알려 오면 그 시간 동안 새 호출을 내보내지 않습니다.
+        """
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self._refill(now)
+        self.tokens = 0.0
+
+    async def acquire(self, tokens: int = 1) -> float:
+        """
+        토큰을 받을 때까지 기다립니다. (batch 처럼 burst 보다 많이 쓰면 모자란 만큼 다음 호출이 더 기다림)
+        :return: 대기한 시간 (초)
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        started = time.monotonic()
+        span_started = time.perf_counter()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                needed = min(tokens, self.burst)
+                while True:
+                    now = time.monotonic()
+                    if now < self.paused_until:
+                        await asyncio.sleep(self.paused_until - now)
+                        continue
+                    self._refill(now)
+                    if self.tokens >= needed:
+                        self.tokens -= tokens
+                        break
+                    await asyncio.sleep((needed - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        RATE_LIMIT_WAIT.observe(waited, backend=self.name)
+        self.acquired += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if waited > 0.001:
+            self.delayed += 1
+            record_span(f"{self.name}.wait", span_started)
+        return waited
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(RATE_LIMIT_BACKOFF_MAX, RATE_LIMIT_BACKOFF_BASE * 2 ** attempt))
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int = 1, idempotent: bool = True) -> T:
+        """
+        토큰을 받은 뒤 call() 을 실행하고, 재시도할 만한 오류면 다시 시도합니다.
+        :param call: 호출할 때마다 새 awaitable 을 만드는 함수
+            예) lambda: get_notion().pages.create(parent=..., properties=...)
+        :param idempotent: False 면 (페이지·일정 생성 등) 한도 초과와 연결 실패만 재시도 — may_retry 참고
+        """
+        attempt = 0
+        while True:
+            await self.acquire(tokens)
+            try:
+                with track_backend(self.name):
+                    return await call()
+            except Exception as e:
+                hint = self.classify(e)
+                retryable = may_retry(hint, idempotent)
+                if not retryable or attempt >= self.max_retries:
+                    if hint is not None:
+                        self.failures += 1
+                        if not retryable:
+                            logger.warning(f"[rate_limit] {self.name} 생성 요청은 이미 처리됐을 수 있어 재시도하지 않음: {e}")
+                    raise
+
+                delay = hint.retry_after if hint.retry_after is not None else self._backoff(attempt)
+                if hint.throttled:
+                    self.throttled += 1
+                    self.pause(delay)
+                attempt += 1
+                self.retries += 1
+                logger.warning(
+                    f"[rate_limit] {self.name} {'한도 초과' if hint.throttled else '일시 오류'} → "
+                    f"{delay:.2f}초 후 재시도 ({attempt}/{self.max_retries}): {e}"
+                )
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 2),
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "wait_seconds": round(self.wait_seconds, 4),
+            "avg_wait_seconds": round(self.wait_seconds / self.acquired, 4) if self.acquired else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4),
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+
+# ✅ 백엔드별 오류 분류 (각 SDK 는 분류할 때만 불러옴)
+def _notion_hint(error: BaseException) -> Optional[RetryHint]:
+    import httpx
+    from notion_client import APIResponseError
+    from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+    if isinstance(error, (APIResponseError, HTTPResponseError)):
+        if error.status == 429:
+            return RetryHint(True, parse_retry_after(error.headers.get("retry-after")))
+        if error.status >= 500:
+            return RetryHint(False, None)
+        return None
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return RetryHint(False, None, unsent=True)
+    if isinstance(error, (RequestTimeoutError, httpx.TransportError)):
+        return RetryHint(False, None)
+    return None
+
+
+def _google_hint(error: BaseException) -> Optional[RetryHint]:
+    from googleapiclient.errors import HttpError
+
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        details = error.error_details if isinstance(error.error_details, list) else []
+        reasons = {detail.get("reason") for detail in details if isinstance(detail, dict)}
+        if status == 429 or (status == 403 and reasons & {"rateLimitExceeded", "userRateLimitExceeded"}):
+            return RetryHint(True, parse_retry_after(error.resp.get("retry-after")))
+        if status >= 500:
+            return RetryHint(False, None)
+        return None
+    if isinstance(error, ConnectionRefusedError):
+        return RetryHint(False, None, unsent=True)
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return RetryHint(False, None)
+    return None
+
+
+def _openai_hint(error: BaseException) -> Optional[RetryHint]:
+    import openai
+
+    if isinstance(error, openai.RateLimitError):
+        if getattr(error, "code", None) == "insufficient_quota":
+            return None  # 결제 한도: 기다려도 풀리지 않음
+        return RetryHint(True, parse_retry_after(error.response.headers.get("retry-after")))
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        return RetryHint(False, None)
+    return None
+
+
+# ✅ 백엔드별 한도 (기본값은 각 API 의 공개 한도 기준)
+NOTION_RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+NOTION_RATE_BURST = int(os.getenv("NOTION_RATE_BURST", "3"))
+GOOGLE_RATE_LIMIT = float(os.getenv("GOOGLE_RATE_LIMIT", "10"))
+GOOGLE_RATE_BURST = int(os.getenv("GOOGLE_RATE_BURST", "10"))
+
+# ✅ Notion·Google 한도는 통합(토큰)·인증 정보마다 따로 → 테넌트별 리미터
+# 한 테넌트의 한도 초과(Retry-After)가 다른 테넌트를 멈추지 않음
+notion_limiter: "TenantScoped[RateLimiter]" = TenantScoped(
+    "notion_limiter",
+    lambda tenant: RateLimiter("notion", rate=NOTION_RATE_LIMIT, burst=NOTION_RATE_BURST, classify=_notion_hint)
+)
+google_limiter: "TenantScoped[RateLimiter]" = TenantScoped(
+    "google_limiter",
+    lambda tenant: RateLimiter("google", rate=GOOGLE_RATE_LIMIT, burst=GOOGLE_RATE_BURST, classify=_google_hint)
+)
+# OpenAI 키는 프로세스 전체가 하나 → 공유
+openai_limiter = RateLimiter(
+    "openai",
+    rate=float(os.getenv("OPENAI_RATE_LIMIT", "5")),
+    burst=int(os.getenv("OPENAI_RATE_BURST", "5")),
+    classify=_openai_hint
+)
+
+
+def all_limiters() -> List[RateLimiter]:
+    """
+    지금 만들어져 있는 모든 리미터 (테넌트별 Notion·Google + 공유 OpenAI)
+    """
+    return [*notion_limiter.instances().values(), *google_limiter.instances().values(), openai_limiter]
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    tenants: Dict[str, Dict[str, Any]] = {}
+    for scoped in (notion_limiter, google_limiter):
+        for tenant_id, limiter in scoped.instances().items():
+            tenants.setdefault(tenant_id, {})[limiter.name] = limiter.stats()
+    return {"openai": openai_limiter.stats(), "tenants": tenants}
@@ -0,0 +1,473 @@
+import io
+import os
+import re
+import csv
+import time
+import uuid
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil import parser as date_parser
+
+from tools.date_resolver import KST, CATEGORY_KEYWORDS, detect_category
+from tools.calendar_register import register_schedule
+from tools.google_calendar import calendar_client
+from tools.notion_lookup import find_exact_pages
+from tools.notion_writer import save_to_notion
+from tools.schedule_ledger import ScheduleLedger
+from tools.tenants import DEFAULT_TENANT_ID, tenant_registry, use_tenant
+
+logger = logging.getLogger(__name__)
+
+# ✅ 가져오기 진행 상황(체크포인트) 파일 위치
+IMPORT_STATE_PATH = os.getenv("IMPORT_STATE_PATH", "imports.db")
+# ✅ 한 번에 처리할 행 수 (캘린더는 이만큼이 batch 요청 하나로, Notion 은 한도 안에서 동시에)
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "50"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS imports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    token TEXT NOT NULL,
+    tenant TEXT NOT NULL DEFAULT 'default',
+    source TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS import_rows (
+    import_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    ledger_id INTEGER,
+    calendar_event_id TEXT,
+    notion_page_id TEXT,
+    calendar_started INTEGER NOT NULL DEFAULT 0,
+    notion_started INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    PRIMARY KEY (import_id, idx)
+);
+"""
+
+_CATEGORIES = {name for name, _ in CATEGORY_KEYWORDS} | {"기타"}
+# "[상담] 김철수 고객" 형식 (캘린더 제목 규칙과 같음)
+_TAGGED_TITLE = re.compile(r"^\s*\[([^\]]+)\]\s*(.+)$")
+# "2025.05.18" 처럼 점으로 쓴 날짜
+_DOTTED_DATE = re.compile(r"^(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.?")
+
+# CSV 머리글 별칭
+_CSV_COLUMNS = {
+    "title": ("title", "제목", "일정 제목", "일정", "summary"),
+    "date": ("date", "날짜", "start", "start_date", "시작", "일자"),
+    "time": ("time", "시간", "시각", "start_time"),
+    "category": ("category", "유형", "카테고리", "분류"),
+}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def _row(title: str, start_date: str, category: Optional[str] = None) -> Dict[str, str]:
+    """
+    제목 앞의 [카테고리] 표시는 떼어 유형으로 쓰고, 유형이 없으면 제목 키워드로 정합니다. (GPT 호출 없음)
+    """
+    title = " ".join((title or "").split())
+    tagged = _TAGGED_TITLE.match(title)
+    if tagged:
+        title = tagged.group(2).strip()
+        category = category or tagged.group(1).strip()
+    if not title:
+        raise ImportFormatError("제목이 비어 있습니다.")
+    category = (category or "").strip()
+    if category not in _CATEGORIES:
+        category = detect_category(f"{category} {title}")
+    return {"title": title, "start_date": start_date, "category": category}
+
+
+def _normalize_start(value: str, time_value: str = "") -> str:
+    """
+    날짜(+시간) 문자열 → "YYYY-MM-DD" 또는 "YYYY-MM-DDTHH:MM:SS" (KST)
+    """
+    text = f"{value} {time_value}".strip()
+    if not text:
+        raise ImportFormatError("날짜가 비어 있습니다.")
+    try:
+        parsed = date_parser.parse(_DOTTED_DATE.sub(r"\1-\2-\3", text))
+    except (ValueError, OverflowError):
+        raise ImportFormatError(f"날짜 형식 오류: {text}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(KST).replace(tzinfo=None)
+    if parsed.hour == 0 and parsed.minute == 0 and parsed.second == 0:
+        return parsed.date().isoformat()
+    return parsed.isoformat(timespec="seconds")
+
+
+def parse_csv(text: str) -> List[Dict[str, str]]:
+    """
+    머리글이 있는 CSV → 일정 행 목록
+    필요한 열: 제목(title), 날짜(date) / 선택: 시간(time), 유형(category)
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    headers = {name.strip().lower(): name for name in reader.fieldnames or []}
+    columns = {
+        field: next((headers[alias] for alias in aliases if alias in headers), None)
+        for field, aliases in _CSV_COLUMNS.items()
+    }
+    if columns["title"] is None or columns["date"] is None:
+        raise ImportFormatError(f"CSV 에 제목/날짜 열이 없습니다: {reader.fieldnames}")
+
+    rows = []
+    for line_no, record in enumerate(reader, start=2):
+        def get(field: str) -> str:
+            return (record.get(columns[field]) or "").strip() if columns[field] else ""
+
+        if not any((value or "").strip() for value in record.values() if isinstance(value, str)):
+            continue
+        try:
+            rows.append(_row(get("title"), _normalize_start(get("date"), get("time")), get("category")))
+        except ImportFormatError as e:
+            raise ImportFormatError(f"{line_no}행: {e}")
+    return rows
+
+
+def _ics_value(line: str) -> Tuple[str, Dict[str, str], str]:
+    """
+    "DTSTART;TZID=Asia/Seoul:20250518T140000" → ("DTSTART", {"TZID": "Asia/Seoul"}, "20250518T140000")
+    """
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    return name.upper(), dict(param.split("=", 1) for param in params if "=" in param), value
+
+
+def _ics_start(params: Dict[str, str], value: str) -> str:
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d").date().isoformat()
+    parsed = datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    elif params.get("TZID"):
+        try:
+            parsed = parsed.replace(tzinfo=ZoneInfo(params["TZID"].strip('"')))
+        except (ZoneInfoNotFoundError, ValueError):
+            pass  # 모르는 시간대는 KST 로 간주
+    return _normalize_start(parsed.isoformat())
+
+
+def parse_ics(text: str) -> List[Dict[str, str]]:
+    """
+    iCalendar(.ics) 의 VEVENT → 일정 행 목록 (SUMMARY, DTSTART, CATEGORIES 사용)
+    """
+    # 접힌 줄(공백으로 시작하는 줄) 펼치기
+    lines = re.sub(r"\r?\n[ \t]", "", text).splitlines()
+    rows, event = [], None
+    for line in lines:
+        upper = line.strip().upper()
+        if upper == "BEGIN:VEVENT":
+            event = {}
+        elif upper == "END:VEVENT" and event is not None:
+            if event.get("STATUS", "").upper() != "CANCELLED":
+                if "DTSTART" not in event:
+                    raise ImportFormatError(f"DTSTART 없는 일정: {event.get('SUMMARY', '')}")
+                summary = event.get("SUMMARY", "").replace("\\,", ",").replace("\\;", ";").replace("\\n", " ")
+                category = event.get("CATEGORIES", "").split(",")[0].strip()
+                rows.append(_row(summary, event["DTSTART"], category))
+            event = None
+        elif event is not None and ":" in line:
+            name, params, value = _ics_value(line)
+            if name == "DTSTART":
+                try:
+                    event[name] = _ics_start(params, value.strip())
+                except ValueError:
+                    raise ImportFormatError(f"DTSTART 형식 오류: {value}")
+            elif name in ("SUMMARY", "CATEGORIES", "STATUS"):
+                event[name] = value.strip()
+    return rows
+
+
+def parse_import(data: bytes, source: str) -> List[Dict[str, str]]:
+    """
+    :param source: "ics" 또는 "csv"
+    """
+    text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    if source == "ics":
+        return parse_ics(text)
+    if source == "csv":
+        return parse_csv(text)
+    raise ImportFormatError(f"지원하지 않는 형식: {source}")
+
+
+def _event_id(token: str, idx: int) -> str:
+    """
+    행마다 고정된 캘린더 이벤트 ID (base32hex 문자만) — 재개 시 같은 일정을 다시 넣으면 409 로 중복을 막음
+    """
+    return hashlib.sha1(f"{token}:{idx}".encode()).hexdigest()
+
+
+class ImportStore:
+    """
+    가져오기 진행 상황 저장소. 행마다 만든 캘린더 이벤트/Notion 페이지 ID 를 바로 기록해
+    프로세스가 중간에 죽어도 끝난 행은 건너뛰고 이어서 처리합니다.
+    """
+
+    def __init__(self, path: str = IMPORT_STATE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _create(self, source: str, rows: List[Dict[str, str]], tenant: str) -> int:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._conn.execute(
+                    "INSERT INTO imports (token, tenant, source, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (uuid.uuid4().hex, tenant, source, len(rows), now, now)
+                )
+                import_id = cur.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO import_rows (import_id, idx, title, start_date, category) VALUES (?, ?, ?, ?, ?)",
+                    [(import_id, idx, row["title"], row["start_date"], row["category"]) for idx, row in enumerate(rows)]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return import_id
+
+    def _header(self, import_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM imports WHERE id = ?", (import_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _pending(self, import_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM import_rows WHERE import_id = ? "
+                "AND (calendar_event_id IS NULL OR notion_page_id IS NULL) ORDER BY idx",
+                (import_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _update_row(self, import_id: int, idx: int, **fields: Any) -> None:
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE import_rows SET {columns} WHERE import_id = ? AND idx = ?",
+                (*fields.values(), import_id, idx)
+            )
+
+    def _set_status(self, import_id: int, status: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE imports SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), import_id)
+            )
+
+    def _running(self) -> List[int]:
+        with self._lock:
+            return [row["id"] for row in self._conn.execute("SELECT id FROM imports WHERE status = 'running'")]
+
+    def _progress(self, import_id: int, error_limit: int) -> Optional[Dict[str, Any]]:
+        header = self._header(import_id)
+        if header is None:
+            return None
+        with self._lock:
+            counts = self._conn.execute(
+                "SELECT COUNT(calendar_event_id) AS calendar, COUNT(notion_page_id) AS notion, "
+                "SUM(calendar_event_id IS NOT NULL AND notion_page_id IS NOT NULL) AS done, "
+                "SUM(error IS NOT NULL) AS failed FROM import_rows WHERE import_id = ?",
+                (import_id,)
+            ).fetchone()
+            errors = self._conn.execute(
+                "SELECT idx, title, start_date, error FROM import_rows WHERE import_id = ? AND error IS NOT NULL "
+                "ORDER BY idx LIMIT ?",
+                (import_id, error_limit)
+            ).fetchall()
+        total = header["total"]
+        return {
+            "id": import_id,
+            "tenant": header["tenant"],
+            "source": header["source"],
+            "status": header["status"],
+            "total": total,
+            "done": counts["done"] or 0,
+            "calendar_done": counts["calendar"],
+            "notion_done": counts["notion"],
+            "failed": counts["failed"] or 0,
+            "progress": round((counts["done"] or 0) / total, 4) if total else 1.0,
+            "errors": [dict(row) for row in errors],
+            "created_at": header["created_at"],
+            "updated_at": header["updated_at"],
+        }
+
+    async def create(self, source: str, rows: List[Dict[str, str]], tenant: str = DEFAULT_TENANT_ID) -> int:
+        return await asyncio.to_thread(self._create, source, rows, tenant)
+
+    async def header(self, import_id: int) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._header, import_id)
+
+    async def pending(self, import_id: int) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._pending, import_id)
+
+    async def update_row(self, import_id: int, idx: int, **fields: Any) -> None:
+        await asyncio.to_thread(self._update_row, import_id, idx, **fields)
+
+    async def set_status(self, import_id: int, status: str) -> None:
+        await asyncio.to_thread(self._set_status, import_id, status)
+
+    async def running(self) -> List[int]:
+        return await asyncio.to_thread(self._running)
+
+    async def progress(self, import_id: int, error_limit: int = 20) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._progress, import_id, error_limit)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ScheduleImporter:
+    """
+    가져온 행을 IMPORT_CHUNK_SIZE 개씩 캘린더·Notion 에 씁니다.
+    - 캘린더: 한 묶음의 insert 가 batch HTTP 요청 하나로 전송
+    - Notion: notion_limiter 한도 안에서 동시에 생성
+    - 각 행은 원장(ScheduleLedger)에도 기록되어, 이후 텔레그램 수정/삭제가 ID 로 바로 처리됨
+    """
+
+    def __init__(self, store: ImportStore, ledger: ScheduleLedger):
+        self.store = store
+        self.ledger = ledger
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def start(self, import_id: int) -> bool:
+        """
+        백그라운드로 (이어서) 실행합니다. 이미 실행 중이면 False
+        """
+        task = self._tasks.get(import_id)
+        if task is not None and not task.done():
+            return False
+        task = asyncio.get_running_loop().create_task(self._run(import_id))
+        self._tasks[import_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(import_id, None))
+        return True
+
+    async def resume_all(self) -> int:
+        """
+        재시작 전에 실행 중이던 가져오기를 이어서 실행합니다.
+        """
+        import_ids = await self.store.running()
+        for import_id in import_ids:
+            self.start(import_id)
+        return len(import_ids)
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _write_row(self, import_id: int, token: str, row: Dict[str, Any]) -> None:
+        idx = row["idx"]
+        if row["ledger_id"] is None:
+            row["ledger_id"] = await self.ledger.create(row["title"], row["start_date"], row["category"])
+            await self.store.update_row(import_id, idx, ledger_id=row["ledger_id"])
+        errors = []
+
+        # 이전 실행에서 요청은 보냈지만 결과를 기록하지 못한 행(*_started)은 이미 만들어졌는지 먼저 확인
+        async def calendar() -> None:
+            from googleapiclient.errors import HttpError
+
+            event_id = _event_id(token, idx)
+            calendar_id = calendar_client.calendar_id
+            event = None
+            if row["calendar_started"]:
+                try:
+                    event = await calendar_client.execute(
+                        lambda service: service.events().get(calendarId=calendar_id, eventId=event_id)
+                    )
+                except HttpError as e:
+                    if e.resp.status not in (404, 410):
+                        raise
+            if event is None:
+                await self.store.update_row(import_id, idx, calendar_started=1)
+                # 같은 ID 가 이미 있으면(409) register_schedule 이 그 일정을 돌려줌
+                event = await register_schedule(
+                    row["title"], row["start_date"], row["category"], event_id=event_id
+                )
+            await self.ledger.link_calendar(row["ledger_id"], event)
+            await self.store.update_row(import_id, idx, calendar_event_id=event["id"])
+
+        async def notion() -> None:
+            pages = await find_exact_pages(row["title"], row["start_date"], limit=1) if row["notion_started"] else []
+            if pages:
+                page_id = pages[0]["id"]
+            else:
+                await self.store.update_row(import_id, idx, notion_started=1)
+                result = await save_to_notion(row)
+                if result.get("status") != "success":
+                    raise RuntimeError(result.get("message", "Notion 등록 실패"))
+                page_id = result["page_id"]
+            await self.ledger.link_notion(row["ledger_id"], page_id)
+            await self.store.update_row(import_id, idx, notion_page_id=page_id)
+
+        sinks = []
+        if row["calendar_event_id"] is None:
+            sinks.append(("캘린더", calendar()))
+        if row["notion_page_id"] is None:
+            sinks.append(("Notion", notion()))
+        outcomes = await asyncio.gather(*(coro for _, coro in sinks), return_exceptions=True)
+        for (name, _), outcome in zip(sinks, outcomes):
+            if isinstance(outcome, Exception):
+                errors.append(f"{name}: {outcome}")
+        await self.store.update_row(import_id, idx, error="; ".join(errors) or None)
+
+    async def _run(self, import_id: int) -> None:
+        header = await self.store.header(import_id)
+        if header is None:
+            return
+        tenant = tenant_registry.get(header["tenant"])
+        if tenant is None:
+            logger.error(f"[import] {import_id}번 가져오기 중단: 설정에 없는 테넌트 {header['tenant']}")
+            await self.store.set_status(import_id, "failed")
+            return
+        # 가져오기 전체를 해당 테넌트의 캘린더·Notion 으로 (진행 중에는 테넌트 클라이언트가 정리되지 않음)
+        with use_tenant(tenant):
+            await self._write_all(import_id, header)
+
+    async def _write_all(self, import_id: int, header: Dict[str, Any]) -> None:
+        await self.store.set_status(import_id, "running")
+        rows = await self.store.pending(import_id)
+        started = time.perf_counter()
+        logger.info(f"[import] {import_id}번 가져오기 시작: 남은 {len(rows)}/{header['total']}건")
+
+        try:
+            for offset in range(0, len(rows), IMPORT_CHUNK_SIZE):
+                chunk = rows[offset:offset + IMPORT_CHUNK_SIZE]
+                await asyncio.gather(*(self._write_row(import_id, header["token"], row) for row in chunk))
+                progress = await self.store.progress(import_id, error_limit=0)
+                logger.info(
+                    f"[import] {import_id}번 진행 {progress['done']}/{progress['total']} "
+                    f"(실패 {progress['failed']}, {time.perf_counter() - started:.1f}초)"
+                )
+        except asyncio.CancelledError:
+            # 종료 시에는 running 상태로 남겨 다음 시작 때 이어서 처리
+            raise
+        except Exception as e:
+            logger.error(f"[import] {import_id}번 가져오기 중단: {e}")
+            await self.store.set_status(import_id, "failed")
+            return
+
+        progress = await self.store.progress(import_id, error_limit=0)
+        status = "done" if progress["failed"] == 0 else "done_with_errors"
+        await self.store.set_status(import_id, status)
+        logger.info(f"[import] {import_id}번 가져오기 완료 ({status}, {time.perf_counter() - started:.1f}초)")
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from typing import Optional, Dict, Any, List
+
+from tools.tenants import current_tenant
+from tools.title_match import normalize_title, schedule_key
+
+# ✅ 원장 파일 위치
+SCHEDULE_LEDGER_PATH = os.getenv("SCHEDULE_LEDGER_PATH", "ledger.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tenant TEXT NOT NULL DEFAULT 'default',
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    date TEXT NOT NULL,
+    category TEXT,
+    calendar_event_id TEXT,
+    calendar_start TEXT,
+    calendar_end TEXT,
+    notion_page_id TEXT,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_schedules_lookup ON schedules (tenant, date, title_key, deleted);
+"""
+
+
+def _day(date_str: str) -> str:
+    return (date_str or "")[:10]
+
+
+class ScheduleLedger:
+    """
+    우리가 등록한 일정의 Google Calendar 이벤트 ID ↔ Notion 페이지 ID 원장.
+    등록 시 기록해 두면, 이후 수정/삭제는 양쪽 모두 검색 없이 ID 로 바로 처리합니다.
+    일정은 테넌트별로 구분되어, 다른 팀의 같은 제목·날짜 일정과 섞이지 않습니다.
+    """
+
+    def __init__(self, path: str = SCHEDULE_LEDGER_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _create(self, tenant: str, title: str, date_str: str, category: Optional[str]) -> int:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO schedules (tenant, title, title_key, date, category, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tenant, title, normalize_title(title), _day(date_str), category, now, now)
+            )
+            return cur.lastrowid
+
+    def _link(self, entry_id: int, **fields: Any) -> None:
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE schedules SET {columns}, updated_at = ? WHERE id = ?",
+                (*fields.values(), time.time(), entry_id)
+            )
+
+    def _find_all(self, tenant: str, title: str, date_str: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM schedules WHERE tenant = ? AND date = ? AND title_key = ? AND deleted = 0 "
+                "ORDER BY id DESC",
+                (tenant, _day(date_str), normalize_title(title))
+            ).fetchall()
+        entries = []
+        for row in rows:
+            entry = dict(row)
+            for key in ("calendar_start", "calendar_end"):
+                entry[key] = json.loads(entry[key]) if entry[key] else None
+            entries.append(entry)
+        return entries
+
+    def _find(self, tenant: str, title: str, date_str: str) -> Optional[Dict[str, Any]]:
+        entries = self._find_all(tenant, title, date_str)
+        return entries[0] if entries else None
+
+    def _find_exact(self, tenant: str, title: str, date_str: str, category: Optional[str]) -> Optional[Dict[str, Any]]:
+        key = schedule_key(title, category)
+        entries = [
+            entry for entry in self._find_all(tenant, title, date_str)
+            if schedule_key(entry["title"], entry["category"]) == key
+        ]
+        return entries[0] if len(entries) == 1 else None
+
+    async def create(self, title: str, date_str: str, category: Optional[str]) -> int:
+        return await asyncio.to_thread(self._create, current_tenant().id, title, date_str, category)
+
+    async def link_calendar(self, entry_id: int, event: Dict[str, Any]) -> None:
+        await asyncio.to_thread(
+            self._link, entry_id,
+            calendar_event_id=event["id"],
+            calendar_start=json.dumps(event.get("start")),
+            calendar_end=json.dumps(event.get("end"))
+        )
+
+    async def link_notion(self, entry_id: int, page_id: str) -> None:
+        await asyncio.to_thread(self._link, entry_id, notion_page_id=page_id)
+
+    async def move(self, entry_id: int, title: str, date_str: str, category: Optional[str]) -> None:
+        """
+        수정 후 새 제목/날짜로 원장 키를 옮깁니다.
+        """
+        await asyncio.to_thread(
+            self._link, entry_id,
+            title=title, title_key=normalize_title(title), date=_day(date_str), category=category
+        )
+
+    async def mark_deleted(self, entry_id: int) -> None:
+        await asyncio.to_thread(self._link, entry_id, deleted=1)
+
+    async def find(self, title: str, date_str: str) -> Optional[Dict[str, Any]]:
+        """
+        현재 테넌트에서 날짜 + 정규화 제목으로 가장 최근에 등록한 (삭제되지 않은) 일정을 찾습니다.
+        """
+        if not title or not date_str:
+            return None
+        return await asyncio.to_thread(self._find, current_tenant().id, title, date_str)
+
+    async def find_exact(self, title: str, date_str: str, category: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        삭제용: 카테고리 + 정규화 제목이 정확히 같은 일정이 하나뿐일 때만 돌려줍니다.
+        (없거나 여러 건이면 None → 호출부가 검색해 대상 확인·중복 안내)
+        """
+        if not title or not date_str:
+            return None
+        return await asyncio.to_thread(self._find_exact, current_tenant().id, title, date_str, category)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
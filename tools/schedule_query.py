@@ -0,0 +1,245 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.date_resolver import KST, WEEKDAYS, detect_category
+from tools.google_calendar import calendar_client
+from tools.single_flight import SingleFlight
+from tools.tenants import TenantScoped
+
+logger = logging.getLogger(__name__)
+
+# ✅ 날짜 버킷 유효 시간(초) / 최대 보관 일수 / 한 번에 조회할 수 있는 최대 일수
+SCHEDULE_CACHE_TTL = float(os.getenv("SCHEDULE_CACHE_TTL", "120"))
+SCHEDULE_CACHE_DAYS = int(os.getenv("SCHEDULE_CACHE_DAYS", "400"))
+SCHEDULE_QUERY_MAX_DAYS = int(os.getenv("SCHEDULE_QUERY_MAX_DAYS", "62"))
+
+
+def _parse_instant(value: Dict[str, str]) -> datetime:
+    if "dateTime" in value:
+        instant = datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+        # 오프셋 없이 timeZone 만 준 값(우리가 보낸 본문 그대로)은 KST 로
+        return instant.astimezone(KST) if instant.tzinfo else instant.replace(tzinfo=KST)
+    day = date.fromisoformat(value["date"])
+    return datetime(day.year, day.month, day.day, tzinfo=KST)
+
+
+def event_days(event: Dict[str, Any]) -> Tuple[date, date]:
+    """
+    이벤트가 걸친 첫날과 마지막 날 (KST). 종일 일정의 end 는 다음 날 0시라 하루 빼서 계산
+    """
+    start = _parse_instant(event["start"])
+    end = _parse_instant(event.get("end") or event["start"])
+    if end > start:
+        end -= timedelta(microseconds=1)
+    return start.date(), max(start.date(), end.date())
+
+
+def _sort_key(event: Dict[str, Any]) -> str:
+    start = event.get("start", {})
+    return _parse_instant(start).isoformat() if start else ""
+
+
+class ScheduleCache:
+    """
+    조회 명령용 날짜(KST)별 이벤트 캐시.
+    - 버킷은 SCHEDULE_CACHE_TTL 동안 유효, 비었거나 만료된 날짜만 연속 구간으로 묶어 목록 API 한 번씩 호출
+    - 우리가 쓴 일정(등록·수정·삭제)은 해당 날짜 버킷을 바로 무효화
+    - 같은 구간의 동시 조회는 호출 하나를 나눠 씀
+    calendar_mirror 의 날짜 색인을 쓰지 않는 이유: 미러는 syncToken 동기화라 반복 일정을 원본으로만 받아
+    색인에서 빼고, 여러 날 일정은 시작일에만 올립니다. 조회 응답은 반복 일정의 각 회차(singleEvents)와
+    여러 날 일정이 걸친 모든 날짜가 필요하므로, 그렇게 펼친 목록을 날짜별로 따로 보관합니다.
+    """
+
+    def __init__(self, calendar_id: str = "primary", ttl: float = SCHEDULE_CACHE_TTL,
+                 max_days: int = SCHEDULE_CACHE_DAYS):
+        self.calendar_id = calendar_id
+        self.ttl = ttl
+        self.max_days = max_days
+        # 날짜 → (가져온 시각, 이벤트 목록)
+        self._buckets: "OrderedDict[date, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        # 날짜별 무효화 횟수 — 조회 도중 무효화된 날짜는 결과를 캐시에 넣지 않음
+        self._versions: Dict[date, int] = {}
+        self._flight = SingleFlight("schedule_query")
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.invalidations = 0
+
+    # ✅ 무효화
+    def invalidate(self, day: date) -> None:
+        self._versions[day] = self._versions.get(day, 0) + 1
+        if self._buckets.pop(day, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_event(self, event: Dict[str, Any]) -> None:
+        """
+        우리가 등록·수정한 이벤트가 걸친 날짜를 모두 무효화합니다.
+        """
+        try:
+            first, last = event_days(event)
+        except (KeyError, ValueError):
+            return
+        day = first
+        while day <= last:
+            self.invalidate(day)
+            day += timedelta(days=1)
+
+    def discard(self, event_id: str) -> None:
+        """
+        수정 전 위치나 삭제한 이벤트처럼 ID 만 알 때: 그 이벤트가 들어 있는 버킷을 무효화
+        """
+        for day in [day for day, (_, events) in self._buckets.items()
+                    if any(event["id"] == event_id for event in events)]:
+            self.invalidate(day)
+
+    # ✅ 조회
+    def _fresh(self, day: date, now: float) -> Optional[List[Dict[str, Any]]]:
+        item = self._buckets.get(day)
+        if item is None or now - item[0] > self.ttl:
+            return None
+        self._buckets.move_to_end(day)
+        return item[1]
+
+    async def _fetch(self, first: date, last: date) -> Dict[date, List[Dict[str, Any]]]:
+        versions = {first + timedelta(days=i): self._versions.get(first + timedelta(days=i), 0)
+                    for i in range((last - first).days + 1)}
+        time_min = datetime(first.year, first.month, first.day, tzinfo=KST)
+        time_max = time_min + timedelta(days=len(versions))
+
+        found: Dict[date, List[Dict[str, Any]]] = {day: [] for day in versions}
+        self.fetches += 1
+        async for event in calendar_client.iter_events(
+            calendar_id=self.calendar_id,
+            timeMin=time_min.isoformat(),
+            timeMax=time_max.isoformat(),
+            singleEvents=True,
+            orderBy="startTime",
+            maxResults=2500
+        ):
+            if event.get("status") == "cancelled" or "start" not in event:
+                continue
+            start, end = event_days(event)
+            day = max(start, first)
+            while day <= min(end, last):
+                found[day].append(event)
+                day += timedelta(days=1)
+
+        fetched_at = time.monotonic()
+        for day, events in found.items():
+            if self._versions.get(day, 0) == versions[day]:
+                self._buckets[day] = (fetched_at, events)
+                self._buckets.move_to_end(day)
+        while len(self._buckets) > self.max_days:
+            self._buckets.popitem(last=False)
+        logger.debug(f"[schedule_query] {first} ~ {last} 조회: {sum(map(len, found.values()))}건")
+        return found
+
+    async def events_between(self, first: date, last: date) -> List[Dict[str, Any]]:
+        """
+        first ~ last (KST, 양끝 포함) 사이의 이벤트를 시작 시간순으로 반환합니다.
+        캐시에 없는 날짜만 연속 구간별로 목록 API 를 호출합니다.
+        """
+        now = time.monotonic()
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        by_day: Dict[date, List[Dict[str, Any]]] = {}
+        missing: List[Tuple[date, date]] = []
+        for day in days:
+            events = self._fresh(day, now)
+            if events is not None:
+                by_day[day] = events
+                continue
+            if missing and missing[-1][1] == day - timedelta(days=1):
+                missing[-1] = (missing[-1][0], day)
+            else:
+                missing.append((day, day))
+
+        if missing:
+            self.misses += 1
+            fetched = await asyncio.gather(*(
+                self._flight.do(run, lambda run=run: self._fetch(*run)) for run in missing
+            ))
+            for found in fetched:
+                by_day.update(found)
+        else:
+            self.hits += 1
+
+        # 여러 날에 걸친 일정은 한 번만
+        unique = {event["id"]: event for day in days for event in by_day.get(day, [])}
+        return sorted(unique.values(), key=_sort_key)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "days": len(self._buckets),
+            "max_days": self.max_days,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "fetches": self.fetches,
+            "invalidations": self.invalidations,
+            "single_flight": self._flight.stats(),
+        }
+
+
+# ✅ 테넌트별 캐시
+schedule_cache: "TenantScoped[ScheduleCache]" = TenantScoped(
+    "schedule_cache", lambda tenant: ScheduleCache(tenant.calendar_id)
+)
+
+
+def _event_category(event: Dict[str, Any]) -> str:
+    summary = event.get("summary", "")
+    if summary.startswith("[") and "]" in summary:
+        return summary[1:summary.index("]")]
+    return detect_category(summary)
+
+
+def _format_event(event: Dict[str, Any]) -> str:
+    start = event["start"]
+    day = _parse_instant(start)
+    label = f"{day.month}/{day.day}({WEEKDAYS[day.weekday()]})"
+    when = day.strftime("%H:%M") if "dateTime" in start else "종일"
+    return f"{label} {when} {event.get('summary', '(제목 없음)')}"
+
+
+async def answer_query(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    조회 명령(query_schedule) 해석 결과 → 기간 안의 일정 목록과 응답 문구
+    """
+    first = date.fromisoformat(parsed["start_date"][:10])
+    last = date.fromisoformat((parsed.get("end_date") or parsed["start_date"])[:10])
+    if last < first:
+        first, last = last, first
+    if (last - first).days >= SCHEDULE_QUERY_MAX_DAYS:
+        return {"status": "fail", "message": f"한 번에 최대 {SCHEDULE_QUERY_MAX_DAYS}일까지 조회할 수 있습니다."}
+
+    category = parsed.get("category")
+    events = await schedule_cache.events_between(first, last)
+    if category:
+        events = [event for event in events if _event_category(event) == category]
+
+    period = first.isoformat() if first == last else f"{first.isoformat()} ~ {last.isoformat()}"
+    label = f"{category} 일정" if category else "일정"
+    if events:
+        message = f"{period} {label} {len(events)}건\n" + "\n".join(_format_event(event) for event in events)
+    else:
+        message = f"{period}에는 {label}이 없습니다."
+
+    return {
+        "status": "success",
+        "start_date": first.isoformat(),
+        "end_date": last.isoformat(),
+        "category": category,
+        "count": len(events),
+        "events": [
+            {key: event[key] for key in ("id", "summary", "start", "end") if key in event}
+            for event in events
+        ],
+        "message": message,
+    }
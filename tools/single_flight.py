@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    같은 키의 작업이 이미 진행 중이면 새로 시작하지 않고 그 결과를 함께 기다립니다.
+    (같은 음성/문장이 동시에 들어와도 Whisper·GPT 호출은 한 번)
+    작업은 별도 태스크로 실행되어, 기다리던 쪽 하나가 시간 초과로 취소돼도 나머지는 결과를 받습니다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+            logger.debug(f"[single_flight] {self.name}: 진행 중인 작업 결과를 공유 ({key})")
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 모두 취소되어 아무도 받지 않은 예외도 경고 없이 정리
+
+    def stats(self) -> Dict[str, int]:
+        return {"started": self.started, "coalesced": self.coalesced, "inflight": len(self._inflight)}
@@ -0,0 +1,325 @@
+import os
+import json
+import time
+import asyncio
+import inspect
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# ✅ 테넌트 설정 파일 (비우면 환경변수로 만든 기본 테넌트 하나만)
+TENANTS_FILE = os.getenv("TENANTS_FILE", "")
+# ✅ 동시에 클라이언트를 들고 있을 최대 테넌트 수 / 이 시간(초) 동안 요청이 없으면 정리
+TENANT_POOL_SIZE = int(os.getenv("TENANT_POOL_SIZE", "64"))
+TENANT_IDLE_SECONDS = float(os.getenv("TENANT_IDLE_SECONDS", "900"))
+
+DEFAULT_TENANT_ID = "default"
+
+
+@dataclass(frozen=True)
+class Tenant:
+    id: str
+    notion_token: str = field(repr=False)
+    notion_database_id: str
+    google_credentials: Optional[str] = field(default=None, repr=False)  # authorized user JSON
+    calendar_id: str = "primary"
+    chat_ids: Tuple[int, ...] = ()
+
+
+def _secret(value: Any) -> Any:
+    """
+    "$ENV_NAME" 형식이면 환경변수 값으로 (설정 파일에 비밀 값을 직접 두지 않도록)
+    """
+    if isinstance(value, str) and value.startswith("$"):
+        return os.getenv(value[1:])
+    return value
+
+
+def _default_tenant() -> Tenant:
+    return Tenant(
+        id=DEFAULT_TENANT_ID,
+        notion_token=os.getenv("NOTION_TOKEN", ""),
+        notion_database_id=os.getenv("NOTION_DATABASE_ID", ""),
+        google_credentials=os.getenv("GOOGLE_CALENDAR_CREDENTIALS"),
+        calendar_id=os.getenv("GOOGLE_CALENDAR_ID", "primary"),
+    )
+
+
+class TenantRegistry:
+    """
+    채팅 ID → 테넌트(팀) 설정.
+    TENANTS_FILE 예)
+    {"tenants": [{"id": "team-a", "chat_ids": [123, 456],
+                  "notion_token": "$TEAM_A_NOTION_TOKEN", "notion_database_id": "...",
+                  "google_calendar_credentials": {...} 또는 "$TEAM_A_GOOGLE_CREDENTIALS",
+                  "calendar_id": "primary"}]}
+    등록되지 않은 채팅은 기존 환경변수로 만든 기본 테넌트로 처리합니다.
+    """
+
+    def __init__(self, path: str = TENANTS_FILE):
+        self.path = path
+        self._tenants: Optional[Dict[str, Tenant]] = None
+        self._by_chat: Dict[int, Tenant] = {}
+
+    def _load(self) -> Dict[str, Tenant]:
+        if self._tenants is not None:
+            return self._tenants
+        tenants = {DEFAULT_TENANT_ID: _default_tenant()}
+        if self.path:
+            with open(self.path, encoding="utf-8") as f:
+                config = json.load(f)
+            for item in config.get("tenants", []):
+                credentials = _secret(item.get("google_calendar_credentials"))
+                tenant = Tenant(
+                    id=str(item["id"]),
+                    notion_token=_secret(item["notion_token"]),
+                    notion_database_id=_secret(item["notion_database_id"]),
+                    google_credentials=json.dumps(credentials) if isinstance(credentials, dict) else credentials,
+                    calendar_id=item.get("calendar_id", "primary"),
+                    chat_ids=tuple(int(chat_id) for chat_id in item.get("chat_ids", [])),
+                )
+                if not tenant.google_credentials:
+                    # 기본 팀 계정으로 대신 쓰지 않음 → 이 테넌트의 캘린더 작업은 인증 정보 누락으로 실패
+                    logger.error(f"❌ [tenants] {tenant.id}: google_calendar_credentials 가 없거나 환경변수가 비어 있습니다.")
+                tenants[tenant.id] = tenant
+                for chat_id in tenant.chat_ids:
+                    self._by_chat[chat_id] = tenant
+            logger.info(f"[tenants] 테넌트 {len(tenants) - 1}개, 채팅 {len(self._by_chat)}개 설정 읽음")
+        self._tenants = tenants
+        return tenants
+
+    def default(self) -> Tenant:
+        return self._load()[DEFAULT_TENANT_ID]
+
+    def get(self, tenant_id: Optional[str]) -> Optional[Tenant]:
+        return self._load().get(tenant_id or DEFAULT_TENANT_ID)
+
+    def for_chat(self, chat_id: Any) -> Tenant:
+        self._load()
+        try:
+            return self._by_chat.get(int(chat_id)) or self.default()
+        except (TypeError, ValueError):
+            return self.default()
+
+
+tenant_registry = TenantRegistry()
+
+_current: ContextVar[Optional[Tenant]] = ContextVar("tenant", default=None)
+# 백그라운드 루프(미러 동기화 등) 안인지 — 풀의 LRU 순서를 바꾸거나 정리된 테넌트를 되살리지 않도록
+_background: ContextVar[bool] = ContextVar("tenant_background", default=False)
+
+
+class TenantEvicted(Exception):
+    """
+    백그라운드 작업의 테넌트가 이미 풀에서 정리됨 (루프를 끝내면 됨)
+    """
+
+
+def current_tenant() -> Tenant:
+    """
+    지금 처리 중인 요청/작업의 테넌트 (지정하지 않았으면 기본 테넌트)
+    """
+    return _current.get() or tenant_registry.default()
+
+
+class _Entry:
+    def __init__(self, tenant: Tenant):
+        self.tenant = tenant
+        self.resources: Dict[str, Any] = {}
+        self.last_used = time.monotonic()
+        self.active = 0
+
+
+class TenantPool:
+    """
+    테넌트별로 만든 클라이언트(캘린더 서비스, Notion 클라이언트, 미러 등)의 LRU.
+    - 테넌트의 객체는 처음 쓸 때 만들고, 최대 TENANT_POOL_SIZE 테넌트 분만 보관
+    - TENANT_IDLE_SECONDS 동안 요청이 없었거나 한도를 넘은 오래된 테넌트는 정리 (처리 중인 테넌트는 제외)
+    - 이벤트 루프에서만 사용합니다. (스레드에서 쓸 값은 호출 전에 꺼내 둘 것)
+    """
+
+    def __init__(self, max_size: int = TENANT_POOL_SIZE, idle_seconds: float = TENANT_IDLE_SECONDS):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._scopes: List["TenantScoped"] = []
+        self._closing: set = set()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.built = 0
+        self.evicted = 0
+
+    def register(self, scoped: "TenantScoped") -> None:
+        self._scopes.append(scoped)
+
+    def _entry(self, tenant: Tenant) -> _Entry:
+        entry = self._entries.get(tenant.id)
+        if entry is None:
+            entry = self._entries[tenant.id] = _Entry(tenant)
+            self._evict(keep=tenant.id)
+        self._entries.move_to_end(tenant.id)
+        return entry
+
+    def resource(self, scoped: "TenantScoped[T]") -> T:
+        tenant = current_tenant()
+        if _background.get():
+            entry = self._entries.get(tenant.id)
+            if entry is None:
+                raise TenantEvicted(tenant.id)
+        else:
+            entry = self._entry(tenant)
+        value = entry.resources.get(scoped._name)
+        if value is None:
+            value = entry.resources[scoped._name] = scoped._factory(entry.tenant)
+            self.built += 1
+        return value
+
+    def peek(self, scoped: "TenantScoped[T]") -> Optional[T]:
+        """
+        현재 테넌트에 이미 만들어진 객체 (없으면 None — 새로 만들지 않고 LRU 순서도 바꾸지 않음)
+        """
+        entry = self._entries.get(current_tenant().id)
+        return entry.resources.get(scoped._name) if entry is not None else None
+
+    def instances(self, scoped: "TenantScoped[T]") -> Dict[str, T]:
+        return {
+            tenant_id: entry.resources[scoped._name]
+            for tenant_id, entry in self._entries.items() if scoped._name in entry.resources
+        }
+
+    @contextmanager
+    def use(self, tenant: Tenant) -> Iterator[Tenant]:
+        """
+        이 블록(과 블록에서 만든 태스크)을 tenant 로 처리합니다. 처리 중에는 정리 대상에서 빠집니다.
+        """
+        token = _current.set(tenant)
+        entry = self._entry(tenant)
+        entry.active += 1
+        try:
+            yield tenant
+        finally:
+            entry.active -= 1
+            entry.last_used = time.monotonic()
+            _current.reset(token)
+
+    @contextmanager
+    def background(self) -> Iterator[None]:
+        """
+        백그라운드 루프용: 이 블록 안의 조회는 요청으로 치지 않습니다.
+        (LRU 순서·유휴 시간 갱신 없음, 테넌트가 이미 정리됐으면 다시 만들지 않고 TenantEvicted)
+        """
+        token = _background.set(True)
+        try:
+            yield
+        finally:
+            _background.reset(token)
+
+    # ✅ 정리
+    def _evict(self, keep: Optional[str] = None) -> None:
+        now = time.monotonic()
+        for tenant_id, entry in list(self._entries.items()):
+            if entry.active or tenant_id == keep:
+                continue
+            over = len(self._entries) > self.max_size
+            if over or now - entry.last_used > self.idle_seconds:
+                del self._entries[tenant_id]
+                self.evicted += 1
+                logger.info(f"[tenants] {tenant_id} 클라이언트 정리 ({'한도 초과' if over else '유휴'})")
+                task = asyncio.get_running_loop().create_task(self._close_entry(entry))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+    async def _close_entry(self, entry: _Entry) -> None:
+        # 나중에 만든 객체(미러 등)부터 닫아, 먼저 만든 클라이언트를 쓰는 중에 닫히지 않도록
+        for scoped in reversed(self._scopes):
+            value = entry.resources.pop(scoped._name, None)
+            if value is None or scoped._close is None:
+                continue
+            try:
+                result = scoped._close(value)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"[tenants] {entry.tenant.id} {scoped._name} 정리 실패: {e}")
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, min(60.0, self.idle_seconds / 4)))
+            self._evict()
+
+    def start(self) -> None:
+        """
+        요청이 없어도 유휴 테넌트가 정리되도록 주기적으로 확인합니다.
+        """
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop())
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        entries = list(self._entries.values())
+        self._entries.clear()
+        await asyncio.gather(*(self._close_entry(entry) for entry in entries), *self._closing)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "idle_seconds": self.idle_seconds,
+            "built": self.built,
+            "evicted": self.evicted,
+            "tenants": [
+                {
+                    "id": tenant_id,
+                    "active": entry.active,
+                    "idle_seconds": round(now - entry.last_used, 1),
+                    "resources": sorted(entry.resources),
+                }
+                for tenant_id, entry in reversed(self._entries.items())
+            ],
+        }
+
+
+tenant_pool = TenantPool()
+
+
+def use_tenant(tenant: Tenant):
+    return tenant_pool.use(tenant)
+
+
+class TenantScoped(Generic[T]):
+    """
+    모듈 싱글턴처럼 쓰지만 실제 객체는 현재 테넌트마다 하나씩 (TenantPool 에 보관).
+    예) calendar_client = TenantScoped("calendar", lambda tenant: CalendarClient(...), close=...)
+        calendar_client.execute(...) → 현재 테넌트의 CalendarClient.execute
+    """
+
+    def __init__(self, name: str, factory: Callable[[Tenant], T],
+                 close: Optional[Callable[[T], Any]] = None):
+        self._name = name
+        self._factory = factory
+        self._close = close
+        tenant_pool.register(self)
+
+    def get(self) -> T:
+        return tenant_pool.resource(self)
+
+    def peek(self) -> Optional[T]:
+        return tenant_pool.peek(self)
+
+    def instances(self) -> Dict[str, T]:
+        """
+        이미 만들어진 테넌트별 객체 (통계용 — 새로 만들지 않고 LRU 순서도 바꾸지 않음)
+        """
+        return tenant_pool.instances(self)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.get(), attr)
@@ -0,0 +1,193 @@
+import os
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from jamo import h2j, j2hcj
+
+from tools.date_resolver import CATEGORY_KEYWORDS
+
+# ✅ 수정 대상 후보로 인정할 최소 유사도 (삭제는 유사도 대신 schedule_key 정확 일치)
+TITLE_MATCH_THRESHOLD = float(os.getenv("TITLE_MATCH_THRESHOLD", "0.6"))
+
+# 찾는 제목이 후보 제목에 그대로 들어 있을 때의 점수 ("상담" → "김철수 상담")
+CONTAINED_SCORE = 0.9
+NGRAM_SIZE = 3
+
+_CATEGORIES = "|".join(re.escape(name) for name, _ in CATEGORY_KEYWORDS + [("기타", [])])
+# "[상담] 제목", "제목 (상담)", "제목 - 상담" 처럼 붙는 카테고리 표시
+_TAG_PATTERN = re.compile(rf"\[[^\]]*\]|\(\s*(?:{_CATEGORIES})\s*\)|\s-\s*(?:{_CATEGORIES})\s*$")
+# 캘린더 일정 제목 "[상담] 김철수 고객" (등록 시 붙이는 형식)
+_SUMMARY_PATTERN = re.compile(r"^\s*\[([^\]]*)\]\s*(.*)$", re.S)
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+# 여러 일정에 흔히 들어가 걸러 내는 힘이 약한 단어
+_COMMON_WORDS = {keyword for _, keywords in CATEGORY_KEYWORDS for keyword in keywords} | {"기타", "일정"}
+
+
+def normalize_title(title: str) -> str:
+    """
+    비교용 제목 키: 카테고리 표시·공백·문장부호 제거, 소문자
+    예) "[상담] 김철수 고객" → "김철수고객"
+    """
+    title = title or ""
+    stripped = _NON_WORD_PATTERN.sub("", _TAG_PATTERN.sub(" ", title).lower())
+    return stripped or _NON_WORD_PATTERN.sub("", title.lower())
+
+
+def schedule_key(title: str, category: Optional[str]) -> Tuple[str, str]:
+    """
+    삭제처럼 되돌릴 수 없는 작업용 정확 비교 키: (카테고리, 정규화 제목)
+    예) ("김철수 고객", "상담") → ("상담", "김철수고객"). 카테고리가 없으면 "기타"
+    """
+    return ((category or "").strip() or "기타", normalize_title(title))
+
+
+def summary_key(summary: str) -> Optional[Tuple[str, str]]:
+    """
+    캘린더 일정 제목의 정확 비교 키. 예) "[상담] 김철수 고객" → ("상담", "김철수고객")
+    카테고리 표시로 시작하지 않는 (우리가 등록하지 않은) 일정은 None
+    """
+    match = _SUMMARY_PATTERN.match(summary or "")
+    if match is None:
+        return None
+    return schedule_key(match.group(2), match.group(1))
+
+
+def distinctive_token(title: str) -> Optional[str]:
+    """
+    서버 쪽 부분 일치 검색에 쓸 단어: 카테고리 표시와 흔한 단어를 뺀 가장 긴 단어
+    예) "[상담] 김철수 고객 상담" → "김철수"
+    두 글자 이상인 단어가 없으면 None
+    """
+    words = [
+        word for word in _WORD_PATTERN.findall(_TAG_PATTERN.sub(" ", title or ""))
+        if len(word) >= 2 and word not in _COMMON_WORDS
+    ]
+    return max(words, key=len) if words else None
+
+
+def jamo_key(title: str) -> str:
+    """
+    자모 단위로 풀어 쓴 비교 키. 음성 인식 오타("상단" ↔ "상담")도 글자 하나 차이로 잡힙니다.
+    """
+    return j2hcj(h2j(normalize_title(title)))
+
+
+def _ngrams(key: str) -> Set[str]:
+    if len(key) <= NGRAM_SIZE:
+        return {key} if key else set()
+    return {key[i:i + NGRAM_SIZE] for i in range(len(key) - NGRAM_SIZE + 1)}
+
+
+def _edit_distance(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _score(query: Tuple[str, str], candidate: Tuple[str, str]) -> float:
+    query_key, query_jamo = query
+    candidate_key, candidate_jamo = candidate
+    if not query_key or not candidate_key:
+        return 0.0
+    if query_key == candidate_key:
+        return 1.0
+    longest = max(len(query_jamo), len(candidate_jamo))
+    score = 1 - _edit_distance(query_jamo, candidate_jamo) / longest
+    if query_key in candidate_key:
+        score = max(score, CONTAINED_SCORE)
+    return round(score, 3)
+
+
+class TitleIndex:
+    """
+    제목 유사도 검색용 색인.
+    - 제목마다 정규화 키와 자모 키를 미리 계산해 두고
+    - 자모 3-gram 역색인으로 후보를 좁힌 뒤, 후보만 자모 편집 거리로 점수를 매깁니다.
+    """
+
+    def __init__(self):
+        self._keys: Dict[Hashable, Tuple[str, str]] = {}
+        self._grams: Dict[str, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, item_id: Hashable, title: str) -> None:
+        self.remove(item_id)
+        key = normalize_title(title)
+        jamo = j2hcj(h2j(key))
+        self._keys[item_id] = (key, jamo)
+        for gram in _ngrams(jamo):
+            self._grams.setdefault(gram, set()).add(item_id)
+
+    def remove(self, item_id: Hashable) -> None:
+        keys = self._keys.pop(item_id, None)
+        if keys is None:
+            return
+        for gram in _ngrams(keys[1]):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(item_id)
+                if not ids:
+                    del self._grams[gram]
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._grams.clear()
+
+    def search(self, title: str, within: Optional[Set[Hashable]] = None, limit: int = 5,
+               min_score: float = TITLE_MATCH_THRESHOLD) -> List[Tuple[Hashable, float]]:
+        """
+        :param within: 이 ID 들 중에서만 찾기 (예: 해당 날짜의 일정)
+        :return: [(ID, 점수)] 점수 높은 순
+        """
+        key = normalize_title(title)
+        query = (key, j2hcj(h2j(key)))
+        grams = _ngrams(query[1])
+        if not grams:
+            return []
+
+        # 공유하는 n-gram 수로 후보를 고른 뒤에만 편집 거리 계산
+        overlap: Dict[Hashable, int] = {}
+        for gram in grams:
+            for item_id in self._grams.get(gram, ()):
+                if within is None or item_id in within:
+                    overlap[item_id] = overlap.get(item_id, 0) + 1
+
+        ranked = []
+        for item_id, shared in overlap.items():
+            if within is None and shared < len(grams) * 0.2:
+                continue
+            score = _score(query, self._keys[item_id])
+            if score >= min_score:
+                ranked.append((item_id, score))
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+
+def rank_titles(title: str, items: Iterable[Tuple[Hashable, str]], limit: int = 5,
+                min_score: float = TITLE_MATCH_THRESHOLD) -> List[Tuple[Hashable, float]]:
+    """
+    API 응답처럼 색인이 없는 목록에서 제목이 비슷한 순으로 고릅니다.
+    """
+    index = TitleIndex()
+    for item_id, item_title in items:
+        index.add(item_id, item_title)
+    return index.search(title, limit=limit, min_score=min_score)
+
+
+def top_matches(ranked: List[Tuple[Hashable, float]]) -> List[Hashable]:
+    """
+    최고 점수와 같은 후보만 (같은 제목이 중복 등록된 경우 모두)
+    """
+    if not ranked:
+        return []
+    best = ranked[0][1]
+    return [item_id for item_id, score in ranked if score == best]
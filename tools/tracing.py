@@ -0,0 +1,114 @@
+import json
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+# ✅ 요청별 한 줄 JSON 로그 전용 로거 (main 에서 메시지만 출력하도록 설정)
+trace_logger = logging.getLogger("jarvis.trace")
+
+# 한 요청에 남길 최대 span 수 (대량 처리에서 로그 한 줄이 끝없이 커지지 않도록)
+MAX_SPANS = 200
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("jarvis_trace", default=None)
+
+
+class Trace:
+    """
+    요청 하나의 타이밍 기록.
+    asyncio 태스크는 생성 시 컨텍스트를 복사하므로 gather 로 나뉜 하위 작업의 span 도 같은 Trace 에 쌓입니다.
+    """
+
+    def __init__(self, kind: str, request_id: Optional[str] = None):
+        self.kind = kind
+        self.request_id = request_id or uuid.uuid4().hex[:16]
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self.attrs: Dict[str, Any] = {}
+
+    def add_span(self, name: str, started: float, outcome: str = "ok", error: Optional[str] = None) -> None:
+        """
+        :param started: time.perf_counter() 기준 시작 시각
+        """
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return
+        span = {
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 2),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "outcome": outcome,
+        }
+        if error:
+            span["error"] = error
+        self.spans.append(span)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        디버그 응답에 붙이는 타이밍 요약 (span 은 시작 순)
+        """
+        return {
+            "request_id": self.request_id,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "spans": sorted(self.spans, key=lambda span: span["start_ms"]),
+        }
+
+    def emit(self) -> None:
+        record = {
+            "ts": round(self.started_at, 3),
+            "kind": self.kind,
+            **self.attrs,
+            **self.summary(),
+        }
+        if self.dropped:
+            record["dropped_spans"] = self.dropped
+        trace_logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+@contextmanager
+def start_trace(kind: str, request_id: Optional[str] = None) -> Iterator[Trace]:
+    """
+    블록 안의 모든 span 을 모아 끝날 때 JSON 한 줄로 남깁니다.
+    """
+    trace = Trace(kind, request_id)
+    token = _current.set(trace)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        trace.emit()
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current.get()
+    return trace.request_id if trace else None
+
+
+def record_span(name: str, started: float, outcome: str = "ok", error: Optional[str] = None) -> None:
+    """
+    진행 중인 요청이 있으면 span 을 추가합니다. (없으면 아무것도 하지 않음)
+    """
+    trace = _current.get()
+    if trace is not None:
+        trace.add_span(name, started, outcome, error)
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    모든 로그 레코드에 현재 요청 ID 를 붙여 동시 요청의 로그를 구분할 수 있게 합니다.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = current_request_id() or "-"
+        return True
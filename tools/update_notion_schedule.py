@@ -1,19 +1,21 @@
-import os
+import asyncio
 import logging
-import re
-from notion_client import Client
 from dateutil import parser
-from datetime import datetime
+from notion_client import APIResponseError
+from typing import List, Optional
 
-logger = logging.getLogger(__name__)
-notion = Client(auth=os.environ["NOTION_TOKEN"])
-database_id = os.environ["NOTION_DATABASE_ID"]
+from tools.notion_api import get_notion
+from tools.notion_lookup import find_pages
+from tools.rate_limit import notion_limiter
+from tools.notion_mirror import notion_mirror
+from tools.title_match import top_matches
 
-# ✅ 제목 정규화 함수
-def normalize_title(title: str) -> str:
-    return re.sub(r"\s+", "", title.lower().strip().replace("[", "").replace("]", ""))
+logger = logging.getLogger(__name__)
 
-def update_notion_schedule(parsed_data: dict) -> dict:
+async def update_notion_schedule(parsed_data: dict, page_ids: Optional[List[str]] = None) -> dict:
+    """
+    :param page_ids: 원장에 기록된 페이지 ID — 주어지면 검색 없이 바로 수정
+    """
     try:
         origin_title = parsed_data.get("origin_title")
         origin_date_str = parsed_data.get("origin_date")
@@ -26,70 +28,56 @@ def update_notion_schedule(parsed_data: dict) -> dict:
 
         origin_date = parser.parse(origin_date_str)
         start_of_day = origin_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = origin_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        # ✅ Notion에서 날짜 범위로 먼저 필터
-        query = {
-            "filter": {
-                "and": [
-                    {
-                        "property": "날짜",
-                        "date": {
-                            "on_or_after": start_of_day.isoformat(),
-                            "on_or_before": end_of_day.isoformat()
-                        }
-                    }
-                ]
-            }
-        }
-
-        result = notion.databases.query(database_id=database_id, **query)
-        results = result.get("results", [])
-        if not results:
-            return {"status": "not_found", "message": f"일정 찾을 수 없음: {origin_title} ({origin_date.isoformat()})"}
 
-        # ✅ 유사 제목 탐색
-        expected_variants = [
-            origin_title,
-            f"[{category}] {origin_title}",
-            f"{origin_title} ({category})",
-            f"{origin_title} - {category}"
-        ]
-        expected_variants = [normalize_title(v) for v in expected_variants]
+        # ✅ 원장 ID → 로컬 미러(유사도 색인) 순으로 먼저 찾기
+        if page_ids:
+            target_pages = [{"id": page_id} for page_id in page_ids]
+        else:
+            notion_mirror.ensure_started()
+            ranked = notion_mirror.match(origin_title, start_of_day.date().isoformat())
+            best = top_matches([(page["id"], score) for page, score in ranked])
+            target_pages = [page for page, _ in ranked if page["id"] in best]
 
-        target_pages = []
-        for page in results:
-            title_prop = page["properties"].get("일정 제목", {}).get("title", [])
-            if not title_prop:
-                continue
-            actual_title = title_prop[0]["plain_text"]
-            if any(variant in normalize_title(actual_title) for variant in expected_variants):
-                target_pages.append(page)
+        if not target_pages:
+            # ✅ 미러에 없으면 Notion 에서 날짜 + 제목 단어 조건으로 걸러 받아 유사도 최고점 페이지 (중복 등록분 모두)
+            target_pages = await find_pages(origin_title, start_of_day.isoformat())
 
         if not target_pages:
-            return {"status": "not_found", "message": f"제목 조건에 맞는 일정 없음: {origin_title}"}
+            return {"status": "not_found", "message": f"일정 찾을 수 없음: {origin_title} ({origin_date.isoformat()})"}
 
         # ✅ 일정 수정
         new_date = parser.parse(new_start)
         has_time = new_date.hour != 0 or new_date.minute != 0 or new_date.second != 0
         start_iso = new_date.isoformat()
 
-        for page in target_pages:
-            page_id = page["id"]
-            properties = {
-                "일정 제목": {"title": [{"text": {"content": new_title[:100]}}]},
-                "날짜": {
-                    "date": {
-                        "start": start_iso,
-                        "time_zone": "Asia/Seoul" if has_time else None
-                    }
-                },
-                "유형": {"select": {"name": category}}
-            }
-            notion.pages.update(page_id=page_id, properties=properties)
+        properties = {
+            "일정 제목": {"title": [{"text": {"content": new_title[:100]}}]},
+            "날짜": {
+                "date": {
+                    "start": start_iso,
+                    "time_zone": "Asia/Seoul" if has_time else None
+                }
+            },
+            "유형": {"select": {"name": category}}
+        }
+
+        async def update_page(page_id: str) -> None:
+            updated_page = await notion_limiter.run(
+                lambda: get_notion().pages.update(page_id=page_id, properties=properties)
+            )
+            notion_mirror.apply(updated_page)
+
+        try:
+            await asyncio.gather(*(update_page(page["id"]) for page in target_pages))
+        except APIResponseError as e:
+            # 원장 ID 가 외부에서 지워졌거나 보관된 경우 → 제목 검색으로 다시 시도
+            if not page_ids or e.status not in (400, 404):
+                raise
+            logger.warning(f"⚠️ 원장의 Notion 페이지({', '.join(page_ids)})를 수정할 수 없어 제목으로 다시 찾습니다.")
+            return await update_notion_schedule(parsed_data)
 
         logger.info(f"✏️ Notion 일정 수정 완료: {new_title}")
-        return {"status": "success", "updated": len(target_pages)}
+        return {"status": "success", "updated": len(target_pages), "page_ids": [page["id"] for page in target_pages]}
 
     except Exception as e:
         logger.error(f"Notion 수정 오류: {e}")
@@ -1,16 +1,15 @@
 import os
-from notion_client import Client
 import logging
 
 logger = logging.getLogger(__name__)
 
-notion = Client(auth=os.environ["NOTION_TOKEN"])
-
 def verify_database():
     """
     연결된 Notion 데이터베이스의 속성을 검증합니다.
     """
     try:
+        from notion_client import Client
+        notion = Client(auth=os.environ["NOTION_TOKEN"])
         database_id = os.environ["NOTION_DATABASE_ID"]
         database = notion.databases.retrieve(database_id=database_id)
         properties = database["properties"]